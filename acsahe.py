@@ -1,30 +1,40 @@
+import contextlib
+import time
 import traceback
 
 import numpy as np
 import os
 import sys
-from PyQt5.QtWidgets import (
-    QApplication
-)
-from tkinter import messagebox
 
 from interaction_diagram.interaction_diagram_builder import UniaxialInteractionDiagram
+from interaction_diagram.interaction_surface_builder import InteractionSurfaceSweep, DEFAULT_SWEEP_THETA_STEP
+from interaction_diagram.load_plane_scheduler import solve_load_plane_angles
+from interaction_diagram.symmetric_diagram import group_symmetric_load_plane_angles, MirroredUniaxialInteractionDiagram
+from interaction_diagram.process_pool_backend import StrainPlaneProcessPool
+from interaction_diagram.verification_engine import verify_load_combinations
+from build.utils.user_messages import show_message
 from geometry.section_analysis import ACSAHEGeometricSolution
 from build.utils.plotly_engine import ACSAHEPlotlyEngine
-from report.report_engine import ACSAHEReportEngine
-
-def show_message(message, titulo="Mensaje"):
-    messagebox.showinfo(titulo, message)
 
 
 class ACSAHE:
     progress_bar_messages = {
-        "Inicio": "Geometría completada. Construyendo diagrama de interacción para plano de carga λ={plano_de_carga}° ...",
-        "Medio": "Construyendo diagrama de interacción para plano de carga λ={plano_de_carga}° ...",
+        "Inicio": "Geometría completada. Construyendo diagramas de interacción para {cantidad} plano(s) de carga ...",
+        "Medio": "Diagrama de interacción para plano de carga λ={plano_de_carga}° completado ({resueltos}/{total}) ...",
         "Ultimo": "Construyendo resultados ..."
     }
 
-    def __init__(self, app_gui, input_file_name, path_to_input_file, html_folder_path=None, excel_folder_path=None, docx_folder_path=None):
+    def __init__(self, app_gui, input_file_name, path_to_input_file, html_folder_path=None, excel_folder_path=None,
+                 docx_folder_path=None, solver_options=None, on_progress=None, process_events=None,
+                 builds_results=True, verifies_load_combinations=None):
+        """:param app_gui: user interface running ACSAHE, or None to run headless.
+        :param on_progress: function (message, value) reporting the progress. By default, app_gui.update_ui.
+        :param process_events: function keeping the user interface responsive between steps. By default, Qt's event
+        processing when there is an app_gui.
+        :param builds_results: whether the plots, and the report and Excel results if requested, are built once the
+        diagrams are solved (see build_results).
+        :param verifies_load_combinations: whether the load combinations are verified against the diagrams (see
+        verify_load_combinations). By default, as requested in the input file."""
         super().__init__()
         # Gathering useful paths on user's PC
         self.input_file_name = input_file_name
@@ -34,6 +44,12 @@ class ACSAHE:
             self.input_file_name.split(".")[:-1]) if "." in self.input_file_name else self.input_file_name
 
         self.app_gui = app_gui
+        self.on_progress = on_progress if on_progress is not None or not hasattr(app_gui, "update_ui") else (
+            lambda message, value: app_gui.update_ui(message=message, value=value))
+        self.process_events = process_events if process_events is not None or app_gui is None else (
+            self.get_qt_event_processor())
+        self.builds_results = builds_results
+        self.verifies_load_combinations = verifies_load_combinations
         self.save_html = bool(html_folder_path)
         self.html_folder_path = html_folder_path
         self.generate_pdf = bool(docx_folder_path)
@@ -41,7 +57,30 @@ class ACSAHE:
         self.generate_excel = bool(excel_folder_path)
         self.excel_folder_path = excel_folder_path
 
+        # Optional solver settings:
+        #   "neutral_axis_sweep": for 3D problems, interpolates every loading plane from a single swept interaction
+        #       surface (see InteractionSurfaceSweep) instead of solving each of them.
+        #   "sweep_theta_step": spacing in degrees of the swept neutral axis inclinations.
+        #   "adaptive_tolerance": refines the strain planes adaptively, up to this maximum distance between consecutive
+        #       points relative to the size of the diagram (e.g. 0.05), instead of using the fixed set of planes.
+        #   "backend": "threads" (default) or "processes", to solve the strain planes in a process pool.
+        #   "max_workers", "chunk_size": number of workers, and of contiguous strain planes per task.
+        #   "load_plane_workers": number of loading plane angles solved concurrently. By default, one with the "threads"
+        #       backend and the number of CPUs with the "processes" one (see get_load_plane_workers).
+        #   "concrete_integration": "fibers" or "analytic", to integrate the concrete stress block over the mesh
+        #       elements or exactly over the regions. By default ("auto"), analytic for sections with circular regions.
+        #       On polygonal sections, analytic is slower than fibers.
+        #   "excel_backend": "xlwings" or "openpyxl", to read the input workbook through Excel or directly from the
+        #       file (see ExcelManager). By default, xlwings where Excel can run.
+        self.solver_options = solver_options or {}
+
         self.geometric_solution = None
+        self.interaction_diagrams = {}  # UniaxialInteractionDiagram by loading plane angle.
+        # Elapsed time in seconds of each step of start_process, by step name.
+        self.stage_timings = {}
+        # Demand/capacity ratio of each load combination, when the verification is requested (see
+        # verify_load_combinations).
+        self.load_combination_results = []
 
         self.plotly_data_subsets = {}
         self.plotly_engine = ACSAHEPlotlyEngine()
@@ -62,112 +101,201 @@ class ACSAHE:
             # Running from .py script (debugging)
             return os.path.dirname(os.path.abspath(__file__))
 
+    @staticmethod
+    def get_qt_event_processor():
+        from PyQt5.QtWidgets import QApplication
+        return QApplication.processEvents
+
     def update_ui(self, message=None, progress_bar_value: int = None):
-        if hasattr(self.app_gui, "update_ui"):
-            self.app_gui.update_ui(message=message, value=progress_bar_value)
-        QApplication.processEvents()
+        if self.on_progress is not None:
+            self.on_progress(message, progress_bar_value)
+        self._process_ui_events()
+
+    def _process_ui_events(self):
+        if self.process_events is not None:
+            self.process_events()
+
+    @contextlib.contextmanager
+    def _timed_stage(self, stage_name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_timings[stage_name] = time.perf_counter() - start
 
     def start_process(self):
+        """Runs every step, recording its elapsed time in stage_timings: geometry, interaction diagrams, verification
+        of the load combinations and results."""
         try:
-            self.update_ui("Construyendo Geometría...", 5)
-            self.geometric_solution = ACSAHEGeometricSolution(file_path=self.path_to_input_file)
+            with self._timed_stage("geometria"):
+                self.update_ui("Construyendo Geometría...", 5)
+                self.geometric_solution = ACSAHEGeometricSolution(
+                    file_path=self.path_to_input_file, excel_backend=self.solver_options.get("excel_backend"))
             geometric_solution = self.geometric_solution
 
             loading_path_angles = sorted(geometric_solution.lista_ang_plano_de_carga)
             self.total_steps = 2 + len(loading_path_angles)
-            QApplication.processEvents()
-
-            self.plotly_data_subsets = {}
-
-            for step_number in range(1, self.total_steps):
-                is_last_step = step_number == self.total_steps-1
-
-                if not is_last_step:
-                    angle = loading_path_angles[step_number - 1]
-                    self._update_progress_message(step_number, angle)
-
-                    partial_2d_solution = UniaxialInteractionDiagram(angle if angle != -1 else 0.00, geometric_solution)
-
-                    coordinates_3d, colors_partial, is_capped_partial = geometric_solution.get_3d_coordinates(
-                        partial_2d_solution.interaction_diagram_points_list)
-                    x_partial, y_partial, z_partial, phi_partial = coordinates_3d
-                    is_phi_constant = isinstance(geometric_solution.problema["phi_variable"], float)
-                    
-                    # Extract plane indices for hover text (plano_de_deformacion[3] is the index)
-                    plane_indices = [point["plano_de_deformacion"][3] for point in 
-                                    partial_2d_solution.interaction_diagram_points_list]
-                    
-                    hover_text_partial = self._get_hover_text(
-                        x_partial, y_partial, z_partial, phi_partial, angle, is_phi_constant, plane_indices)
-
-                    self.plotly_data_subsets[str(angle)] = {
-                        "x": x_partial.copy(),
-                        "y": y_partial.copy(),
-                        "z": z_partial.copy(),
-                        "phi": phi_partial.copy(),
-                        "text": hover_text_partial.copy(),
-                        "color": colors_partial.copy(),
-                        "is_capped": is_capped_partial.copy(),
-                        "plane_indices": plane_indices.copy()
-                    }
-
-                    self.x_total.extend(x_partial)
-                    self.y_total.extend(y_partial)
-                    self.z_total.extend(z_partial)
-                    self.hover_text_total.extend(hover_text_partial)
-                    self.color_total.extend(colors_partial)
-                    self.is_capped_total.extend(is_capped_partial)
-
-                    self.nominal_x_total.extend((np.array(x_partial) / np.array(phi_partial)).tolist())
-                    self.nominal_y_total.extend((np.array(y_partial) / np.array(phi_partial)).tolist())
-                    self.nominal_z_total.extend((np.array(z_partial) / np.array(phi_partial)).tolist())
-
-                else:
-                    self.update_ui(
-                        self.progress_bar_messages["Ultimo"],
-                        int(step_number / self.total_steps * 100)
-                    )
-                    fig, fig_2d_list = self.plotly_engine.result_builder_orchestrator(
-                        geometric_solution,
-                        self.x_total, self.y_total, self.z_total,
-                        self.hover_text_total, self.color_total, self.is_capped_total,
-                        self.plotly_data_subsets,
-                        self.path_to_exe,
-                        self.input_file_name,
-                        self.file_name_no_extension,
-                        self.html_folder_path,
-                        self.excel_folder_path
-                    )
-                    if self.generate_pdf:
-                        interaction_diagram = fig if geometric_solution.problema["tipo"] == "2D" else fig_2d_list
-                        engine = ACSAHEReportEngine(
-                            template_path=f'{self.path_to_exe}/build/pdf/ACSAHE Report Template.docx',
-                            geometric_solution=geometric_solution,
-                            plots={"[Gráfico de la sección]": self.plotly_engine.section_fig,
-                                "[Resultado del diagrama de interacción]":  interaction_diagram},
-                            filename=f'{self.input_file_name}',
-                        )
-                        engine.build_report()
-                        engine.save_report(f"{self.pdf_folder_path}/{self.file_name_no_extension}.docx")
-                    if self.generate_excel:
-                        pass
-
-                    self.update_ui(f"ACSAHE ha finalizado!", progress_bar_value=100)
-                    QApplication.processEvents()
-            self.geometric_solution.excel_manager.close()
+            self._process_ui_events()
+
+            with self._timed_stage("diagramas"):
+                self.plotly_data_subsets = {}
+                interaction_surface = self._get_interaction_surface()
+                self.interaction_diagrams = dict(
+                    self._solve_loading_path_angles(loading_path_angles, interaction_surface))
+
+            verifies_load_combinations = geometric_solution.problema["verificacion"] if (
+                    self.verifies_load_combinations is None) else self.verifies_load_combinations
+            if verifies_load_combinations:
+                with self._timed_stage("verificacion"):
+                    self.load_combination_results = verify_load_combinations(
+                        geometric_solution.problema, list(self.interaction_diagrams.values()))
+
+            if self.builds_results:
+                with self._timed_stage("resultados"):
+                    self.build_results(loading_path_angles)
+
+            self.update_ui(f"ACSAHE ha finalizado!", progress_bar_value=100)
+            self._process_ui_events()
+            self.geometric_solution.close_input_file()
         except Exception as e:
             self.update_ui(f"ERROR: {e}!", progress_bar_value=100)
             traceback.print_exc()
-            if hasattr(self, "geometric_solution"):
-                self.geometric_solution.excel_manager.close()
+            if self.geometric_solution is not None:
+                self.geometric_solution.close_input_file()
             raise e
 
-    def _update_progress_message(self, step_number, angle):
-        progress = int(step_number / self.total_steps * 100)
-        if step_number == 1:
-            message = self.progress_bar_messages["Inicio"].format(plano_de_carga=angle)
-        else:
-            message = self.progress_bar_messages["Medio"].format(plano_de_carga=angle)
+    def build_results(self, loading_path_angles):
+        """Gathers the plot data of every loading plane angle and builds the interactive plots, and the report and
+        Excel results if requested."""
+        geometric_solution = self.geometric_solution
+        for angle in loading_path_angles:
+            partial_2d_solution = self.interaction_diagrams[angle]
+
+            coordinates_3d, colors_partial, is_capped_partial = geometric_solution.get_3d_coordinates(
+                partial_2d_solution.interaction_diagram_points_list)
+            x_partial, y_partial, z_partial, phi_partial = coordinates_3d
+            is_phi_constant = isinstance(geometric_solution.problema["phi_variable"], float)
+
+            # Extract plane indices for hover text (plano_de_deformacion[3] is the index)
+            plane_indices = [point["plano_de_deformacion"][3] for point in
+                             partial_2d_solution.interaction_diagram_points_list]
+
+            hover_text_partial = self._get_hover_text(
+                x_partial, y_partial, z_partial, phi_partial, angle, is_phi_constant, plane_indices)
+
+            self.plotly_data_subsets[str(angle)] = {
+                "x": x_partial.copy(),
+                "y": y_partial.copy(),
+                "z": z_partial.copy(),
+                "phi": phi_partial.copy(),
+                "text": hover_text_partial.copy(),
+                "color": colors_partial.copy(),
+                "is_capped": is_capped_partial.copy(),
+                "plane_indices": plane_indices.copy()
+            }
+
+            self.x_total.extend(x_partial)
+            self.y_total.extend(y_partial)
+            self.z_total.extend(z_partial)
+            self.hover_text_total.extend(hover_text_partial)
+            self.color_total.extend(colors_partial)
+            self.is_capped_total.extend(is_capped_partial)
+
+            self.nominal_x_total.extend((np.array(x_partial) / np.array(phi_partial)).tolist())
+            self.nominal_y_total.extend((np.array(y_partial) / np.array(phi_partial)).tolist())
+            self.nominal_z_total.extend((np.array(z_partial) / np.array(phi_partial)).tolist())
+
+        self.update_ui(
+            self.progress_bar_messages["Ultimo"],
+            int((self.total_steps - 1) / self.total_steps * 100)
+        )
+        fig, fig_2d_list = self.plotly_engine.result_builder_orchestrator(
+            geometric_solution,
+            self.x_total, self.y_total, self.z_total,
+            self.hover_text_total, self.color_total, self.is_capped_total,
+            self.plotly_data_subsets,
+            self.path_to_exe,
+            self.input_file_name,
+            self.file_name_no_extension,
+            self.html_folder_path,
+            self.excel_folder_path
+        )
+        if self.generate_pdf:
+            from report.report_engine import ACSAHEReportEngine
+            interaction_diagram = fig if geometric_solution.problema["tipo"] == "2D" else fig_2d_list
+            engine = ACSAHEReportEngine(
+                template_path=f'{self.path_to_exe}/build/pdf/ACSAHE Report Template.docx',
+                geometric_solution=geometric_solution,
+                plots={"[Gráfico de la sección]": self.plotly_engine.section_fig,
+                    "[Resultado del diagrama de interacción]":  interaction_diagram},
+                filename=f'{self.input_file_name}',
+            )
+            engine.build_report()
+            engine.save_report(f"{self.pdf_folder_path}/{self.file_name_no_extension}.docx")
+        if self.generate_excel:
+            pass
+
+    def _get_interaction_surface(self):
+        """Sweeps the interaction surface when requested for a 3D problem, otherwise returns None."""
+        if self.geometric_solution.problema["tipo"] != "3D" or not self.solver_options.get("neutral_axis_sweep"):
+            return None
+        self.update_ui("Geometría completada. Construyendo superficie de interacción ...", 10)
+        return InteractionSurfaceSweep(
+            self.geometric_solution, self.solver_options.get("sweep_theta_step", DEFAULT_SWEEP_THETA_STEP),
+            concrete_integration=self.solver_options.get("concrete_integration", "auto"))
+
+    def _solve_loading_path_angles(self, loading_path_angles, interaction_surface):
+        """Builds the diagrams of all loading plane angles concurrently (see solve_load_plane_angles), reporting the
+        progress as each of them is completed. With the "processes" backend, a single process pool is shared by all
+        the angles. Angles whose diagram is the mirror image of another one, by a symmetry of the section, are not
+        solved but mirrored (see group_symmetric_load_plane_angles)."""
+        options = self.solver_options
+        process_pool = None
+        if interaction_surface is None and options.get("backend") == "processes":
+            process_pool = StrainPlaneProcessPool.from_geometric_solution(
+                self.geometric_solution, UniaxialInteractionDiagram, options.get("max_workers"),
+                concrete_integration=options.get("concrete_integration", "auto"))
+
+        uniaxial_angles = {angle: angle if angle != -1 else 0.00 for angle in loading_path_angles}
+        angles_to_solve, mirrored_angles = group_symmetric_load_plane_angles(
+            uniaxial_angles, self.geometric_solution.symmetry)
+
+        def build_diagram(angle):
+            uniaxial_angle = uniaxial_angles[angle]
+            if interaction_surface is not None:
+                return interaction_surface.get_uniaxial_diagram(uniaxial_angle)
+            return UniaxialInteractionDiagram(
+                uniaxial_angle, self.geometric_solution,
+                adaptive_tolerance=options.get("adaptive_tolerance"),
+                backend=options.get("backend", "threads"),
+                max_workers=options.get("max_workers"),
+                chunk_size=options.get("chunk_size"),
+                process_pool=process_pool,
+                concrete_integration=options.get("concrete_integration", "auto"))
+
+        self.update_ui(self.progress_bar_messages["Inicio"].format(cantidad=len(loading_path_angles)),
+                       int(1 / self.total_steps * 100))
+        try:
+            with process_pool if process_pool is not None else contextlib.nullcontext():
+                diagrams = dict(solve_load_plane_angles(
+                    angles_to_solve, build_diagram, max_workers=options.get("load_plane_workers"),
+                    on_angle_solved=lambda angle, solved_count, _: self._update_progress_message(
+                        angle, solved_count, len(loading_path_angles)),
+                    backend=options.get("backend", "threads")))
+        except Exception as e:
+            show_message(e)  # From this thread, not from the worker thread where the diagram failed.
+            raise e
+        for solved_count, (angle, (source_angle, swaps_strain_planes, moment_signs)) in enumerate(
+                mirrored_angles.items(), start=len(angles_to_solve) + 1):
+            diagrams[angle] = MirroredUniaxialInteractionDiagram(
+                uniaxial_angles[angle], diagrams[source_angle], swaps_strain_planes, moment_signs)
+            self._update_progress_message(angle, solved_count, len(loading_path_angles))
+        return [(angle, diagrams[angle]) for angle in loading_path_angles]
+
+    def _update_progress_message(self, angle, solved_count, total_count):
+        progress = int(solved_count / self.total_steps * 100)
+        message = self.progress_bar_messages["Medio"].format(
+            plano_de_carga=angle, resueltos=solved_count, total=total_count)
         self.update_ui(message, progress)
 
     def _get_hover_text(self, x_partial, y_partial, z_partial, phi_partial, angle, is_phi_constant, plane_indices=None):
@@ -0,0 +1,52 @@
+"""Micro-benchmark of the extreme fiber queries of the interaction diagram solver.
+
+Compares, for rectangular meshes of increasing size, the cost per neutral axis inclination of finding the extreme
+fiber distances by scanning every fiber against the convex hull index (ExtremeFiberIndex), queried one inclination at
+a time and in batches of BATCH_SIZE inclinations. Run from the repository root:
+
+    python -m benchmarks.extreme_fiber_benchmark
+"""
+import math
+import timeit
+
+import numpy as np
+
+from geometry.convex_hull_index import ExtremeFiberIndex
+
+MESH_SIZES = (10, 30, 100, 300)  # Fibers per side of a square mesh.
+REPETITIONS = 2000
+BATCH_SIZE = 700
+
+
+def get_square_mesh(fibers_per_side, side_length=50.0):
+    coordinates = (np.arange(fibers_per_side) + 0.5) * side_length / fibers_per_side - side_length / 2
+    x, y = np.meshgrid(coordinates, coordinates)
+    return x.ravel(), y.ravel()
+
+
+def scan_extreme_distances(x, y, sin_theta, cos_theta):
+    distances = -x * sin_theta + y * cos_theta
+    return distances.max(), distances.min()
+
+
+def run_benchmark():
+    sin_theta, cos_theta = math.sin(math.radians(37)), math.cos(math.radians(37))
+    thetas = np.radians(np.linspace(0, 360, BATCH_SIZE, endpoint=False))
+    batch_sin_theta, batch_cos_theta = np.sin(thetas), np.cos(thetas)
+    print("Costo por inclinación:")
+    print(f"{'Fibras':>10} {'Vértices':>10} {'Barrido [µs]':>14} {'Índice [µs]':>14} {'Índice lote [µs]':>18}")
+    for fibers_per_side in MESH_SIZES:
+        x, y = get_square_mesh(fibers_per_side)
+        index = ExtremeFiberIndex(x, y)
+        assert np.allclose(index.get_extreme_distances(sin_theta, cos_theta),
+                           scan_extreme_distances(x, y, sin_theta, cos_theta))
+        scan_time = timeit.timeit(lambda: scan_extreme_distances(x, y, sin_theta, cos_theta), number=REPETITIONS)
+        index_time = timeit.timeit(lambda: index.get_extreme_distances(sin_theta, cos_theta), number=REPETITIONS)
+        batch_time = timeit.timeit(lambda: index.get_extreme_distances(batch_sin_theta, batch_cos_theta),
+                                   number=REPETITIONS // 100)
+        print(f"{len(x):>10} {len(index.x):>10} {scan_time / REPETITIONS * 1e6:>14.1f} "
+              f"{index_time / REPETITIONS * 1e6:>14.1f} {batch_time / (REPETITIONS // 100) / BATCH_SIZE * 1e6:>18.2f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -1,15 +1,36 @@
-import xlwings as xw
 import os
 import shutil
+import sys
 import tempfile
 import unicodedata
 from pathlib import Path
 
+try:
+    import xlwings as xw
+except ImportError:  # Only the openpyxl backend is available (e.g. on Linux).
+    xw = None
+
+# Backends of ExcelManager: xlwings drives a running Excel application, openpyxl reads and writes the file directly
+# (see build/utils/openpyxl_workbook.py).
+EXCEL_BACKENDS = ("xlwings", "openpyxl")
+
+
+def get_default_excel_backend():
+    """xlwings where Excel can run (Windows and macOS, with xlwings installed), openpyxl otherwise."""
+    return "xlwings" if xw is not None and sys.platform in ("win32", "darwin") else "openpyxl"
+
 
 class ExcelSheetManager:
 
-    def __init__(self, sheet, rows_range=None, columns_range=None):
+    def __init__(self, sheet, rows_range=None, columns_range=None, snapshot=False):
+        """:param snapshot: the used range of the sheet is read in a single call on the first read, and every read and
+        lookup is then answered from memory, with an index of the cells by value. Only for sheets that are not modified
+        through this manager."""
         self.sh = sheet
+        self.snapshot = snapshot
+        self.snapshot_values = None  # Rows of values of the used range, from A1.
+        self.snapshot_index = None  # {value: [(row, column), ...]}, row and column numbers from 1, by rows.
+        self.snapshot_text_index = None  # As snapshot_index, by the text of the values (see find_cell_by_value).
         self.default_columns_range_value = columns_range or tuple([chr(x) for x in range(65, 65 + 7)])  # A to G
         self.default_rows_range_value = rows_range or self._detect_last_row()
 
@@ -24,11 +45,64 @@ class ExcelSheetManager:
             print("Excel sheet values will be capped to 3000")
             return (1, 3000)  # fallback in case Excel is empty or throws error
 
+    def _take_snapshot(self):
+        last_cell = self.sh.used_range.last_cell
+        values = self.sh.range(f"A1:{self.col_num_to_letter(last_cell.column)}{last_cell.row}").value
+        if last_cell.row == 1 and last_cell.column == 1:
+            values = [[values]]
+        elif last_cell.row == 1:
+            values = [values]
+        elif last_cell.column == 1:
+            values = [[value] for value in values]
+        self.snapshot_values = values
+
+        self.snapshot_index, self.snapshot_text_index = {}, {}
+        for i, row in enumerate(values):
+            for j, value in enumerate(row):
+                if value is not None:
+                    self.snapshot_index.setdefault(value.strip() if isinstance(value, str) else value, []).append(
+                        (i + 1, j + 1))
+                    self.snapshot_text_index.setdefault(str(value).strip(), []).append((i + 1, j + 1))
+
+    def _get_snapshot_value(self, column_number, row_number):
+        if self.snapshot_values is None:
+            self._take_snapshot()
+        if row_number > len(self.snapshot_values) or column_number > len(self.snapshot_values[0]):
+            return None
+        return self.snapshot_values[row_number - 1][column_number - 1]
+
+    def _get_snapshot_cells(self, wanted_value, by_text=False):
+        """(row, column) numbers of the cells with the value, by rows.
+        :param by_text: cells whose text is wanted_value, whatever their type (e.g. 5 for "5"), as find_cell_by_value
+        compares them. Otherwise, cells equal to wanted_value, strings being stripped."""
+        if self.snapshot_index is None:
+            self._take_snapshot()
+        if by_text:
+            return self.snapshot_text_index.get(wanted_value, []) if isinstance(wanted_value, str) else []
+        return self.snapshot_index.get(wanted_value, [])
+
+    def _find_snapshot_row(self, wanted_value, columns_range, rows_range, by_text=False):
+        """Column and row of the first cell with the value, searching column by column (as find_cell_by_value).
+        :param by_text: see _get_snapshot_cells."""
+        cells = self._get_snapshot_cells(wanted_value, by_text)
+        for column in columns_range:
+            column_number = self.col_letter_to_num(column)
+            for row_number, cell_column_number in cells:
+                if cell_column_number == column_number and rows_range[0] <= row_number <= rows_range[-1]:
+                    return column, row_number
+        return None, None
+
     def get_value(self, column, row):
+        if self.snapshot:
+            return self._get_snapshot_value(self.col_letter_to_num(column), int(row))
         return self.sh.range(f"{column}{row}").value
 
     def get_values_in_range(self, col_start, col_end, row_start, row_end):
         """Returns 2D list of values from a rectangular Excel range."""
+        if self.snapshot:
+            return [[self._get_snapshot_value(column_number, row_number)
+                     for column_number in range(self.col_letter_to_num(col_start), self.col_letter_to_num(col_end) + 1)]
+                    for row_number in range(row_start, row_end + 1)]
         range_str = f"{col_start}{row_start}:{col_end}{row_end}"
         values = self.sh.range(range_str).value
 
@@ -40,6 +114,8 @@ class ExcelSheetManager:
 
     def get_column_values(self, column, row_start, row_end):
         """Returns 1D list of values in a single Excel column."""
+        if self.snapshot:
+            return [row[0] for row in self.get_values_in_range(column, column, row_start, row_end)]
         values = self.sh.range(f"{column}{row_start}:{column}{row_end}").value
         return values if isinstance(values, list) else [values]
 
@@ -60,6 +136,9 @@ class ExcelSheetManager:
         if rows_range is None:
             rows_range = self.default_rows_range_value
 
+        if self.snapshot:
+            return self._find_snapshot_row(wanted_value, columns_range, rows_range, by_text=True)
+
         row_start, row_end = rows_range[0], rows_range[-1]
         for column in columns_range:
             values = self.get_column_values(column, row_start, row_end)
@@ -82,6 +161,10 @@ class ExcelSheetManager:
         col_start = self.default_columns_range_value[0]
         col_end = self.default_columns_range_value[-1]
 
+        if self.snapshot:
+            return self._get_snapshot_cell_address_on_the_right(
+                wanted_value, row_start, row_end, col_start, col_end, n_column, row_offset, column_offset)
+
         values = self.get_values_in_range(col_start, col_end, row_start, row_end)
 
         for i, row in enumerate(values):
@@ -91,11 +174,24 @@ class ExcelSheetManager:
                     target_col = j + n_column + column_offset
                     target_row = i + row_offset
                     if 0 <= target_col < len(row) and 0 <= target_row < len(values):
-                        return xw.utils.col_name(target_col+1), target_row + row_start
+                        return self.col_num_to_letter(target_col+1), target_row + row_start
                     else:
                         return None
         return None
 
+    def _get_snapshot_cell_address_on_the_right(self, wanted_value, row_start, row_end, col_start, col_end, n_column,
+                                                row_offset, column_offset):
+        """get_cell_address_on_the_right, from the first cell with the value (by rows) in the index."""
+        col_start_number, col_end_number = self.col_letter_to_num(col_start), self.col_letter_to_num(col_end)
+        for row_number, column_number in self._get_snapshot_cells(wanted_value):
+            if row_start <= row_number <= row_end and col_start_number <= column_number <= col_end_number:
+                target_col = column_number - col_start_number + n_column + column_offset
+                target_row = row_number - row_start + row_offset
+                if 0 <= target_col <= col_end_number - col_start_number and 0 <= target_row <= row_end - row_start:
+                    return self.col_num_to_letter(target_col+1), target_row + row_start
+                return None
+        return None
+
     def get_n_rows_after_value(self, wanted_value, number_of_rows_after_value,
                                columns_range=None, rows_range=None):
         if columns_range is None:
@@ -103,6 +199,10 @@ class ExcelSheetManager:
         if rows_range is None:
             rows_range = self.default_rows_range_value
 
+        if self.snapshot:
+            found_row = self._find_snapshot_row(wanted_value, columns_range, rows_range)[1]
+            return list(range(found_row, found_row + number_of_rows_after_value)) if found_row else []
+
         start_row = rows_range[0]
         end_row = rows_range[-1]
 
@@ -129,6 +229,11 @@ class ExcelSheetManager:
         if rows_range is None:
             rows_range = self.default_rows_range_value
         start_value, end_value = wanted_values_tuple
+        if self.snapshot:
+            range_start = self._find_snapshot_row(start_value, columns_range, rows_range)[1]
+            range_end = self._find_snapshot_row(end_value, columns_range, rows_range)[1]
+            return list(range(range_start, range_end)) if range_start and range_end else []
+
         range_start = range_end = 0
         row_start, row_end = rows_range[0], rows_range[-1]
         for column in columns_range:
@@ -163,12 +268,7 @@ class ExcelSheetManager:
         subrange_start = None
 
         # Read the full column range in one call
-        col_range_str = f"{column_letter}{row_range[0]}:{column_letter}{row_range[-1]}"
-        values = self.sh.range(col_range_str).value
-
-        # Normalize to a list (Excel may return a single value for 1 row)
-        if not isinstance(values, list):
-            values = [values]
+        values = self.get_column_values(column_letter, row_range[0], row_range[-1])
 
         # Strip and search
         for i, cell_value in enumerate(values):
@@ -315,8 +415,8 @@ class ExcelSheetManager:
         if last_column_letter < start_column_number:
             last_column_letter = start_column_number
 
-        start_column_letter = xw.utils.col_name(start_column_number)
-        last_column_letter = xw.utils.col_name(last_column_letter+offset)
+        start_column_letter = self.col_num_to_letter(start_column_number)
+        last_column_letter = self.col_num_to_letter(last_column_letter+offset)
 
         # Define the range to clear
         range_to_clear = f"{start_column_letter}:{last_column_letter}"
@@ -331,11 +431,11 @@ class ExcelSheetManager:
             last_column_index = self.sh.range('XFD2').end('left').column
             if last_column_index < start_column_number:
                 last_column_index = start_column_number
-            last_column_letter = xw.utils.col_name(last_column_index + offset)
+            last_column_letter = self.col_num_to_letter(last_column_index + offset)
         else:
-            last_column_letter = xw.utils.col_name(start_column_number + offset)
+            last_column_letter = self.col_num_to_letter(start_column_number + offset)
 
-        start_column_letter = xw.utils.col_name(start_column_number)
+        start_column_letter = self.col_num_to_letter(start_column_number)
 
         # Define the range to clear (entire columns, but just values)
         range_to_clear = f"{start_column_letter}{start_row}:{last_column_letter}{end_row}"
@@ -382,9 +482,16 @@ class ExcelSheetManager:
 
 
 class ExcelManager:
-    def __init__(self, file_path, read_only=True, visible=False):
+    def __init__(self, file_path, read_only=True, visible=False, backend=None):
+        """:param backend: one of EXCEL_BACKENDS. By default, see get_default_excel_backend."""
         self.read_only = read_only
-        if read_only is True:
+        self.backend = backend or get_default_excel_backend()
+        if self.backend not in EXCEL_BACKENDS:
+            raise ValueError(f"Backend de Excel desconocido: {self.backend}. Opciones: {', '.join(EXCEL_BACKENDS)}.")
+        if self.backend == "openpyxl":
+            from build.utils.openpyxl_workbook import OpenpyxlWorkbook
+            self.wb = OpenpyxlWorkbook(file_path, read_only=read_only is True)
+        elif read_only is True:
             self.app = xw.App(visible=visible)
             self.app.display_alerts = False
             self.app.screen_updating = read_only
@@ -394,8 +501,11 @@ class ExcelManager:
             self.wb = xw.Book(file_path)
             self.wb.save()
 
-    def get_sheet(self, sheet_name):
-        return ExcelSheetManager(self.wb.sheets[sheet_name])
+    def get_sheet(self, sheet_name, snapshot=None):
+        """:param snapshot: see ExcelSheetManager. By default, for the sheets of read-only workbooks."""
+        if snapshot is None:
+            snapshot = self.read_only is True
+        return ExcelSheetManager(self.wb.sheets[sheet_name], snapshot=snapshot)
 
     def close(self, save=True):
         if save and not self.read_only:
@@ -484,7 +594,7 @@ class ExcelManager:
                 sheet_manager.sh.range(single_value_modifications[0]).value = single_value_modifications[1]
 
 
-def create_workbook_from_template(template_path, target_path, sheet_name=None):
+def create_workbook_from_template(template_path, target_path, sheet_name=None, backend=None):
     """
     Copies the first sheet of a template and saves it as a new file.
 
@@ -492,12 +602,17 @@ def create_workbook_from_template(template_path, target_path, sheet_name=None):
         template_path (str): full path to the Excel template file.
         target_path (str): path where the new file should be saved.
         sheet_name (str): optional name for the copied sheet.
+        backend (str): one of EXCEL_BACKENDS, used to rename the sheet. By default, see get_default_excel_backend.
     """
     # Make a physical copy of the file to preserve formatting, styles, macros, etc.
     shutil.copyfile(template_path, target_path)
 
     # Rename the sheet if needed
-    if sheet_name:
+    if sheet_name and (backend or get_default_excel_backend()) == "openpyxl":
+        manager = ExcelManager(target_path, read_only=False, backend="openpyxl")
+        manager.wb.sheets[0].name = sheet_name
+        manager.close()
+    elif sheet_name:
         app = xw.App(visible=False)
         wb = app.books.open(target_path)
         wb.sheets[0].name = sheet_name
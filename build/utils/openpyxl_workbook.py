@@ -0,0 +1,203 @@
+"""
+OPENPYXL WORKBOOK
+=================
+
+Workbook read and written directly from the file with openpyxl, with no Excel application running: the "openpyxl"
+backend of ExcelManager.
+
+The classes below implement the subset of the xlwings Book / Sheet / Range interface used by ExcelManager and
+ExcelSheetManager (sheets by name or position, range(...).value, used_range, clear_contents, sheet copy and renaming),
+so the sheet managers work unchanged on both backends. Numbers are returned as float, as xlwings does.
+
+In read-only mode the workbook is opened in values mode: the values are the ones Excel cached when the file was last
+saved, and each sheet is read once into memory on its first access. In write mode the formulas are kept, and .xlsm
+macros are preserved on save. Formatting, pictures and range copies are only available with xlwings.
+"""
+
+import re
+from io import BytesIO
+from zipfile import ZipFile, ZIP_DEFLATED
+
+import openpyxl
+from openpyxl.cell.cell import MergedCell
+from openpyxl.utils import column_index_from_string
+
+CELL_ADDRESS_PATTERN = re.compile(r"^([A-Za-z]+)(\d+)$")
+
+
+def get_cell_coordinates(cell_address):
+    """(row, column) numbers, from 1, of an 'A1' cell address."""
+    match = CELL_ADDRESS_PATTERN.match(cell_address.replace("$", ""))
+    if match is None:
+        raise ValueError(f"Dirección de celda no soportada por el backend openpyxl: {cell_address}")
+    return int(match.group(2)), column_index_from_string(match.group(1).upper())
+
+
+def get_excel_value(value):
+    """Value as returned by xlwings: numbers as float."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def get_archive_with_closed_vml_tags(archive):
+    """In-memory copy of the original file kept by openpyxl for macro workbooks, with the line breaks of the VML
+    drawings (comments and form control captions) as closed XML tags. Excel writes them as HTML '<br>', and openpyxl
+    fails to parse the drawings when saving a sheet with comments."""
+    buffer = BytesIO()
+    with ZipFile(buffer, "w", ZIP_DEFLATED) as archive_copy:
+        for name in archive.namelist():
+            content = archive.read(name)
+            archive_copy.writestr(name, content.replace(b"<br>", b"<br/>") if name.endswith(".vml") else content)
+    archive.close()
+    return ZipFile(buffer)
+
+
+class OpenpyxlWorkbook:
+    def __init__(self, file_path, read_only=True):
+        self.file_path = str(file_path)
+        self.read_only = read_only
+        self.book = openpyxl.load_workbook(
+            self.file_path, read_only=read_only, data_only=read_only, keep_links=False,
+            keep_vba=not read_only and self.file_path.lower().endswith(".xlsm"))
+        if self.book.vba_archive is not None:
+            self.book.vba_archive = get_archive_with_closed_vml_tags(self.book.vba_archive)
+        self.sheets = OpenpyxlSheets(self)
+
+    def save(self):
+        if not self.read_only:
+            self.book.save(self.file_path)
+
+    def close(self):
+        if self.read_only:
+            self.book.close()  # Releases the file handle kept by the read-only mode.
+
+
+class OpenpyxlSheets:
+    """Sheets of the workbook, by name or position (as xlwings' Book.sheets)."""
+
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self._sheets = {}
+
+    def __getitem__(self, key):
+        worksheet = self.workbook.book.worksheets[key] if isinstance(key, int) else self.workbook.book[key]
+        if id(worksheet) not in self._sheets:
+            self._sheets[id(worksheet)] = OpenpyxlSheet(worksheet, self.workbook)
+        return self._sheets[id(worksheet)]
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __len__(self):
+        return len(self.workbook.book.worksheets)
+
+
+class OpenpyxlSheet:
+    def __init__(self, worksheet, workbook):
+        self.worksheet = worksheet
+        self.workbook = workbook
+        self._values = None  # Rows of values, read once in read-only mode.
+
+    @property
+    def name(self):
+        return self.worksheet.title
+
+    @name.setter
+    def name(self, value):
+        self.worksheet.title = value
+
+    @property
+    def used_range(self):
+        return OpenpyxlRange(self, 1, 1, max(self.get_last_row(), 1), max(self.get_last_column(), 1))
+
+    def get_last_row(self):
+        return len(self.get_values()) if self.workbook.read_only else self.worksheet.max_row
+
+    def get_last_column(self):
+        return max((len(row) for row in self.get_values()), default=0) if self.workbook.read_only else (
+            self.worksheet.max_column)
+
+    def get_values(self):
+        if self._values is None:
+            self._values = [[get_excel_value(value) for value in row]
+                            for row in self.worksheet.iter_rows(values_only=True)]
+        return self._values
+
+    def get_value(self, row, column):
+        if not self.workbook.read_only:
+            return get_excel_value(self.worksheet.cell(row=row, column=column).value)
+        values = self.get_values()
+        if row > len(values) or column > len(values[row - 1]):
+            return None
+        return values[row - 1][column - 1]
+
+    def set_value(self, row, column, value):
+        if self.workbook.read_only:
+            raise ValueError("El libro fue abierto en modo de solo lectura.")
+        cell = self.worksheet.cell(row=row, column=column)
+        if isinstance(cell, MergedCell):  # Only the first cell of a merged range holds its value.
+            if value is None:
+                return
+            raise ValueError(f"No se puede escribir en la celda {cell.coordinate} de la hoja {self.name}: forma parte "
+                             f"de un rango de celdas combinadas.")
+        cell.value = value
+
+    def range(self, address):
+        cells = address.split(":")
+        first_row, first_column = get_cell_coordinates(cells[0])
+        last_row, last_column = get_cell_coordinates(cells[-1])
+        return OpenpyxlRange(self, first_row, first_column, last_row, last_column)
+
+    def copy(self, after=None):
+        """Copy of the sheet, added as the last one of the workbook."""
+        return self.workbook.sheets[self.workbook.book.worksheets.index(
+            self.workbook.book.copy_worksheet(self.worksheet))]
+
+
+class OpenpyxlRange:
+    def __init__(self, sheet, first_row, first_column, last_row, last_column):
+        self.sheet = sheet
+        self.first_row, self.first_column = first_row, first_column
+        self.last_row, self.last_column = last_row, last_column
+
+    @property
+    def row(self):
+        return self.first_row
+
+    @property
+    def column(self):
+        return self.first_column
+
+    @property
+    def last_cell(self):
+        return OpenpyxlRange(self.sheet, self.last_row, self.last_column, self.last_row, self.last_column)
+
+    @property
+    def value(self):
+        """Single value for one cell, list for a single row or column and list of rows otherwise (as xlwings)."""
+        rows = [[self.sheet.get_value(row, column) for column in range(self.first_column, self.last_column + 1)]
+                for row in range(self.first_row, self.last_row + 1)]
+        if len(rows) == 1 and len(rows[0]) == 1:
+            return rows[0][0]
+        if len(rows) == 1:
+            return rows[0]
+        if self.first_column == self.last_column:
+            return [row[0] for row in rows]
+        return rows
+
+    @value.setter
+    def value(self, values):
+        """Writes from the first cell of the range: a list of rows, a list along a row, or a single value."""
+        if not isinstance(values, (list, tuple)):
+            values = [[values]]
+        elif not values or not isinstance(values[0], (list, tuple)):
+            values = [values]
+        for i, row_values in enumerate(values):
+            for j, value in enumerate(row_values):
+                self.sheet.set_value(self.first_row + i, self.first_column + j, value)
+
+    def clear_contents(self):
+        for row in range(self.first_row, self.last_row + 1):
+            for column in range(self.first_column, self.last_column + 1):
+                self.sheet.set_value(row, column, None)
@@ -7,10 +7,10 @@ import tempfile
 import webbrowser
 from pathlib import Path
 from typing import Any, Dict
-from tkinter import messagebox
 
 from plot.html.html_engine import ACSAHEHtmlEngine
 from build.utils.excel_manager import ExcelManager, create_workbook_from_template
+from build.utils.user_messages import show_message
 
 
 class ACSAHEPlotlyEngine(object):
@@ -146,30 +146,48 @@ class ACSAHEPlotlyEngine(object):
                 self.plot_annular_sector(
                     region,arc_division=150, color=color, transparency=1, thickness=4)
 
-        x_centroide = []
-        y_centroide = []
-        for element in seccion.elements_list:
-            if element.tipo == "Poligonal":
-                self.plot_positive_polygon(element, color=color, transparencia=0.2, thickness=1)
-            else:
-                self.plot_annular_sector(element,
-                                         arc_division=100,
-                                         color=color,
-                                         transparency=0.2,
-                                         thickness=1)
-
-            x_centroide.append(element.xg)
-            y_centroide.append(element.yg)
+        fibers = seccion.fibers
+        self.plot_polygon_fibers(fibers, color=color, transparencia=0.2, thickness=1)
+        self.plot_sector_fibers(fibers, arc_division=100, color=color, transparency=0.2, thickness=1)
 
         self.fig.add_trace(
             go.Scatter(
-                dict(x=x_centroide, y=y_centroide, mode="markers", marker=dict(color=color, size=2),
+                dict(x=fibers.xg, y=fibers.yg, mode="markers", marker=dict(color=color, size=2),
                      hoverinfo='skip',
                      showlegend=False,
                      )))
 
         self.plot_axes_and_equivalent_force_line(seccion, lista_de_angulos_plano_de_carga)
 
+    def plot_polygon_fibers(self, fibers, color, thickness, transparencia):
+        """Outlines of all the polygonal fibers of a FiberSection, in a single trace."""
+        x_combined, y_combined = fibers.get_polygon_outlines()
+        if x_combined:
+            self.fig.add_trace(go.Scatter(
+                x=x_combined,
+                y=y_combined,
+                showlegend=False,
+                opacity=transparencia,
+                line=dict(width=thickness, color=color),
+                hoverinfo='skip',
+                mode='lines'
+            ))
+
+    def plot_sector_fibers(self, fibers, arc_division=100, color="Cyan", thickness=None, transparency=1.00):
+        """Outlines of the annular sector fibers of a FiberSection (see plot_annular_sector)."""
+        for xc, yc, internal_radius, external_radius, start_angle, end_angle in fibers.sector_parameters.tolist():
+            for radius in (external_radius, internal_radius):
+                if radius > 0:
+                    self.fig.add_trace(self.plotly_arc(
+                        xc, yc, radius, start_angle, end_angle, arc_division, color, thickness, transparency))
+            if internal_radius > 0:  # Radial sides.
+                for angle in (math.radians(start_angle), math.radians(end_angle)):
+                    self.fig.add_trace(go.Scatter(
+                        x=[xc + internal_radius * math.cos(angle), xc + external_radius * math.cos(angle)],
+                        y=[yc + internal_radius * math.sin(angle), yc + external_radius * math.sin(angle)],
+                        mode='lines', line=dict(color=color, width=thickness, dash='solid'), hoverinfo='skip',
+                        opacity=transparency, showlegend=False))
+
     def plot_axes_and_equivalent_force_line(self, seccion, lista_ang_planos_de_carga):
         lista_ang_planos_de_carga.sort()
         xmin, xmax, ymin, ymax = seccion.x_min, seccion.x_max, seccion.y_min, seccion.y_max
@@ -393,12 +411,12 @@ class ACSAHEPlotlyEngine(object):
         webbrowser.open(f"file://{html_path}")
         if html_folder_path:
             if not os.path.exists(html_folder_path):
-                messagebox.showinfo("Error", path_not_available_msg.format(opt="de guardar su resultado .html"))
+                show_message(path_not_available_msg.format(opt="de guardar su resultado .html"), "Error")
             saved_path = self._save_file_with_increment(html_path, html_folder_path, base_file_name_no_extension,
                                                         ext="html")
         if excel_folder_path:
             if not os.path.exists(excel_folder_path):
-                messagebox.showinfo("Error", path_not_available_msg.format(opt="de guardar su resultado Excel"))
+                show_message(path_not_available_msg.format(opt="de guardar su resultado Excel"), "Error")
             excel_result_path = self._get_file_name_with_increment(excel_folder_path, base_file_name_no_extension,
                                                                    ext="xlsx")
             template_path = context["excel_result_template"]
@@ -0,0 +1,22 @@
+"""Messages shown to the user by the solver (errors, warnings), decoupled from the user interface.
+
+By default they are shown in a tkinter dialog, imported only when a message is shown, so the solver can be imported
+and run without Tk. Headless runs replace the handler (see set_message_handler), e.g. with a logger."""
+
+
+def show_message_box(message, titulo="Mensaje"):
+    from tkinter import messagebox
+    messagebox.showinfo(titulo, message)
+
+
+_message_handler = show_message_box
+
+
+def set_message_handler(handler):
+    """:param handler: function (message, titulo) called by show_message. None restores the tkinter dialog."""
+    global _message_handler
+    _message_handler = handler or show_message_box
+
+
+def show_message(message, titulo="Mensaje"):
+    _message_handler(message, titulo)
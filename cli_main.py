@@ -0,0 +1,160 @@
+"""
+COMMAND-LINE ENTRY POINT
+========================
+
+Runs ACSAHE without user interface (no Qt, Tk nor browser), e.g. on compute nodes or in batch pipelines:
+
+    python cli_main.py seccion_1.json seccion_2.toml seccion_3.xlsm --output-dir resultados --workers 8
+
+The input files may be JSON or TOML structured inputs (see STRUCTURED_INPUT.md), or Excel input workbooks, read
+directly from the file with openpyxl by default: no spreadsheet application is needed. For each input file, the
+geometry, the interaction diagrams and the verification of the load combinations are run, and the results are written
+to <output-dir>/<input file name>.json:
+    - diagramas: the points of the diagram of each loading plane angle, as plotted (P in kN, Mx and My in kNm,
+      compression positive, design values), and the number of strain planes without solution.
+    - verificacion: the demand/capacity ratio of each load combination (see verify_load_combinations).
+    - tiempos: elapsed time in seconds of each step: geometria, diagramas, verificacion and recopilacion (gathering of
+      the results above). Writing the file is not included.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+from acsahe import ACSAHE
+from build.utils.excel_manager import EXCEL_BACKENDS
+from build.utils.user_messages import set_message_handler
+from interaction_diagram.interaction_diagram_builder import SOLVER_BACKENDS, CONCRETE_INTEGRATION_METHODS
+from interaction_diagram.interaction_surface_builder import DEFAULT_SWEEP_THETA_STEP
+
+
+def get_argument_parser():
+    parser = argparse.ArgumentParser(
+        description="Ejecuta ACSAHE sin interfaz gráfica y guarda los resultados de cada archivo en formato JSON.")
+    parser.add_argument("input_files", nargs="+", help="Archivos de entrada de ACSAHE (.json, .toml o Excel).")
+    parser.add_argument("-o", "--output-dir", default="resultados",
+                        help="Carpeta de resultados. Por defecto, 'resultados'.")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="Cantidad de procesos o hilos por diagrama. Por defecto, la cantidad de CPUs.")
+    parser.add_argument("--load-plane-workers", type=int, default=None,
+                        help="Cantidad de planos de carga resueltos en simultáneo. Por defecto, uno con el backend "
+                             "'threads' y la cantidad de CPUs con 'processes'.")
+    parser.add_argument("--excel-backend", choices=EXCEL_BACKENDS, default="openpyxl",
+                        help="Lectura de los archivos Excel de entrada: directamente del archivo (openpyxl, por "
+                             "defecto) o a través de Excel (xlwings).")
+    parser.add_argument("--backend", choices=SOLVER_BACKENDS, default="threads",
+                        help="Ejecución de los planos de deformación en hilos o en procesos.")
+    parser.add_argument("--adaptive-tolerance", type=float, default=None,
+                        help="Refinamiento adaptativo de los planos de deformación, con esta distancia máxima "
+                             "relativa entre puntos consecutivos del diagrama (por ejemplo, 0.05).")
+    parser.add_argument("--concrete-integration", choices=CONCRETE_INTEGRATION_METHODS, default="auto",
+                        help="Integración del bloque de tensiones del hormigón. 'analytic' es exacta pero más lenta "
+                             "que 'fibers' en secciones poligonales; 'auto' la usa sólo con regiones circulares.")
+    parser.add_argument("--neutral-axis-sweep", action="store_true",
+                        help="En problemas 3D, interpola los planos de carga de una única superficie de interacción.")
+    parser.add_argument("--sweep-theta-step", type=float, default=DEFAULT_SWEEP_THETA_STEP,
+                        help="Paso en grados de las inclinaciones del eje neutro barridas.")
+    return parser
+
+
+def get_solver_options(arguments):
+    """solver_options of ACSAHE from the command-line arguments."""
+    return {
+        "max_workers": arguments.workers,
+        "load_plane_workers": arguments.load_plane_workers,
+        "backend": arguments.backend,
+        "adaptive_tolerance": arguments.adaptive_tolerance,
+        "concrete_integration": arguments.concrete_integration,
+        "neutral_axis_sweep": arguments.neutral_axis_sweep,
+        "sweep_theta_step": arguments.sweep_theta_step,
+        "excel_backend": arguments.excel_backend,
+    }
+
+
+def get_diagram_results(angle, diagram):
+    return {
+        "plano_de_carga": angle,
+        "puntos": [{
+            "P": -float(point["sumF"]),
+            "Mx": -float(point["Mx"]) / 100,
+            "My": -float(point["My"]) / 100,
+            "phi": float(point["phi"]),
+            "plano_de_deformacion": [float(value) if isinstance(value, float) else value
+                                     for value in point["plano_de_deformacion"]],
+            "is_capped": bool(point["is_capped"]),
+        } for point in diagram.interaction_diagram_points_list],
+        "planos_sin_solucion": len(diagram.no_solution_points_list),
+    }
+
+
+def get_results(acsahe):
+    return {
+        "archivo": acsahe.input_file_name,
+        "tipo": acsahe.geometric_solution.problema["tipo"],
+        "diagramas": [get_diagram_results(angle, diagram) for angle, diagram in acsahe.interaction_diagrams.items()],
+        "verificacion": acsahe.load_combination_results,
+        "tiempos": acsahe.stage_timings,
+    }
+
+
+def log_progress(message, value):
+    if message:
+        logging.info(message)
+
+
+def run_input_file(input_file, output_dir, solver_options):
+    """Runs ACSAHE on an input file and writes its results.
+    :return: path of the results file and elapsed time of each step, as written to the file."""
+    input_file_name = os.path.basename(input_file)
+    acsahe = ACSAHE(
+        app_gui=None,
+        input_file_name=input_file_name,
+        path_to_input_file=os.path.abspath(input_file),
+        solver_options=solver_options,
+        on_progress=log_progress,
+        builds_results=False,
+        verifies_load_combinations=True)
+
+    start = time.perf_counter()
+    results = get_results(acsahe)
+    acsahe.stage_timings["recopilacion"] = time.perf_counter() - start
+    results["tiempos"] = dict(acsahe.stage_timings)  # Recorded before writing, so that the file has every step.
+    output_path = os.path.join(output_dir, f"{acsahe.file_name_no_extension}.json")
+    with open(output_path, "w", encoding="utf-8") as output_file:
+        json.dump(results, output_file, ensure_ascii=False, indent=1)
+    return output_path, results["tiempos"]
+
+
+def main(argv=None):
+    arguments = get_argument_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    set_message_handler(lambda message, titulo: logging.warning(f"{titulo}: {message}"))
+    os.makedirs(arguments.output_dir, exist_ok=True)
+    solver_options = get_solver_options(arguments)
+
+    failed_files = []
+    for input_file in arguments.input_files:
+        logging.info(f"Procesando {input_file} ...")
+        try:
+            output_path, stage_timings = run_input_file(input_file, arguments.output_dir, solver_options)
+        except Exception as e:
+            logging.error(f"Error en {input_file}: {e}")
+            failed_files.append(input_file)
+            continue
+        timings = ", ".join(f"{stage} {elapsed:.2f} s" for stage, elapsed in stage_timings.items())
+        logging.info(f"Resultados guardados en {output_path} ({timings}).")
+
+    if failed_files:
+        logging.error(f"No se pudieron procesar {len(failed_files)} de {len(arguments.input_files)} archivo(s): "
+                      f"{', '.join(failed_files)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()  # Required by the process-pool solver backend in frozen executables.
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import math
+
+import numpy as np
+
+
+class ExtremeFiberIndex:
+    """Convex hull of a set of fiber positions, answering which fiber is the farthest from a neutral axis of any
+    inclination in O(log h), being h the number of hull vertices (instead of O(n) over all the fibers).
+
+    The extreme fiber along a direction u is always a hull vertex: the one between the two consecutive hull edges whose
+    outward normals enclose u. These normal angles are increasing along the counterclockwise hull, so the vertex is
+    found by binary search."""
+
+    def __init__(self, x, y):
+        self.x, self.y = self.get_convex_hull(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        x_next, y_next = np.roll(self.x, -1), np.roll(self.y, -1)
+        # Outward normal angle of the edge starting at each vertex, made increasing from the first vertex.
+        normal_angles = np.arctan2(-(x_next - self.x), y_next - self.y)
+        self.normal_angles = normal_angles[0] + np.mod(normal_angles - normal_angles[0], 2 * math.pi)
+
+    @classmethod
+    def from_fibers(cls, fibers_list):
+        """Index of a list of bars (or other fibers) with xg and yg attributes. None if the list is empty."""
+        if len(fibers_list) == 0:
+            return None
+        return cls([fiber.xg for fiber in fibers_list], [fiber.yg for fiber in fibers_list])
+
+    @staticmethod
+    def get_convex_hull(x, y):
+        """Counterclockwise vertices of the convex hull of the points (x, y), by Andrew's monotone chain algorithm.
+        Degenerate sets (a single point or collinear points) return their extreme points."""
+        points = sorted(set(zip(x.tolist(), y.tolist())))
+        if len(points) <= 2:
+            return np.array([p[0] for p in points]), np.array([p[1] for p in points])
+
+        def cross(o, a, b):
+            return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+        lower, upper = [], []
+        for point in points:
+            while len(lower) >= 2 and cross(lower[-2], lower[-1], point) <= 0:
+                lower.pop()
+            lower.append(point)
+        for point in reversed(points):
+            while len(upper) >= 2 and cross(upper[-2], upper[-1], point) <= 0:
+                upper.pop()
+            upper.append(point)
+        hull = lower[:-1] + upper[:-1]
+        return np.array([p[0] for p in hull]), np.array([p[1] for p in hull])
+
+    def get_extreme_vertices(self, direction_angle):
+        """Index of the hull vertex farthest along each direction (angles in radians, scalar or array)."""
+        first_angle = self.normal_angles[0]
+        angle = first_angle + np.mod(np.asarray(direction_angle) - first_angle, 2 * math.pi)
+        # The vertex i is the farthest when normal_angles[i - 1] <= angle <= normal_angles[i].
+        return np.searchsorted(self.normal_angles, angle) % len(self.x)
+
+    def get_extreme_distances(self, sin_theta, cos_theta):
+        """Maximum and minimum neutral axis distance (-x·sinθ + y·cosθ) of the fibers, for each inclination θ.
+        The candidate vertex and its neighbours are evaluated, so ties between vertices at the same distance are
+        resolved exactly."""
+        return tuple(distances for distances, _ in self._get_extreme_distances_and_vertices(sin_theta, cos_theta))
+
+    def get_extreme_distance_derivatives(self, sin_theta, cos_theta):
+        """Derivatives with respect to θ of the maximum and minimum neutral axis distances: -(x·cosθ + y·sinθ) at the
+        extreme vertices, which stay the extreme ones for small rotations."""
+        sin_theta, cos_theta = np.asarray(sin_theta, dtype=float), np.asarray(cos_theta, dtype=float)
+        return tuple(-(self.x[vertex] * cos_theta + self.y[vertex] * sin_theta)
+                     for _, vertex in self._get_extreme_distances_and_vertices(sin_theta, cos_theta))
+
+    def _get_extreme_distances_and_vertices(self, sin_theta, cos_theta):
+        sin_theta, cos_theta = np.asarray(sin_theta, dtype=float), np.asarray(cos_theta, dtype=float)
+        direction_angle = np.arctan2(cos_theta, -sin_theta)  # Direction (-sinθ, cosθ) of the distance.
+        shape = direction_angle.shape
+        sin_column, cos_column = np.broadcast_to(sin_theta, shape).reshape(-1, 1), np.broadcast_to(
+            cos_theta, shape).reshape(-1, 1)
+        rows = np.arange(sin_column.shape[0])
+        extremes = []
+        for angle, arg_reduce in ((direction_angle, np.argmax), (direction_angle + math.pi, np.argmin)):
+            vertex = self.get_extreme_vertices(angle).reshape(-1, 1)
+            candidates = (vertex + np.array([-1, 0, 1])) % len(self.x)  # The vertex and its neighbours, per row.
+            distances = -self.x[candidates] * sin_column + self.y[candidates] * cos_column
+            best = arg_reduce(distances, axis=1)
+            extremes.append((distances[rows, best].reshape(shape), candidates[rows, best].reshape(shape)))
+        return extremes
@@ -0,0 +1,164 @@
+import numpy as np
+
+# material_id of the concrete fibers, the only material meshed so far (bars are kept as individual objects).
+CONCRETE_MATERIAL_ID = 0
+# Columns of FiberSection.sector_parameters.
+SECTOR_PARAMETERS = ("xc", "yc", "internal_radius", "external_radius", "start_angle", "end_angle")
+
+
+class FiberSection:
+    """Struct-of-arrays container of the fibers of a meshed section: one value per fiber in each of the arrays xg, yg,
+    area, region_id (index of the region in ArbitraryCrossSection.solid_regions_list) and material_id, without any
+    per-fiber object.
+
+    The fiber outlines are only needed to draw the mesh, and are kept apart in flat arrays: the counterclockwise
+    vertices of the polygonal fibers, concatenated in vertex_x and vertex_y (vertex_counts per fiber), and one row of
+    sector_parameters (see SECTOR_PARAMETERS) per annular sector fiber, these being the fibers without vertices. The
+    outline of a fiber trimmed by a void is the one of the whole cell."""
+
+    def __init__(self, xg, yg, area, region_id, material_id=None, vertex_x=None, vertex_y=None, vertex_counts=None,
+                 sector_parameters=None):
+        self.xg = np.asarray(xg, dtype=float)
+        self.yg = np.asarray(yg, dtype=float)
+        self.area = np.asarray(area, dtype=float)
+        fibers_count = len(self.xg)
+        self.region_id = np.broadcast_to(np.asarray(region_id, dtype=int), (fibers_count,)).copy()
+        material_id = CONCRETE_MATERIAL_ID if material_id is None else material_id
+        self.material_id = np.broadcast_to(np.asarray(material_id, dtype=int), (fibers_count,)).copy()
+        self.vertex_x = np.zeros(0) if vertex_x is None else np.asarray(vertex_x, dtype=float)
+        self.vertex_y = np.zeros(0) if vertex_y is None else np.asarray(vertex_y, dtype=float)
+        self.vertex_counts = np.zeros(fibers_count, dtype=int) if vertex_counts is None else np.asarray(
+            vertex_counts, dtype=int)
+        self.sector_parameters = np.zeros((0, len(SECTOR_PARAMETERS))) if sector_parameters is None else np.asarray(
+            sector_parameters, dtype=float).reshape(-1, len(SECTOR_PARAMETERS))
+
+    @classmethod
+    def from_polygons(cls, polygons_list, region_id):
+        """Fibers of a list of polygons.
+        :param polygons_list: list of (x, y, area, xg, yg), being x and y the counterclockwise vertex arrays."""
+        if len(polygons_list) == 0:
+            return cls.get_empty()
+        x_list, y_list, area, xg, yg = zip(*polygons_list)
+        return cls(xg, yg, area, region_id, vertex_x=np.concatenate(x_list), vertex_y=np.concatenate(y_list),
+                   vertex_counts=[len(x) for x in x_list])
+
+    @classmethod
+    def from_rectangles(cls, center_x, center_y, dx, dy, region_id):
+        """Fibers of the rectangular cells of size dx × dy centered at (center_x, center_y)."""
+        center_x, center_y = np.asarray(center_x, dtype=float), np.asarray(center_y, dtype=float)
+        # Counterclockwise corners, from the upper left one.
+        vertex_x = (center_x[:, None] + np.array([-1, -1, 1, 1]) * dx / 2).ravel()
+        vertex_y = (center_y[:, None] + np.array([1, -1, -1, 1]) * dy / 2).ravel()
+        return cls(center_x, center_y, np.full(len(center_x), dx * dy), region_id, vertex_x=vertex_x,
+                   vertex_y=vertex_y, vertex_counts=np.full(len(center_x), 4))
+
+    @classmethod
+    def from_annular_sectors(cls, xc, yc, internal_radius, external_radius, start_angle, end_angle, region_id):
+        """Fibers of the annular sectors of center (xc, yc) and the given radii and angle (in degrees) arrays."""
+        internal_radius, external_radius = np.asarray(internal_radius, dtype=float), np.asarray(external_radius,
+                                                                                                 dtype=float)
+        start_angle, end_angle = np.asarray(start_angle, dtype=float), np.asarray(end_angle, dtype=float)
+        angle = np.radians(end_angle - start_angle)
+        area = angle * (external_radius ** 2 - internal_radius ** 2) / 2
+        # The centroid is defined by 2R sin(θ)/(3θ); R stands for radius and θ the half angle (as in
+        # AnnularSectorElement).
+        theta = angle / 2
+        external_area, internal_area = angle * external_radius ** 2 / 2, angle * internal_radius ** 2 / 2
+        centroid_radius = 2 * np.sin(theta) / (3 * theta) * (
+                external_radius * external_area - internal_radius * internal_area) / area
+        middle_angle = np.radians(end_angle + start_angle) / 2
+        sector_parameters = np.column_stack([np.full(len(area), xc), np.full(len(area), yc), internal_radius,
+                                             external_radius, start_angle, end_angle])
+        return cls(np.cos(middle_angle) * centroid_radius + xc, np.sin(middle_angle) * centroid_radius + yc, area,
+                   region_id, sector_parameters=sector_parameters)
+
+    @classmethod
+    def get_empty(cls):
+        return cls(np.zeros(0), np.zeros(0), np.zeros(0), 0)
+
+    @classmethod
+    def concatenate(cls, fiber_sections_list):
+        if len(fiber_sections_list) == 0:
+            return cls.get_empty()
+        return cls(*(np.concatenate([getattr(fibers, name) for fibers in fiber_sections_list]) for name in (
+            "xg", "yg", "area", "region_id", "material_id", "vertex_x", "vertex_y", "vertex_counts",
+            "sector_parameters")))
+
+    def __len__(self):
+        return len(self.xg)
+
+    @property
+    def vertex_offsets(self):
+        """Position in vertex_x and vertex_y of the first vertex of each fiber (and the total count at the end)."""
+        return np.concatenate([[0], np.cumsum(self.vertex_counts)])
+
+    @property
+    def is_sector(self):
+        return self.vertex_counts == 0
+
+    def select(self, mask):
+        """FiberSection with the fibers where mask (boolean array) is True, in the same order."""
+        mask = np.asarray(mask, dtype=bool)
+        return FiberSection(
+            self.xg[mask], self.yg[mask], self.area[mask], self.region_id[mask], self.material_id[mask],
+            self.vertex_x[np.repeat(mask, self.vertex_counts)], self.vertex_y[np.repeat(mask, self.vertex_counts)],
+            self.vertex_counts[mask], self.sector_parameters[mask[self.is_sector]])
+
+    def sort_by_position(self):
+        """FiberSection with the fibers sorted by yg, and then by xg (stable)."""
+        return self.reorder(np.lexsort((self.xg, self.yg)))
+
+    def reorder(self, order):
+        """FiberSection with the fibers in the given order (array of fiber indices)."""
+        vertex_counts = self.vertex_counts[order]
+        new_offsets = np.concatenate([[0], np.cumsum(vertex_counts)])
+        vertex_order = np.repeat(self.vertex_offsets[:-1][order] - new_offsets[:-1], vertex_counts) + np.arange(
+            new_offsets[-1])
+        sector_rank = np.cumsum(self.is_sector) - 1  # Row of sector_parameters of each annular sector fiber.
+        return FiberSection(
+            self.xg[order], self.yg[order], self.area[order], self.region_id[order], self.material_id[order],
+            self.vertex_x[vertex_order], self.vertex_y[vertex_order], vertex_counts,
+            self.sector_parameters[sector_rank[order][self.is_sector[order]]])
+
+    def get_bounding_boxes(self):
+        """(fibers × 4) array with the bounds (x_min, x_max, y_min, y_max) of each polygonal fiber, or of the full
+        circle around each annular sector fiber."""
+        bounds = np.zeros((len(self), 4))
+        is_polygon = ~self.is_sector
+        if is_polygon.any():
+            starts = self.vertex_offsets[:-1][is_polygon]
+            bounds[is_polygon] = np.column_stack([
+                np.minimum.reduceat(self.vertex_x, starts), np.maximum.reduceat(self.vertex_x, starts),
+                np.minimum.reduceat(self.vertex_y, starts), np.maximum.reduceat(self.vertex_y, starts)])
+        xc, yc, _, external_radius, _, _ = self.sector_parameters.T
+        bounds[self.is_sector] = np.column_stack(
+            [xc - external_radius, xc + external_radius, yc - external_radius, yc + external_radius])
+        return bounds
+
+    def translate_reference_frame(self, disp_x, disp_y):
+        self.xg = self.xg + disp_x
+        self.yg = self.yg + disp_y
+        self.vertex_x = self.vertex_x + disp_x
+        self.vertex_y = self.vertex_y + disp_y
+        self.sector_parameters[:, 0] += disp_x
+        self.sector_parameters[:, 1] += disp_y
+
+    def get_area_and_centroid(self):
+        area = self.area.sum()
+        return area, (self.area * self.xg).sum() / area, (self.area * self.yg).sum() / area
+
+    def get_moments_of_inertia(self):
+        """Moments of inertia (Ix, Iy) about the coordinate axes, adding the fibers as point areas."""
+        return (self.area * self.yg ** 2).sum(), (self.area * self.xg ** 2).sum()
+
+    def get_polygon_outlines(self):
+        """Closed outline coordinates of all the polygonal fibers in two lists, separated by None (as a single
+        plotly trace takes them)."""
+        x_outline, y_outline = [], []
+        offsets = self.vertex_offsets.tolist()
+        vertex_x, vertex_y = self.vertex_x.tolist(), self.vertex_y.tolist()
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            if end > start:
+                x_outline.extend(vertex_x[start:end] + [vertex_x[start], None])
+                y_outline.extend(vertex_y[start:end] + [vertex_y[start], None])
+        return x_outline, y_outline
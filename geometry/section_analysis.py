@@ -1,5 +1,4 @@
 import traceback
-from tkinter import messagebox
 
 import math
 import numpy as np
@@ -11,13 +10,22 @@ from materials.acero_pasivo import BarraAceroPasivo
 from materials.acero_pretensado import BarraAceroPretensado
 from build.utils.excel_manager import ExcelManager
 from geometry.section_geometry_engine import Node, Region, ArbitraryCrossSection, CircularRegion
+from geometry.convex_hull_index import ExtremeFiberIndex
+from geometry.section_symmetry import SectionSymmetry
 from materials.concrete import Concrete
 from materials.matrices import MatrizAceroPasivo, MatrizAceroActivo
 from build.utils.plotly_engine import ACSAHEPlotlyEngine
+from build.utils.user_messages import show_message
+from geometry.structured_input import is_structured_input, load_structured_input, get_input_data, USER_PROVIDED_STEEL
 
-
-def show_message(message, titulo="Mensaje"):
-    messagebox.showinfo(titulo, message)
+# Number of ultimate strain planes per sign (see get_strain_planes), and the values of j at which each family of
+# strain planes starts or ends.
+STRAIN_PLANES_COUNT = 350
+STRAIN_PLANE_FAMILY_LIMITS = (0, 25, 100, 200, 275, 325, 349)
+# Maximum Newton iterations for the initial prestress strain plane (see _get_initial_prestressed_plain), and the
+# strain change across the section below which it is taken as converged.
+INITIAL_PLANE_MAX_ITERATIONS = 20
+INITIAL_PLANE_STRAIN_TOLERANCE = 10 ** -12
 
 
 class ACSAHEGeometricSolution:
@@ -27,35 +35,44 @@ class ACSAHEGeometricSolution:
     niveles_mallado_circular = {"Muy Gruesa": (3, 45), "Gruesa": (6, 30), "Media": (12, 10),
                                 "Fina": (25, 5), "Muy Fina": (50, 2)}
 
-    def __init__(self, file_path, read_only=True):
+    def __init__(self, file_path, read_only=True, input_data=None, excel_backend=None):
+        """:param file_path: Excel input workbook, or JSON/TOML file with the structured input (see
+        geometry/structured_input.py).
+        :param input_data: contents of a structured input file, as a dict, used instead of reading file_path.
+        :param excel_backend: backend reading the input workbook (see ExcelManager)."""
         self.ingreso_datos_sheet, self.armaduras_pasivas_sheet, self.armaduras_activas_sheet, self.diagrama_interaccion_sheet, self.diagrama_interaccion_3D_sheet = None, None, None, None, None
         self.max_x_seccion, self.min_x_seccion, self.max_y_seccion, self.min_y_seccion = None, None, None, None
         self.lista_ang_plano_de_carga = set()
         self.file_name = file_path
         self.read_only = read_only
+        self.excel_manager = None  # Only when the input is read from the input workbook.
+        self.phi_handling_cell = None  # Cell of the ϕ criteria in the input workbook, for the error messages.
+        self.input_data = input_data
+        self.excel_backend = excel_backend
 
         # Attributes to build
-        self.concrete_array, self.rebar_array, self.prestressed_rebar_array = None, None, None
+        self.concrete_fibers, self.rebar_array, self.prestressed_rebar_array = None, None, None
 
         self.build()
 
-
     def build(self):
-        self.excel_manager = ExcelManager(self.file_name, read_only=self.read_only, visible=False)
-        self._load_excel_sheets(self.excel_manager)
-        self.problema = self._get_result_params()
+        self.input_data = self._read_input_data()
+        self.problema = self._get_result_params(self.input_data)
 
         self.concrete, self.acero_pasivo, self.acero_activo, self.estribo = None, None, None, None
-        self._load_material_properties()
+        self._load_material_properties(self.input_data["materiales"])
         try:
-            self.meshed_section = self.get_meshed_concrete_section()
+            self.meshed_section = self.get_meshed_concrete_section(self.input_data["contornos"],
+                                                                   self.input_data["discretizacion"])
             self.XG, self.YG = self.meshed_section.xg, self.meshed_section.yg
 
-            self.concrete_array = self.meshed_section.elements_list  # Concrete Array.
-            self.rebar_array = self._get_rebar_array()
-            self.prestressed_rebar_array = self._get_prestressed_bars_array()
+            self.concrete_fibers = self.meshed_section.fibers  # Concrete fibers (see FiberSection).
+            self.rebar_array = self._get_rebar_array(self.input_data["armaduras_pasivas"])
+            self.prestressed_rebar_array = self._get_prestressed_bars_array(self.input_data["armaduras_activas"])
             self.meshed_section.Ast = sum([x.area for x in self.rebar_array])
             self.meshed_section.Apt = sum([x.area for x in self.prestressed_rebar_array])
+            self.concrete_fiber_index = ExtremeFiberIndex(self.concrete_fibers.xg, self.concrete_fibers.yg)
+            self.steel_fiber_index = ExtremeFiberIndex.from_fibers(self.rebar_array + self.prestressed_rebar_array)
 
             self.deformacion_maxima_de_acero = self._get_max_steel_strain()
             self.planos_de_deformacion = self.get_strain_planes()
@@ -65,6 +82,7 @@ class ACSAHEGeometricSolution:
                 y) + math.tan(
                 math.radians(self.phiy)) * x
             self.assign_elastic_strains_to_prestressed_bars()
+            self.symmetry = SectionSymmetry.from_geometric_solution(self)
             # self.excel_manager.close()
             # if self.problema["tipo"] == "2D":
                 # self.construir_grafica_seccion()  #TODO redo
@@ -72,9 +90,43 @@ class ACSAHEGeometricSolution:
             traceback.print_exc()
             message = f"Error en la generación de la geometría:\n {e}"
             show_message(message)
-            self.excel_manager.close()
+            self.close_input_file()
             raise e
 
+    def _read_input_data(self):
+        """Input data of the section (see get_excel_input_data), from input_data, a structured input file or the
+        input workbook."""
+        if self.input_data is not None:
+            return get_input_data(self.input_data)
+        if is_structured_input(self.file_name):
+            return load_structured_input(self.file_name)
+        self.excel_manager = ExcelManager(self.file_name, read_only=self.read_only, visible=False,
+                                          backend=self.excel_backend)
+        self._load_excel_sheets(self.excel_manager)
+        return self.get_excel_input_data()
+
+    def close_input_file(self):
+        """Closes the input workbook, if the input was read from it."""
+        if self.excel_manager is not None:
+            self.excel_manager.close()
+
+    def get_excel_input_data(self):
+        """Reads the input data from the sheets of the input workbook, in the same form as a structured input file
+        (see geometry/structured_input.get_input_data): materials, concrete regions, rebars, prestressed bars,
+        discretization, results and load combinations."""
+        resultados = self._get_excel_result_params()
+        return {
+            "materiales": self._get_excel_material_properties(),
+            "contornos": self._get_excel_concrete_regions(),
+            "armaduras_pasivas": self._get_excel_bars(
+                ("ARMADURAS PASIVAS (H°- Armado)", "ARMADURAS ACTIVAS (H°- Pretensado)"), "diametro"),
+            "armaduras_activas": self._get_excel_bars(
+                ("ARMADURAS ACTIVAS (H°- Pretensado)", "DISCRETIZACIÓN DE LA SECCIÓN"), "area"),
+            "discretizacion": self._get_excel_discretization(),
+            "resultados": resultados,
+            "estados": self._get_loading_combinations_points(resultados["tipo"]),
+        }
+
     def _load_excel_sheets(self, excel_manager):
         self.ingreso_datos_sheet = excel_manager.get_sheet("Ingreso de Datos")
         self.armaduras_pasivas_sheet = excel_manager.get_sheet("Armaduras Pasivas")
@@ -86,7 +138,26 @@ class ACSAHEGeometricSolution:
         if ang is not None:
             self.lista_ang_plano_de_carga.add(round(ang, 2))  # Two decimals in degrees.
 
-    def _get_result_params(self):
+    def _get_result_params(self, input_data):
+        resultados = input_data["resultados"]
+        for ang in resultados["planos_de_carga"]:
+            self._append_uniaxial_angle(ang)
+        puntos_a_verificar = list(input_data["estados"])
+        if resultados["tipo"] == "3D":
+            for load_combination in puntos_a_verificar:
+                self._append_uniaxial_angle(load_combination["plano_de_carga"])
+            puntos_a_verificar = sorted(puntos_a_verificar, key=lambda x: x["plano_de_carga"])
+        self.lista_ang_plano_de_carga = list(self.lista_ang_plano_de_carga)
+        return {
+            "tipo": resultados["tipo"],
+            "verificacion": resultados["verificacion"],
+            "lista_planos_de_carga": list(self.lista_ang_plano_de_carga),
+            "puntos_a_verificar": puntos_a_verificar,
+            "resultados_en_wb": resultados["resultados_en_wb"],
+            "phi_variable": self._get_phi_criteria(resultados["phi"], self.phi_handling_cell)
+        }
+
+    def _get_excel_result_params(self):
         rows_range = self.ingreso_datos_sheet.get_n_rows_after_value("RESULTADOS",
                                                                      number_of_rows_after_value=20, columns_range="A")
 
@@ -94,17 +165,13 @@ class ACSAHEGeometricSolution:
         verifies_design_loads = self.ingreso_datos_sheet.get_value_on_the_right("Verificación de Estados", rows_range, 2)
         pastes_results_in_wb = self.ingreso_datos_sheet.get_value_on_the_right("Pegar resultados en planilla", rows_range, 2)
         phi_handling_str = self.ingreso_datos_sheet.get_value_on_the_right("ϕ\nFactor de Minoración de Resistencia", rows_range, 2)
-        phi_handling_cell = self.ingreso_datos_sheet.get_cell_address_on_the_right("ϕ\nFactor de Minoración de Resistencia", rows_range, 2)
-        self._get_uniaxial_angles_list(type_of_result, rows_range)
-        puntos_a_verificar = self._get_loading_combinations_points(type_of_result)
-        self.lista_ang_plano_de_carga = list(self.lista_ang_plano_de_carga)
+        self.phi_handling_cell = self.ingreso_datos_sheet.get_cell_address_on_the_right("ϕ\nFactor de Minoración de Resistencia", rows_range, 2)
         return {
             "tipo": type_of_result,
             "verificacion": isinstance(verifies_design_loads, str) and verifies_design_loads == "Sí",
-            "lista_planos_de_carga": list(self.lista_ang_plano_de_carga),
-            "puntos_a_verificar": puntos_a_verificar,
             "resultados_en_wb": isinstance(pastes_results_in_wb, str) and pastes_results_in_wb == "Sí",
-            "phi_variable": self._get_phi_criteria(phi_handling_str, phi_handling_cell)
+            "phi": phi_handling_str,
+            "planos_de_carga": self._get_uniaxial_angles_list(type_of_result, rows_range),
         }
 
     @staticmethod
@@ -131,7 +198,7 @@ class ACSAHEGeometricSolution:
 
     def _get_uniaxial_angles_list(self, tipo, rows_range):
         if tipo == "2D": # Uniaxial bending, result in 2D.
-            self._append_uniaxial_angle(self.ingreso_datos_sheet.get_value_on_the_right("Ángulo plano de carga λ =", rows_range, 2))
+            return [self.ingreso_datos_sheet.get_value_on_the_right("Ángulo plano de carga λ =", rows_range, 2)]
         else:  # Biaxial bending, result in 3D.
             cantidad_planos_de_carga = int(
                 self.ingreso_datos_sheet.get_value_on_the_right("Cantidad de Planos de Carga", rows_range, 2))
@@ -139,8 +206,7 @@ class ACSAHEGeometricSolution:
                 "Cantidad de Planos de Carga",
                 cantidad_planos_de_carga + 2,
             )
-            for ang in [self.ingreso_datos_sheet.get_value("C", row_n) for row_n in planos_de_carga_fila[2:]]:
-                self._append_uniaxial_angle(ang)
+            return [self.ingreso_datos_sheet.get_value("C", row_n) for row_n in planos_de_carga_fila[2:]]
 
     def _get_loading_combinations_points(self, type_of_problem):
         rows_range = tuple(range(46, self.ingreso_datos_sheet.default_rows_range_value[-1]))
@@ -170,40 +236,121 @@ class ACSAHEGeometricSolution:
                     "My": self.ingreso_datos_sheet.get_value("G", combination_row),
                     "plano_de_carga": plano_de_carga if plano_de_carga is not None else 0  # se fuerza 0 para estado de solo esfuerzo normal, en el cual en rigor corresponde considerar infinitos planos de carga.
                 }
-                self._append_uniaxial_angle(load_combination["plano_de_carga"])
             load_combinations_list.append(load_combination)
-        if type_of_problem == "3D":
-            load_combinations_list = sorted(load_combinations_list, key=lambda x: x["plano_de_carga"])
         return load_combinations_list
 
-    def _load_material_properties(self):
+    def _load_material_properties(self, materiales):
 
-        self.concrete = Concrete(tipo=self.ingreso_datos_sheet.get_value("C", "4"))
-        self.tipo_estribo = self.ingreso_datos_sheet.get_value("C", "10")
+        self.concrete = Concrete(tipo=materiales["hormigon"])
+        self.tipo_estribo = materiales["armadura_transversal"]
 
-        def_de_rotura_a_pasivo = self.obtener_def_de_rotura_a_pasivo()
-        self.set_rebar_properties(def_de_rotura_a_pasivo)
+        self.set_rebar_properties(materiales["acero_pasivo"])
 
-        def_de_pretensado_inicial = self._get_initial_prestressed_strain()
+        def_de_pretensado_inicial = self._get_initial_prestressed_strain(materiales["acero_activo"])
         self.def_de_pretensado_inicial = def_de_pretensado_inicial
-        self.setear_propiedades_acero_activo(def_de_pretensado_inicial)
+        self.setear_propiedades_acero_activo(materiales["acero_activo"], def_de_pretensado_inicial)
+
+    def _get_excel_material_properties(self):
+        acero_pasivo = {"tipo": self.ingreso_datos_sheet.get_value("C", "6")}
+        if acero_pasivo["tipo"] == USER_PROVIDED_STEEL:
+            acero_pasivo.update({
+                "fy": self.armaduras_pasivas_sheet.get_value("E", "3"),
+                "E": self.armaduras_pasivas_sheet.get_value("E", "4"),
+                "eu": self.armaduras_pasivas_sheet.get_value("E", "5")})
+        else:
+            acero_pasivo["eu"] = self.obtener_def_de_rotura_a_pasivo()
+
+        acero_activo = {"tipo": self.ingreso_datos_sheet.get_value("C", "8"),
+                        "deformacion_de_pretensado_inicial": self.ingreso_datos_sheet.get_value("E", 8)}
+        if acero_activo["tipo"] == USER_PROVIDED_STEEL:
+            acero_activo.update({key: self.armaduras_activas_sheet.get_value("E", str(row_number))
+                                 for row_number, key in enumerate(("Eps", "fpy", "fpu", "epu", "N", "K", "Q"), 3)})
+        return {
+            "hormigon": self.ingreso_datos_sheet.get_value("C", "4"),
+            "armadura_transversal": self.ingreso_datos_sheet.get_value("C", "10"),
+            "acero_pasivo": acero_pasivo,
+            "acero_activo": acero_activo,
+        }
 
     def _get_initial_prestressed_plain(self):
-        """Gets the paratemers of the initial section elastic deformation, based on the prestressing action."""
+        """Gets the paratemers of the initial section elastic deformation, based on the prestressing action.
+        The plane ec + tan(phix)·y + tan(phiy)·x is solved for (ec, tan(phix), tan(phiy)), in which the section forces
+        are linear while the concrete stays fully compressed and the steel elastic. The closed-form plane under those
+        assumptions (see get_linear_initial_plane) is refined by Newton's method with the analytic Jacobian, which
+        only has to absorb the curvature of the prestressing steel law. fsolve is kept as a fallback."""
         if not self.prestressed_rebar_array:  # Caso de Hormigón Armado
             return 0, 0, 0
-        non_linear_solution = fsolve(
-            self.strain_function_to_converge, [-BarraAceroPretensado.deformacion_de_pretensado_inicial, 0, 0],
-            maxfev=50, full_output=1)
-
-        if not (non_linear_solution[2]):
-            raise Exception("No se encontró deformación inicial que satisfaga las ecuaciones de equilibrio")
-        ec, phix, phiy = non_linear_solution[0]
-        return ec, phix, phiy
+        fiber_groups = self.get_initial_plane_fiber_groups()
+        plane = self._solve_initial_plane_with_newton(fiber_groups)
+        if plane is None:
+            non_linear_solution = fsolve(
+                lambda strains: self.get_initial_plane_forces_and_jacobian(fiber_groups, strains)[0],
+                [-BarraAceroPretensado.deformacion_de_pretensado_inicial, 0, 0],
+                fprime=lambda strains: self.get_initial_plane_forces_and_jacobian(fiber_groups, strains)[1],
+                maxfev=50, full_output=1)
+            if non_linear_solution[2] != 1:
+                raise Exception("No se encontró deformación inicial que satisfaga las ecuaciones de equilibrio")
+            plane = non_linear_solution[0]
+        ec, tan_phix, tan_phiy = (float(value) for value in plane)
+        return ec, math.degrees(math.atan(tan_phix)), math.degrees(math.atan(tan_phiy))
+
+    def get_initial_plane_fiber_groups(self):
+        """(x, y, area, initial strain, stress function, tangent modulus function) of the concrete fibers, the
+        rebars and the prestressed bars, for the evaluation of the initial prestress strain plane."""
+        concrete_fibers = self.concrete_fibers
+        fiber_groups = [(concrete_fibers.xg, concrete_fibers.yg, concrete_fibers.area, 0.0,
+                         self.concrete.elastic_stress_strain_array, self.concrete.elastic_tangent_modulus_array)]
+        for bars_list, bar_class in ((self.rebar_array, BarraAceroPasivo),
+                                     (self.prestressed_rebar_array, BarraAceroPretensado)):
+            if not bars_list:
+                continue
+            initial_strain = np.array([getattr(bar, "deformacion_de_pretensado_inicial", 0.0) for bar in bars_list])
+            fiber_groups.append((np.array([bar.xg for bar in bars_list], dtype=float),
+                                 np.array([bar.yg for bar in bars_list], dtype=float),
+                                 np.array([bar.area for bar in bars_list], dtype=float),
+                                 initial_strain, bar_class.stress_strain_array, bar_class.tangent_modulus_array))
+        return fiber_groups
 
-    def strain_function_to_converge(self, strains):
-        (ec, phix, phiy) = strains
-        return self.get_baricentric_section_forces(ec, phix, phiy)
+    @staticmethod
+    def get_initial_plane_forces_and_jacobian(fiber_groups, plane):
+        """Section forces [sumF, Mx, My] of the strain plane ec + kx·y + ky·x (plane = (ec, kx, ky)) added to the
+        initial strain of each fiber, and their Jacobian with respect to (ec, kx, ky), from the tangent modulus of
+        each material."""
+        ec, kx, ky = plane
+        forces, jacobian = np.zeros(3), np.zeros((3, 3))
+        for x, y, area, initial_strain, stress_function, tangent_function in fiber_groups:
+            strain = ec + kx * y + ky * x + initial_strain
+            force_basis = np.stack([np.ones_like(x), y, -x])  # Contribution of a unit force to sumF, Mx and My.
+            forces += force_basis @ (stress_function(strain) * area)
+            jacobian += (force_basis * (tangent_function(strain) * area)) @ np.stack([np.ones_like(x), y, x]).T
+        return forces, jacobian
+
+    def get_linear_initial_plane(self, fiber_groups):
+        """Closed-form initial plane (ec, kx, ky), assuming the whole concrete compressed and the steel linear about
+        its initial strain: the section forces are then F0 + K·plane, being F0 the prestressing forces and K the
+        Jacobian, so the plane is the solution of K·plane = -F0."""
+        x, y, area, initial_strain, stress_function, _ = fiber_groups[0]
+        compressed_concrete_group = (x, y, area, initial_strain, stress_function,
+                                     lambda e: np.full(np.shape(e), self.concrete.E))
+        forces, jacobian = self.get_initial_plane_forces_and_jacobian(
+            [compressed_concrete_group] + fiber_groups[1:], np.zeros(3))
+        return np.linalg.solve(jacobian, -forces)
+
+    def _solve_initial_plane_with_newton(self, fiber_groups):
+        """Newton's method from the closed-form plane. None if it does not converge."""
+        x, y = fiber_groups[0][0], fiber_groups[0][1]
+        section_size = max(np.abs(x).max(), np.abs(y).max())
+        try:
+            plane = self.get_linear_initial_plane(fiber_groups)
+            for _ in range(INITIAL_PLANE_MAX_ITERATIONS):
+                forces, jacobian = self.get_initial_plane_forces_and_jacobian(fiber_groups, plane)
+                step = np.linalg.solve(jacobian, -forces)
+                plane = plane + step
+                if abs(step[0]) + (abs(step[1]) + abs(step[2])) * section_size <= INITIAL_PLANE_STRAIN_TOLERANCE:
+                    return plane
+        except np.linalg.LinAlgError:
+            pass
+        return None
 
     def _get_max_steel_strain(self):
         def_max_acero_pasivo = BarraAceroPasivo.eu
@@ -216,9 +363,9 @@ class ACSAHEGeometricSolution:
         value = self.armaduras_pasivas_sheet.get_value(possible_reinforcement_options.get(problem_type, "B"), 5)
         return value
 
-    def _get_initial_prestressed_strain(self):
-        value = self.ingreso_datos_sheet.get_value("E", 8)
-        return value / 1000
+    @staticmethod
+    def _get_initial_prestressed_strain(acero_activo):
+        return acero_activo["deformacion_de_pretensado_inicial"] / 1000
 
     def _get_mesh_characteristics(self):
         return {
@@ -233,83 +380,98 @@ class ACSAHEGeometricSolution:
             return {"color": self.numero_a_color_arcoiris(abs(plano_de_def[3]))}
         return {"c": lista_colores[abs(plano_de_def[2])] if blanco_y_negro is False else "k"}
 
-    def get_strain_planes(self):
+    def get_strain_planes(self, plane_parameters=None):
         """Obtiene una lista de los planos de deformación últimos a utilizarse para determinar los estados de resistencia
         últimos, cada element de esta lista representa, en principio, un punto sobre el diagrama de interacción.
         Este puede no ser el caso si hay puntos para los cuales no se encuentra una convergencia, en ese caso será
-        descartado."""
+        descartado.
+        :param plane_parameters: valores de j (ver get_strain_plane) a utilizar. Por defecto, los 350 valores enteros
+        de 0 a 349."""
         plane_list = []
         try:
-            for j in range(350):
-                if j <= 25:
-                    final_strain = -0.5
-                    top_strain = -3
-                    bottom_strain = -3 + (final_strain + 3) * j / (25)  # Hasta -0.3
-                    plane_index = 1
-                elif 25 < j <= 100:
-                    def_inicial = -0.5
-                    final_strain = 0
-                    top_strain = -3
-                    bottom_strain = def_inicial + (final_strain - def_inicial) * (j - 25) / (100 - 25)  # Hasta 0
-                    plane_index = 2
-                elif 100 < j <= 200:
-                    top_strain = -3
-                    bottom_strain = 10 * (j - 100) / (200 - 100)
-                    plane_index = 3
-                elif 200 < j <= 275:  # Hasta la deformación máxima del acero.
-                    top_strain = -3
-                    bottom_strain = 10 + (j - 200) * (self.deformacion_maxima_de_acero * 1000 - 10) / (275 - 200)
-                    plane_index = 4
-                elif j <= 325:
-                    top_strain = -3 + (6 + 3) * (j - 275) / (325 - 275)
-                    bottom_strain = self.deformacion_maxima_de_acero * 1000
-                    plane_index = 5
-                else:
-                    top_strain = 6 + (self.deformacion_maxima_de_acero * 1000 - 6) * (j - 325) / (350 - 326)
-                    bottom_strain = self.deformacion_maxima_de_acero * 1000
-                    plane_index = 6
-                plane_list.append((top_strain / 1000, bottom_strain / 1000, plane_index, j))
+            for j in (range(STRAIN_PLANES_COUNT) if plane_parameters is None else plane_parameters):
+                plane_list.append(self.get_strain_plane(j))
         except AttributeError as e:
             pass
         inverted_plane_list = [(x[1], x[0], -x[2], -x[3]) for x in plane_list]  # Misma lista, invertida de sign
         return plane_list + inverted_plane_list
 
+    def get_strain_plane(self, j):
+        """Plano de deformación último para el parámetro j, que puede tomar cualquier valor real en [0, 349]. Los
+        planos se agrupan en seis familias, recorriendo desde la compresión pura hasta la tracción pura.
+        :return: tupla (deformación superior, deformación inferior, índice de familia, j)."""
+        if j <= 25:
+            final_strain = -0.5
+            top_strain = -3
+            bottom_strain = -3 + (final_strain + 3) * j / (25)  # Hasta -0.3
+            plane_index = 1
+        elif 25 < j <= 100:
+            def_inicial = -0.5
+            final_strain = 0
+            top_strain = -3
+            bottom_strain = def_inicial + (final_strain - def_inicial) * (j - 25) / (100 - 25)  # Hasta 0
+            plane_index = 2
+        elif 100 < j <= 200:
+            top_strain = -3
+            bottom_strain = 10 * (j - 100) / (200 - 100)
+            plane_index = 3
+        elif 200 < j <= 275:  # Hasta la deformación máxima del acero.
+            top_strain = -3
+            bottom_strain = 10 + (j - 200) * (self.deformacion_maxima_de_acero * 1000 - 10) / (275 - 200)
+            plane_index = 4
+        elif j <= 325:
+            top_strain = -3 + (6 + 3) * (j - 275) / (325 - 275)
+            bottom_strain = self.deformacion_maxima_de_acero * 1000
+            plane_index = 5
+        else:
+            top_strain = 6 + (self.deformacion_maxima_de_acero * 1000 - 6) * (j - 325) / (350 - 326)
+            bottom_strain = self.deformacion_maxima_de_acero * 1000
+            plane_index = 6
+        return top_strain / 1000, bottom_strain / 1000, plane_index, j
+
     def assign_elastic_strains_to_prestressed_bars(self):
         ec_plano = self.ec_plano_deformacion_elastica_inicial
         for elemento_pretensado in self.prestressed_rebar_array:
             elemento_pretensado.def_elastica_hormigon_perdidas = ec_plano(elemento_pretensado.xg,
                                                                           elemento_pretensado.yg)
 
-    def _get_rebar_array(self):
-        rows_list = self.ingreso_datos_sheet.get_rows_range_between_values(
-            ("ARMADURAS PASIVAS (H°- Armado)", "ARMADURAS ACTIVAS (H°- Pretensado)"),
-            columns_range=["A"])
+    def _get_rebar_array(self, armaduras_pasivas):
         result_array = MatrizAceroPasivo()
-        for row_number in rows_list[5:-1]:
-            x, y, d, i = self._get_rebar_excel_values(row_number)
-            if d == 0:
+        for barra in armaduras_pasivas:
+            if barra["diametro"] == 0:
                 continue
-            xg = round(x - self.XG, 3)
-            yg = round(y - self.YG, 3)
-            result_array.append(BarraAceroPasivo(xg, yg, d, i))
+            xg = round(barra["x"] - self.XG, 3)
+            yg = round(barra["y"] - self.YG, 3)
+            result_array.append(BarraAceroPasivo(xg, yg, barra["diametro"], barra["indice"]))
         return result_array
 
+    def _get_excel_bars(self, section_titles, size_key):
+        """Bars listed between the section_titles of the 'Ingreso de Datos' sheet: x, y, size (diameter or area,
+        under size_key) and index."""
+        rows_list = self.ingreso_datos_sheet.get_rows_range_between_values(section_titles, columns_range=["A"])
+        bars = []
+        for row_number in rows_list[5:-1]:
+            x, y, size, i = self._get_rebar_excel_values(row_number)
+            bars.append({"x": x, "y": y, size_key: size, "indice": i})
+        return bars
+
     def _get_rebar_excel_values(self, row_number):
         return (self.ingreso_datos_sheet.get_value("C", row_number),
                 self.ingreso_datos_sheet.get_value("E", row_number),
                 self.ingreso_datos_sheet.get_value("G", row_number),
                 self.ingreso_datos_sheet.get_value("A", row_number))
 
-    def set_rebar_properties(self, def_de_rotura_a_pasivo):
+    def set_rebar_properties(self, acero_pasivo):
         try:
-            tipo = self.ingreso_datos_sheet.get_value("C", "6")
+            tipo = acero_pasivo["tipo"]
+            def_de_rotura_a_pasivo = acero_pasivo["eu"]
             self.acero_pasivo = tipo
-            if tipo == "Provisto por usuario":
+            if tipo == USER_PROVIDED_STEEL:
                 valores = {
-                    "tipo": "Provisto por usuario",
-                    "fy": self.armaduras_pasivas_sheet.get_value("E", "3")/10,
-                    "E": self.armaduras_pasivas_sheet.get_value("E", "4")/10,
-                    "eu": self.armaduras_pasivas_sheet.get_value("E", "5")
+                    "tipo": USER_PROVIDED_STEEL,
+                    "fy": acero_pasivo["fy"]/10,
+                    "E": acero_pasivo["E"]/10,
+                    "eu": def_de_rotura_a_pasivo
                 }
 
                 if not all(bool(v) for k, v in valores.items()):
@@ -317,6 +479,9 @@ class ACSAHEGeometricSolution:
                                     "Pero no ha ingresado todos los parámetros necesarios. Por favor,"
                                     " diríjase a pestaña 'Armaduras Pasivas' e intentelo de nuevo.")
 
+                for k, v in valores.items():
+                    setattr(BarraAceroPasivo, k, v)
+
             else:
                 values = BarraAceroPasivo.default_strain_stress_relation_vars.get(tipo)
                 for k, v in values.items():
@@ -329,35 +494,24 @@ class ACSAHEGeometricSolution:
         except Exception:
             raise Exception("No se pudieron setear las propiedades del acero pasivo, revise configuración")
 
-    def _get_prestressed_bars_array(self):
-        lista_filas = self.ingreso_datos_sheet.get_rows_range_between_values(
-            ("ARMADURAS ACTIVAS (H°- Pretensado)", "DISCRETIZACIÓN DE LA SECCIÓN"),
-            columns_range=["A"])
+    def _get_prestressed_bars_array(self, armaduras_activas):
         resultado = MatrizAceroActivo()
-        for fila in lista_filas[5:-1]:
-            x, y, area, i = self._get_rebar_excel_values(fila)
-            if area == 0:
+        for barra in armaduras_activas:
+            if barra["area"] == 0:
                 continue
-            xg = round(x - self.XG, 3)
-            yg = round(y - self.YG, 3)
-            resultado.append(BarraAceroPretensado(xg, yg, area, i))
+            xg = round(barra["x"] - self.XG, 3)
+            yg = round(barra["y"] - self.YG, 3)
+            resultado.append(BarraAceroPretensado(xg, yg, barra["area"], barra["indice"]))
         return resultado
 
-    def setear_propiedades_acero_activo(self, def_de_pretensado_inicial):
+    def setear_propiedades_acero_activo(self, acero_activo, def_de_pretensado_inicial):
         try:
-            tipo = self.ingreso_datos_sheet.get_value("C", "8")
-            tipo = tipo
+            tipo = acero_activo["tipo"]
             self.acero_activo = tipo
-            if tipo == "Provisto por usuario":
+            if tipo == USER_PROVIDED_STEEL:
                 valores = {
-                    "tipo": "Provisto por usuario",
-                    "Eps": self.armaduras_activas_sheet.get_value("E", "3"),
-                    "fpy": self.armaduras_activas_sheet.get_value("E", "4"),
-                    "fpu": self.armaduras_activas_sheet.get_value("E", "5"),
-                    "epu": self.armaduras_activas_sheet.get_value("E", "6"),
-                    "N": self.armaduras_activas_sheet.get_value("E", "7"),
-                    "K": self.armaduras_activas_sheet.get_value("E", "8"),
-                    "Q": self.armaduras_activas_sheet.get_value("E", "9"),
+                    "tipo": USER_PROVIDED_STEEL,
+                    **{k: acero_activo.get(k) for k in ("Eps", "fpy", "fpu", "epu", "N", "K", "Q")},
                     "deformacion_de_pretensado_inicial": def_de_pretensado_inicial
                 }
 
@@ -398,28 +552,19 @@ class ACSAHEGeometricSolution:
     def _get_number_of_nodes(self, region):
         return self.ingreso_datos_sheet.get_value("G", region[0])
 
-    def get_meshed_concrete_section(self):
-        filas_hormigon = self.ingreso_datos_sheet.get_rows_range_between_values(
-            ("GEOMETRÍA DE LA SECCIÓN DE HORMIGÓN", "ARMADURAS PASIVAS (H°- Armado)"),
-            columns_range=["A"])
-        concrete_shapes_list = self.ingreso_datos_sheet.subdivide_range_in_contain_word("A", filas_hormigon, "Contorno")
+    def get_meshed_concrete_section(self, contornos, discretizacion):
         concrete_polygons = {}
-        node_coordinates_list = []
         max_x, min_x = [], []
         max_y, min_y = [], []
         delta_x = []
         delta_y = []
-        for i, filas_region in enumerate(concrete_shapes_list):
-            sign = self._get_sign(filas_region)
-            shape_type = self._get_section_type(filas_region)
-            indice = self._get_index(filas_region)
+        for i, region in enumerate(contornos):
+            sign = region["signo"]
+            shape_type = region["tipo"]
+            indice = region["indice"]
             if shape_type == "Poligonal":
-                cantidad_de_nodos = int(self._get_number_of_nodes(filas_region))
-                for fila_n in self.ingreso_datos_sheet.get_n_rows_after_value("Nodo Nº", cantidad_de_nodos + 1,
-                                                                              rows_range=filas_region)[1:]:
-                    x = self.ingreso_datos_sheet.get_value("C", fila_n)
-                    y = self.ingreso_datos_sheet.get_value("E", fila_n)
-                    node_coordinates_list.append(Node(round(x, 3), round(y, 3)))  # Medidas en centímetros
+                # Medidas en centímetros
+                node_coordinates_list = [Node(round(x, 3), round(y, 3)) for x, y in region["nodos"]]
                 concrete_shape = Region(node_coordinates_list, sign, indice, sort_nodes=True)
                 if sign > 0:  # Solo se utilizan los regions positivos para definir la discretización
                     max_x.append(max(concrete_shape.x))
@@ -429,12 +574,10 @@ class ACSAHEGeometricSolution:
                     delta_x.append(abs(max(concrete_shape.x) - min(concrete_shape.x)))
                     delta_y.append(abs(max(concrete_shape.y) - min(concrete_shape.y)))
                 concrete_polygons[str(i + 1)] = concrete_shape
-                node_coordinates_list = []
             elif shape_type == "Circular":
-                x = self.ingreso_datos_sheet.get_value_on_the_right("Nodo Centro", filas_region, 2)
-                y = self.ingreso_datos_sheet.get_value_on_the_right("Nodo Centro", filas_region, 4)
-                r_int = self.ingreso_datos_sheet.get_value_on_the_right("Radio Interno [cm]", filas_region, 2)
-                r_ext = self.ingreso_datos_sheet.get_value_on_the_right("Radio Externo [cm]", filas_region, 2)
+                x, y = region["centro"]
+                r_int = region["radio_interno"]
+                r_ext = region["radio_externo"]
                 if sign > 0:
                     max_x.append(x + r_ext)
                     min_x.append(x - r_ext)
@@ -450,20 +593,47 @@ class ACSAHEGeometricSolution:
         self.min_x_seccion = min(min_x)
         self.max_y_seccion = max(max_y)
         self.min_y_seccion = min(min_y)
-        EEH = ArbitraryCrossSection(concrete_polygons, mesh_data=self.get_discretizacion(delta_x, delta_y, concrete_polygons))
+        EEH = ArbitraryCrossSection(concrete_polygons, mesh_data=self.get_discretizacion(
+            delta_x, delta_y, concrete_polygons, discretizacion))
         return EEH
 
-    def get_discretizacion(self, delta_x, delta_y, regions):
+    def _get_excel_concrete_regions(self):
+        """Concrete regions of the 'Ingreso de Datos' sheet: sign, type, index, and the nodes of a polygonal region or
+        the center and radii of a circular one."""
+        filas_hormigon = self.ingreso_datos_sheet.get_rows_range_between_values(
+            ("GEOMETRÍA DE LA SECCIÓN DE HORMIGÓN", "ARMADURAS PASIVAS (H°- Armado)"),
+            columns_range=["A"])
+        concrete_shapes_list = self.ingreso_datos_sheet.subdivide_range_in_contain_word("A", filas_hormigon, "Contorno")
+        regions = []
+        for filas_region in concrete_shapes_list:
+            region = {"signo": self._get_sign(filas_region),
+                      "tipo": self._get_section_type(filas_region),
+                      "indice": self._get_index(filas_region)}
+            if region["tipo"] == "Poligonal":
+                cantidad_de_nodos = int(self._get_number_of_nodes(filas_region))
+                region["nodos"] = [
+                    (self.ingreso_datos_sheet.get_value("C", fila_n), self.ingreso_datos_sheet.get_value("E", fila_n))
+                    for fila_n in self.ingreso_datos_sheet.get_n_rows_after_value("Nodo Nº", cantidad_de_nodos + 1,
+                                                                                 rows_range=filas_region)[1:]]
+            elif region["tipo"] == "Circular":
+                region["centro"] = (self.ingreso_datos_sheet.get_value_on_the_right("Nodo Centro", filas_region, 2),
+                                    self.ingreso_datos_sheet.get_value_on_the_right("Nodo Centro", filas_region, 4))
+                region["radio_interno"] = self.ingreso_datos_sheet.get_value_on_the_right(
+                    "Radio Interno [cm]", filas_region, 2)
+                region["radio_externo"] = self.ingreso_datos_sheet.get_value_on_the_right(
+                    "Radio Externo [cm]", filas_region, 2)
+            regions.append(region)
+        return regions
+
+    def get_discretizacion(self, delta_x, delta_y, regions, discretizacion):
         hay_region_circular = any(isinstance(v, CircularRegion) for k, v in regions.items())
         hay_region_rectangular = any(not isinstance(x, CircularRegion) for x in regions)
-        rows_range = self.ingreso_datos_sheet.get_n_rows_after_value("DISCRETIZACIÓN DE LA SECCIÓN",
-                                                                     number_of_rows_after_value=20, columns_range="A")
-        nivel_discretizacion = self.ingreso_datos_sheet.get_value_on_the_right("Nivel de Discretización", rows_range, 2)
+        nivel_discretizacion = discretizacion["nivel"]
         self.nivel_disc = nivel_discretizacion
         if nivel_discretizacion == "Avanzada (Ingreso Manual)":
-            dx = self.ingreso_datos_sheet.get_value_on_the_right("ΔX [cm] =", rows_range, 2)
-            dy = self.ingreso_datos_sheet.get_value_on_the_right("ΔY [cm] =", rows_range, 2)
-            d_ang = self.ingreso_datos_sheet.get_value_on_the_right("Δθ [°] =", rows_range, 2)
+            dx = discretizacion["dx"]
+            dy = discretizacion["dy"]
+            d_ang = discretizacion["d_ang"]
             return (dx if hay_region_rectangular else None,
                     dy if hay_region_rectangular else None,
                     min(dx, dy) if hay_region_circular else None,
@@ -476,40 +646,16 @@ class ACSAHEGeometricSolution:
                 factor_circular[0] if hay_region_circular else None,
                 factor_circular[1] if hay_region_circular else None)
 
-    def get_baricentric_section_forces(self, ec, phix, phiy):
-        ecuacion_plano_deformacion = lambda x, y: ec + math.tan(math.radians(phix)) * (y) + math.tan(
-            math.radians(phiy)) * (x)
-        sumFA = sumFP = sumFH = 0
-        MxA = MxAP = MxH = 0
-        MyA = MyAP = MyH = 0
-        for barra in self.rebar_array:
-            def_elemento, area = ecuacion_plano_deformacion(barra.xg, barra.yg), barra.area
-            FA = barra.stress_strain_eq(def_elemento) * area
-            sumFA = sumFA + FA
-            MxA = FA * barra.yg + MxA
-            MyA = -FA * barra.xg + MyA
-        for barra_p in self.prestressed_rebar_array:
-            deformacion_elastica_hormingon, area = ecuacion_plano_deformacion(barra_p.xg, barra_p.yg), barra_p.area
-            deformacion_pretensado_inicial = barra_p.deformacion_de_pretensado_inicial
-            deformacion_total = deformacion_elastica_hormingon + deformacion_pretensado_inicial
-
-            Fp = barra_p.stress_strain_eq(deformacion_total) * area
-            sumFP = sumFP + Fp
-            MxAP = Fp * barra_p.yg + MxAP
-            MyAP = -Fp * barra_p.xg + MyAP
-
-        for element in self.concrete_array:
-            def_elemento, area = ecuacion_plano_deformacion(element.xg, element.yg), element.area
-            F_hor = self.concrete.elastic_stress_strain_eq(def_elemento) * area
-            sumFH = sumFH + F_hor
-            MxH = F_hor * element.yg + MxH
-            MyH = -F_hor * element.xg + MyH
-
-        sumF = sumFA + sumFP + sumFH
-        Mx = round(MxA + MxAP + MxH, 8)
-        My = round(MyA + MyAP + MyH, 8)
-
-        return [sumF, Mx, My]
+    def _get_excel_discretization(self):
+        rows_range = self.ingreso_datos_sheet.get_n_rows_after_value("DISCRETIZACIÓN DE LA SECCIÓN",
+                                                                     number_of_rows_after_value=20, columns_range="A")
+        nivel_discretizacion = self.ingreso_datos_sheet.get_value_on_the_right("Nivel de Discretización", rows_range, 2)
+        discretizacion = {"nivel": nivel_discretizacion, "dx": None, "dy": None, "d_ang": None}
+        if nivel_discretizacion == "Avanzada (Ingreso Manual)":
+            discretizacion["dx"] = self.ingreso_datos_sheet.get_value_on_the_right("ΔX [cm] =", rows_range, 2)
+            discretizacion["dy"] = self.ingreso_datos_sheet.get_value_on_the_right("ΔY [cm] =", rows_range, 2)
+            discretizacion["d_ang"] = self.ingreso_datos_sheet.get_value_on_the_right("Δθ [°] =", rows_range, 2)
+        return discretizacion
 
     def print_result_tridimensional(self, ec, phix, phiy):
         ec_plano = lambda x, y: ec + math.tan(math.radians(phix)) * y + math.tan(math.radians(phiy)) * x
@@ -1,10 +1,13 @@
-import copy
 import math
 import random
 from typing import List
 import numpy as np
 
 from build.utils.plotly_engine import ACSAHEPlotlyEngine
+from geometry.vectorized_geometry import get_counterclockwise_vertices, get_grid_cells_in_convex_polygon, \
+    clip_polygon_with_convex_polygon, get_polygon_area_centroid, classify_boxes_against_convex_polygon
+from geometry.spatial_index import BoundingBoxGridIndex
+from geometry.fiber_section import FiberSection
 
 TOLERANCE = 10 ** -10
 pyplot_colors_list = ["r", "b", "g", "c", "m", "y", "k"]
@@ -241,7 +244,7 @@ class Polygon(object):
         self.x = [node.x for node in self.boundary_nodes_list]
         self.y = [node.y for node in self.boundary_nodes_list]
         self.nodes_count = len(nodes)
-        self.boundary_segments_list = self._get_boundary_segments()
+        self._boundary_segments_list = None  # Built on first use (see boundary_segments_list).
         area = self._get_polygon_area()
         if area == 0 and isinstance(self, Region):
             raise Exception(f"El region de índice {self.indice} contiene área 0. Por favor, revisar la entrada de datos.")
@@ -253,9 +256,15 @@ class Polygon(object):
             # These attributes are defined to determine if the element was modified by an intersection (see method)
             self.intersection_nodes_list = []
             self.modifications_count = 0
-            self.centroid_node_original = copy.copy(self.centroid_node)
+            self.centroid_node_original = Node(self.centroid_node.x, self.centroid_node.y)
             self.area_original = area
 
+    @property
+    def boundary_segments_list(self):
+        """Boundary segments, built lazily: most mesh elements never need them."""
+        if self._boundary_segments_list is None:
+            self._boundary_segments_list = self._get_boundary_segments()
+        return self._boundary_segments_list
 
     @staticmethod
     def _sort_nodes_counterclokwise(nodes_list=None):
@@ -361,75 +370,23 @@ class Polygon(object):
         return i_punto if i_punto < self.nodes_count else i_punto - self.nodes_count
 
     def get_intersection_polygon(self, other_polygon):
-        """Returns the intersection of Polygons"""
-        intersection_nodes_list = self & other_polygon
-        if not intersection_nodes_list:
+        """Returns the intersection of Polygons, or self when it is not trimmed by other_polygon."""
+        x, y = self._get_clipped_vertices(other_polygon)
+        if len(x) < 3:
             return self
-        # Determines which nodes of other_polygon belong inside self
-        for nodo in other_polygon.boundary_nodes_list:
-            if self.is_node_inside_borderless_boundaries(nodo):
-                intersection_nodes_list.append(nodo)
-        for nodo_pos in self.boundary_nodes_list: # Determines which nodes of self are inside other_polygons
-            if other_polygon.is_node_inside_borderless_boundaries(nodo_pos):
-                intersection_nodes_list.append(nodo_pos)
-        if len(intersection_nodes_list) <= 2:
-            return self
-        intersection_nodes_list = NodeList(intersection_nodes_list).remove_duplicates()
-        return Polygon(intersection_nodes_list, sort_nodes=True)
-
-    def substract_with_other_polygon(self, other_polygon):
-        """Subtracts from the self element the complement with other_polygon.
-        :param other_polygon: polygon that will be subtracted from self.
-        :return: the same self element, but modified by the subtraction."""
-
-        intersection_nodes_list = self._get_shared_nodes_list(self, other_polygon)
-
-        if len(intersection_nodes_list) <= 2:
-            return self
-
-        internal_polygon = Polygon(intersection_nodes_list, sort_nodes=True)
-
-        if self == internal_polygon:
-            return None
-
-        new_area = self.area - internal_polygon.area
-        new_x = (self.area * self.xg - internal_polygon.area * internal_polygon.xg) / new_area
-        new_y = (self.area * self.yg - internal_polygon.area * internal_polygon.yg) / new_area
-
-        if not self._is_new_polygon_valid(new_area, new_x, new_y):
-            return None
-        self.modifications_count = self.modifications_count + 1
+        return Polygon([Node(xi, yi) for xi, yi in zip(x.tolist(), y.tolist())])
 
-        self.area = new_area
-        self.xg, self.yg = new_x, new_y
-        self.centroid_node = Node(new_x, new_y)
-        self.intersection_nodes_list = intersection_nodes_list + self.intersection_nodes_list
-        return self  # self modificado
+    def _get_clipped_vertices(self, other_polygon):
+        """Vertex arrays of the intersection of self with the CONVEX other_polygon (Sutherland-Hodgman)."""
+        x, y = get_counterclockwise_vertices(self.boundary_nodes_list)
+        clip_x, clip_y = get_counterclockwise_vertices(other_polygon.boundary_nodes_list)
+        return clip_polygon_with_convex_polygon(x, y, clip_x, clip_y, tolerance=TOLERANCE)
 
     @staticmethod
     def _is_new_polygon_valid(nueva_area, nueva_x, nueva_y):  # Criterio: área=0|nodo en infinito numérico.
         return not (-TOLERANCE * TOLERANCE <= nueva_area <= TOLERANCE * TOLERANCE or nueva_x == float(
             "inf") or nueva_y == float("inf"))
 
-    @staticmethod
-    def _get_shared_nodes_list(polygon_1, polygon_2):
-        """Returns a list of:
-        Nodes that intersect any of the edges between the polygons
-        Nodes from poligono_1 that are within poligono_2, and vice versa."""
-        
-        shared_nodes_list = polygon_1 & polygon_2  # Shared boundaries
-        if not shared_nodes_list:  # No intersection
-            return []
-
-        for nodo in polygon_2.boundary_nodes_list:  # Gets nodes from polygon_2 that are inside polygon_1
-            if polygon_1.is_node_inside_borderless_boundaries(nodo):
-                shared_nodes_list.append(nodo)
-        for nodo_pos in polygon_1.boundary_nodes_list:  # Gets nodes from polygon_2 that are inside polygon_1
-            if polygon_2.is_node_inside_borderless_boundaries(nodo_pos):
-                shared_nodes_list.append(nodo_pos)
-        intersection_nodes = NodeList(shared_nodes_list).remove_duplicates()
-        return intersection_nodes
-
     def is_segment_a_border_segment(self, segment: Segment):
         for border_segment in self.boundary_segments_list:
             if border_segment == segment:
@@ -471,7 +428,7 @@ class Polygon(object):
         for nodo_extremo in self.boundary_nodes_list:
             nodo_extremo.x = nodo_extremo.x + disp_x
             nodo_extremo.y = nodo_extremo.y + disp_y
-        self.boundary_segments_list = self._get_boundary_segments()
+        self._boundary_segments_list = None
 
 
 class RectangularElement(Polygon):
@@ -582,9 +539,11 @@ class CircularRegion(AnnularSectorElement):
         self.sign = sign
         super().__init__(centroid_node, boundary_radii_list, boundary_angles_list)
 
-    def generate_mesh(self, angle_discretization, radius_discretization):
-        """Define la lista de elements_list tipo ElementoRectangular que se encuentran dentro del region."""
-        finite_element_list = []
+    def generate_mesh(self, angle_discretization, radius_discretization, region_id=0):
+        """Generates the mesh of annular sectors: radius_discretization rings (thinner towards the external radius),
+        each divided in sectors of angle_discretization degrees.
+        :return: FiberSection with the annular sector fibers."""
+        sectors_list = []  # (internal radius, external radius, start angle, end angle) of each fiber.
 
         n = radius_discretization
         radii_function = lambda i: self.internal_radius + (self.external_radius - self.internal_radius) * (
@@ -595,16 +554,10 @@ class CircularRegion(AnnularSectorElement):
         i_inicial = 0
 
         if self.internal_radius == 0:  # Sector central circular
-            finite_element_list.append(AnnularSectorElement(
-                centroid_node=self.centroid_node,
-                boundary_angles_list=(self.start_angle, self.end_angle),
-                boundary_radii_list=(initial_radii, final_radii / 2)))
+            sectors_list.append((initial_radii, final_radii / 2, self.start_angle, self.end_angle))
             start_angle = self.start_angle
             while start_angle <= self.end_angle - angle_discretization:
-                finite_element_list.append(AnnularSectorElement(
-                    centroid_node=self.centroid_node,
-                    boundary_angles_list=(start_angle, start_angle + angle_discretization),
-                    boundary_radii_list=(final_radii / 2, final_radii)))
+                sectors_list.append((final_radii / 2, final_radii, start_angle, start_angle + angle_discretization))
                 start_angle = start_angle + angle_discretization
             i_inicial = i_inicial + 1
 
@@ -613,12 +566,11 @@ class CircularRegion(AnnularSectorElement):
             final_radii = radii_function(i_radii + 1)
             start_angle = self.start_angle
             while start_angle <= self.end_angle - angle_discretization:
-                finite_element_list.append(AnnularSectorElement(
-                    centroid_node=self.centroid_node,
-                    boundary_angles_list=(start_angle, start_angle + angle_discretization),
-                    boundary_radii_list=(initial_radii, final_radii)))
+                sectors_list.append((initial_radii, final_radii, start_angle, start_angle + angle_discretization))
                 start_angle = start_angle + angle_discretization
-        return finite_element_list
+        internal_radius, external_radius, start_angle, end_angle = np.array(sectors_list, dtype=float).reshape(-1, 4).T
+        return FiberSection.from_annular_sectors(
+            self.xc, self.yc, internal_radius, external_radius, start_angle, end_angle, region_id)
 
     def remove_outside_elements(self, elements_list):
         """Remove elements that lay outside the Polygon limits."""
@@ -645,136 +597,170 @@ class Region(Polygon):
         self.indice = indice
         super().__init__(nodes, sort_nodes=sort_nodes)
 
-    def generate_mesh(self, dx, dy):
-        """Generates the mesh based on contiguous RectangularElement"""
-        elements_list = self._get_raw_list_of_elements(dx, dy)
-        elements_list.sort(key=lambda element: (element.y, element.x))
-        # Non-valid elements are removed
-        lista_elem_validos = [elem for elem in elements_list if elem.area > TOLERANCE and (not (math.isnan(elem.xg) or math.isnan(elem.yg)))]
-        return self.remove_outside_elements(
-            lista_elem_validos)  # Additional filtering
-
-    def _get_raw_list_of_elements(self, dx, dy):
-        list_of_elements = []
-        direction_vectors_list = [(1, 1), (1, -1), (-1, -1), (-1, 1)]
-        for direccion in direction_vectors_list:
-            x_partida = self.xg + direccion[0] * dx / 2
-            y_partida = self.yg + direccion[1] * dy / 2
-            list_of_elements = list_of_elements + self.elements_per_direction(x_partida, y_partida, dx, dy,
-                                                                              direccion)
-        return list_of_elements
-
-    def elements_per_direction(self, x_partida, y_partida, dx, dy, direction: tuple):
-        x_max, y_max = max(self.x), max(self.y)
-        x_min, y_min = min(self.x), min(self.y)
-        elements_list = []
-        y_condition = lambda yp: yp - dy / 2 < y_max if direction[1] == 1 else yp + dy / 2 > y_min
-        x_condition = lambda xp: xp - dx / 2 < x_max if direction[0] == 1 else xp + dx / 2 > x_min
-        x = x_partida
-        y = y_partida
-        while y_condition(y):
-            while x_condition(x):
-                rectandultar_element = RectangularElement(center_location=Node(x, y), sides_length_tuple=(dx, dy))
-                rectandultar_element = rectandultar_element.get_intersection_polygon(self)  # Trimming boundaries
-                elements_list.append(rectandultar_element)
-                x = x + direction[0] * dx
-            y = y + direction[1] * dy
-            x = x_partida
-        return elements_list
-
-    def remove_outside_elements(self, elements_list):
-        """Remove elements from elements_list that lay outside the region."""
-        for i, nodo in enumerate(self.boundary_nodes_list):
-            node_1, node_2, node_3 = self._get_3_nodes_per_index(i)
-            line_1_2 = Line(node_1, node_2)
-            # The line equation returns numbers with the same sign for points on the same semi-plane.
-            inside_semi_plane_sign = line_1_2.line_implicit_equation(node_3)
-            if inside_semi_plane_sign == 0:
-                raise Exception(
-                    f"Por favor, ingresar puntos en el region que no estén alineados. Region de índice: {self.indice}")
-            for element in elements_list.copy():
-                element_semi_plane_sign = line_1_2.line_implicit_equation(element.centroid_node)
-                if inside_semi_plane_sign * element_semi_plane_sign < 0:  # The element is outside the region.
-                    elements_list.remove(element)
-        return elements_list
+    def generate_mesh(self, dx, dy, region_id=0):
+        """Generates the mesh based on contiguous rectangular cells, whose grid goes through the region centroid.
+        Cells straddling the boundary are trimmed to the region (see get_grid_cells_in_convex_polygon).
+        :return: FiberSection with the cells, sorted by position."""
+        x, y = get_counterclockwise_vertices(self.boundary_nodes_list)
+        interior_x, interior_y, boundary_cells = get_grid_cells_in_convex_polygon(
+            x, y, self.xg, self.yg, dx, dy, tolerance=TOLERANCE)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            boundary_polygons_list = [(cell_x, cell_y, *get_polygon_area_centroid(cell_x, cell_y))
+                                      for cell_x, cell_y in boundary_cells]
+        fibers = FiberSection.concatenate([FiberSection.from_rectangles(interior_x, interior_y, dx, dy, region_id),
+                                           FiberSection.from_polygons(boundary_polygons_list, region_id)])
+        # Non-valid fibers are removed
+        fibers = fibers.select((fibers.area > TOLERANCE) & ~np.isnan(fibers.xg) & ~np.isnan(fibers.yg))
+        return fibers.sort_by_position()
 
 
 class ArbitraryCrossSection(object):
     """An ArbitraryCrossSection combines Region elements.
-    Elements with a positive sign represent solid web regions, while negative ones represent void regions."""
+    Elements with a positive sign represent solid web regions, while negative ones represent void regions.
+    The resulting mesh is kept in fibers (see FiberSection)."""
 
     def __init__(self, regions: dict, mesh_data):
         self.dx, self.dy, self.dr, self.d_ang = mesh_data
         self.void_regions_list = [region for i_region, region in regions.items() if region.sign == -1]
         self.solid_regions_list = [region for i_region, region in regions.items() if region.sign == 1]
-        self.elements_list = self._get_solid_elements_list()
+        self.void_regions_index = BoundingBoxGridIndex(
+            [self.get_bounding_box(void_region) for void_region in self.void_regions_list])
+        self.void_vertices_list = [
+            get_counterclockwise_vertices(void_region.boundary_nodes_list) if void_region.tipo == "Poligonal" else None
+            for void_region in self.void_regions_list]
+        self.fibers = self._get_solid_fibers()
         self.area, self.xg, self.yg = self._compute_centroid_and_area()
         self.shift_coordinate_origin_to_centroid()
         self.Ix, self.Iy = self.compute_xy_moments_of_intertia()
         self.x_min, self.x_max, self.y_min, self.y_max = self.get_boundary_box_extremes()
 
-    def _get_solid_elements_list(self):
-        solid_elements_list = []
-        for solid_regions in self.solid_regions_list:
-            if solid_regions.tipo == "Poligonal":
-                lista_elements_list_positivos = solid_regions.generate_mesh(self.dx, self.dy)
+    def _get_solid_fibers(self):
+        solid_fibers_list = []
+        for region_id, solid_region in enumerate(self.solid_regions_list):
+            if solid_region.tipo == "Poligonal":
+                region_fibers = solid_region.generate_mesh(self.dx, self.dy, region_id=region_id)
             else:  # Circular
-                lista_elements_list_positivos = solid_regions.generate_mesh(angle_discretization=self.d_ang,
-                                                                            radius_discretization=self.dr)
-            for solid_element in lista_elements_list_positivos:
-                if self.is_element_in_negative_region(
-                        solid_element) or solid_element.area < TOLERANCE:
-                    continue  # Discards element
-                trimmed_element = self.intersect_solid_element_with_void_element(solid_element)
-                if trimmed_element and trimmed_element.area > TOLERANCE:
-                    solid_elements_list.append(trimmed_element)
-        if len(solid_elements_list) == 0:
+                region_fibers = solid_region.generate_mesh(angle_discretization=self.d_ang,
+                                                           radius_discretization=self.dr, region_id=region_id)
+            solid_fibers_list.append(self._subtract_voids(region_fibers))
+        fibers = FiberSection.concatenate(solid_fibers_list)
+        if len(fibers) == 0:
             raise Exception("Error en la generación de la geometría:\n"
                             "No se encontraron regions positivos por fuera de regions negativos.")
-        return solid_elements_list
+        return fibers
 
-    def is_element_in_negative_region(self, solid_element: Polygon):
-        for void_regionativo in self.void_regions_list:
-            if solid_element.is_node_in_element(void_regionativo):  # Pertenece COMPLETAMENTE a element
+    @staticmethod
+    def get_bounding_box(region):
+        """(x_min, x_max, y_min, y_max) of a polygonal region, or of the full circle around a circular one."""
+        if region.tipo == "Poligonal":
+            return min(region.x), max(region.x), min(region.y), max(region.y)
+        return (region.xc - region.external_radius, region.xc + region.external_radius,
+                region.yc - region.external_radius, region.yc + region.external_radius)
+
+    def _subtract_voids(self, fibers):
+        """Discards the fibers lying within a void, and subtracts the voids from the polygonal fibers crossing their
+        boundary (modifying their area and centroid in place; their outline is kept).
+        :return: FiberSection with the remaining fibers."""
+        is_covered, overlapping_voids_list = self._classify_fibers_against_voids(fibers)
+        is_kept = ~is_covered
+        vertex_offsets, is_sector = fibers.vertex_offsets.tolist(), fibers.is_sector.tolist()
+        for i_fiber in np.flatnonzero(is_kept).tolist():
+            overlapping_voids = overlapping_voids_list[i_fiber]
+            if not overlapping_voids:
+                continue
+            if self.is_fiber_in_negative_region(fibers.xg[i_fiber], fibers.yg[i_fiber], is_sector[i_fiber],
+                                                overlapping_voids):
+                is_kept[i_fiber] = False
+            elif not is_sector[i_fiber]:
+                start, end = vertex_offsets[i_fiber], vertex_offsets[i_fiber + 1]
+                trimmed_fiber = self.subtract_voids_from_polygon(
+                    fibers.vertex_x[start:end], fibers.vertex_y[start:end], fibers.area[i_fiber],
+                    fibers.xg[i_fiber], fibers.yg[i_fiber], overlapping_voids)
+                if trimmed_fiber is None:
+                    is_kept[i_fiber] = False
+                else:
+                    fibers.area[i_fiber], fibers.xg[i_fiber], fibers.yg[i_fiber] = trimmed_fiber
+        return fibers.select(is_kept & (fibers.area > TOLERANCE))
+
+    def _classify_fibers_against_voids(self, fibers):
+        """Matches the fibers against the voids their bounding box overlaps (see void_regions_index); fibers far
+        from every void skip the void tests entirely. The polygonal fibers are then classified against each
+        polygonal void all at once, by their bounding boxes.
+        :return: boolean array telling whether each fiber lies entirely within a void; and the list of void indices
+        each fiber has to be tested against (polygonal voids only when the fiber may cross their boundary)."""
+        is_covered = np.zeros(len(fibers), dtype=bool)
+        overlapping_voids_list = [[] for _ in range(len(fibers))]
+        bounds = fibers.get_bounding_boxes()
+        is_polygon = ~fibers.is_sector
+        for i_void, fiber_indices in self.void_regions_index.get_overlapping_queries(bounds).items():
+            if self.void_vertices_list[i_void] is not None:
+                polygon_fibers = fiber_indices[is_polygon[fiber_indices]]
+                is_inside, is_outside = classify_boxes_against_convex_polygon(
+                    *bounds[polygon_fibers].T, *self.void_vertices_list[i_void], tolerance=TOLERANCE)
+                is_covered[polygon_fibers[is_inside]] = True
+                fiber_indices = np.concatenate([polygon_fibers[~is_inside & ~is_outside],
+                                                fiber_indices[~is_polygon[fiber_indices]]])
+            for i_fiber in fiber_indices.tolist():
+                overlapping_voids_list[i_fiber].append(i_void)
+        return is_covered, overlapping_voids_list
+
+    def is_fiber_in_negative_region(self, xg, yg, is_sector, void_indices_list):
+        """Whether the centroid of the fiber lies within any of the voids (polygonal fibers against polygonal voids
+        are already classified by _classify_fibers_against_voids)."""
+        centroid_node = Node(xg, yg)
+        for i_void in void_indices_list:
+            if not is_sector and self.void_vertices_list[i_void] is not None:
+                continue
+            if self.void_regions_list[i_void].is_node_inside_boundaries(centroid_node):
                 return True
         return False
 
-    def intersect_solid_element_with_void_element(self, solid_element):
-        if not(isinstance(solid_element, AnnularSectorElement)):
-            for void_region in self.void_regions_list:
-                solid_element = solid_element.substract_with_other_polygon(void_region)
-                if solid_element is None:
-                    return None
-        return solid_element
+    def subtract_voids_from_polygon(self, x, y, area, xg, yg, void_indices_list):
+        """Subtracts the polygonal voids from the polygonal fiber of vertices (x, y), clipping it with each of them
+        (Sutherland-Hodgman) and removing the clipped area and first moments.
+        :return: the new (area, xg, yg) of the fiber, or None if it lies entirely within the voids."""
+        for i_void in void_indices_list:
+            if self.void_vertices_list[i_void] is None:
+                continue
+            void_x, void_y = self.void_vertices_list[i_void]
+            if not (x.min() < void_x.max() and void_x.min() < x.max() and
+                    y.min() < void_y.max() and void_y.min() < y.max()):
+                continue
+            clipped_x, clipped_y = clip_polygon_with_convex_polygon(x, y, void_x, void_y, tolerance=TOLERANCE)
+            if len(clipped_x) < 3:
+                continue
+            internal_area, internal_xg, internal_yg = get_polygon_area_centroid(clipped_x, clipped_y)
+            if internal_area <= TOLERANCE:
+                continue
+            if abs(area - internal_area) <= TOLERANCE and abs(xg - internal_xg) <= TOLERANCE and \
+                    abs(yg - internal_yg) <= TOLERANCE:  # The fiber lies entirely within the void.
+                return None
+            new_area = area - internal_area
+            new_x = (area * xg - internal_area * internal_xg) / new_area
+            new_y = (area * yg - internal_area * internal_yg) / new_area
+            if not Polygon._is_new_polygon_valid(new_area, new_x, new_y):
+                return None
+            area, xg, yg = new_area, new_x, new_y
+        return area, xg, yg
 
     def _compute_centroid_and_area(self):
-        area_total = 0
-        sx = 0
-        sy = 0
-        for element in self.elements_list:
-            area_total = area_total + element.area
-            sx = sx + element.area * element.xg
-            sy = sy + element.area * element.yg
-        return round(area_total, 10), round(sx / area_total, 10), round(sy / area_total, 10)
+        area_total, xg, yg = self.fibers.get_area_and_centroid()
+        return round(float(area_total), 10), round(float(xg), 10), round(float(yg), 10)
 
     def compute_xy_moments_of_intertia(self):
-        Ix = 0
-        Iy = 0
-        for element in self.elements_list:
-            Ix = Ix + element.area * (element.yg**2)
-            Iy = Iy + element.area * (element.xg**2)
-        return round(Ix, 0), round(Iy, 0)
+        Ix, Iy = self.fibers.get_moments_of_inertia()
+        return round(float(Ix), 0), round(float(Iy), 0)
 
     def shift_coordinate_origin_to_centroid(self):
-        for element in self.elements_list:
-            element.translate_reference_frame(disp_x=-self.xg, disp_y=-self.yg)
+        self.fibers.translate_reference_frame(disp_x=-self.xg, disp_y=-self.yg)
         for region_pos in self.solid_regions_list:
             region_pos.translate_reference_frame(disp_x=-self.xg, disp_y=-self.yg)
         for void_region in self.void_regions_list:
             void_region.translate_reference_frame(disp_x=-self.xg, disp_y=-self.yg)
 
     def get_boundary_box_extremes(self):
-        return min(x.xg for x in self.elements_list), max(x.xg for x in self.elements_list), min(x.yg for x in self.elements_list), max(x.yg for x in self.elements_list)
+        return float(self.fibers.xg.min()), float(self.fibers.xg.max()), float(self.fibers.yg.min()), float(
+            self.fibers.yg.max())
 
     def plotly(self, fig, planos_de_carga):
         plotly_util = ACSAHEPlotlyEngine(fig=fig)
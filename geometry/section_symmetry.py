@@ -0,0 +1,123 @@
+import numpy as np
+
+# Tolerance of the symmetry detection, relative to the size of the section (positions) or to the largest value
+# compared (areas and strains).
+SYMMETRY_TOLERANCE = 10 ** -6
+# Coordinate signs (x, y) of each symmetry transformation, about the centroid of the section.
+SYMMETRY_TRANSFORMATIONS = {"mirror_x": (1, -1), "mirror_y": (-1, 1), "point": (-1, -1)}
+
+
+class SectionSymmetry:
+    """Mirror and point symmetries of a section and its reinforcement, about the axes through its centroid (the
+    origin of the fiber coordinates):
+        - mirror_x: symmetric about the x axis, (x, y) -> (x, -y).
+        - mirror_y: symmetric about the y axis, (x, y) -> (-x, y).
+        - point: symmetric about the centroid, (x, y) -> (-x, -y). Implied by the other two together, but also found
+          alone (e.g. Z shapes or skew-symmetric reinforcement).
+
+    A symmetry maps any strain plane solution onto another one, with the same axial force and the moments mirrored,
+    so only part of the strain planes or loading planes has to be solved (see get_loading_plane_images and
+    get_neutral_axis_images)."""
+
+    def __init__(self, mirror_x=False, mirror_y=False, point=False):
+        # Any two of the symmetries imply the third one.
+        self.mirror_x = mirror_x or (mirror_y and point)
+        self.mirror_y = mirror_y or (mirror_x and point)
+        self.point = point or (mirror_x and mirror_y)
+
+    @classmethod
+    def from_geometric_solution(cls, geometric_solution):
+        """Symmetries of the concrete fibers, the passive bars and the prestressed bars (the latter including their
+        initial strain) of an ACSAHEGeometricSolution."""
+        fibers = geometric_solution.concrete_fibers
+        rebars, prestressed_bars = geometric_solution.rebar_array, geometric_solution.prestressed_rebar_array
+        point_sets = [
+            (fibers.xg, fibers.yg, [fibers.area]),
+            ([bar.xg for bar in rebars], [bar.yg for bar in rebars], [[bar.area for bar in rebars]]),
+            ([bar.xg for bar in prestressed_bars], [bar.yg for bar in prestressed_bars],
+             [[bar.area for bar in prestressed_bars], [bar.def_elastica_hormigon_perdidas for bar in prestressed_bars]])
+        ]
+        size = max(np.ptp(fibers.xg), np.ptp(fibers.yg)) if len(fibers) > 0 else 1.0
+        return cls(**{name: all(cls.is_point_set_invariant(x, y, values, signs, SYMMETRY_TOLERANCE * size)
+                                for x, y, values in point_sets)
+                      for name, signs in SYMMETRY_TRANSFORMATIONS.items()})
+
+    @staticmethod
+    def is_point_set_invariant(x, y, values_list, signs, position_tolerance):
+        """Whether the transformation (x, y) -> (sx·x, sy·y) maps every point onto another one with the same values.
+        :param values_list: list of arrays with one value per point (e.g. areas)."""
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        if len(x) == 0:
+            return True
+        values = np.column_stack([np.asarray(values, dtype=float) for values in values_list])
+        sx, sy = signs
+
+        def sort_points(points_x, points_y):
+            # Positions snapped to the tolerance only to sort the points, they are compared below.
+            order = np.lexsort((np.round(points_x / position_tolerance), np.round(points_y / position_tolerance)))
+            return points_x[order], points_y[order], values[order]
+
+        x_original, y_original, values_original = sort_points(x, y)
+        x_image, y_image, values_image = sort_points(sx * x, sy * y)
+        value_tolerance = SYMMETRY_TOLERANCE * np.abs(values).max(axis=0)
+        return bool(np.all(np.abs(x_original - x_image) <= position_tolerance)
+                    and np.all(np.abs(y_original - y_image) <= position_tolerance)
+                    and np.all(np.abs(values_original - values_image) <= value_tolerance))
+
+    def is_symmetric(self):
+        return self.mirror_x or self.mirror_y or self.point
+
+    def get_loading_plane_images(self, uniaxial_angle):
+        """Loading plane angles λ (degrees, in [0°, 360°), see UniaxialInteractionDiagram) whose interaction diagram
+        is the one of uniaxial_angle mirrored: every point (strain plane, sumF, Mx, My, phi) is mapped onto the point
+        (strain plane or its inverted one, sumF, sx·Mx, sy·My, phi) of the image. Besides the symmetries of the
+        section, λ + 180° is always an image, as the same loading plane with its sides swapped.
+        :return: dict (λ, swaps_strain_planes) -> (sx, sy), including (uniaxial_angle, False) -> (1, 1). Only that
+        entry is returned for angles out of [0°, 360°)."""
+        start = (round(uniaxial_angle % 360, 2), False)
+        if not 0 <= uniaxial_angle < 360:
+            return {start: (1, 1)}
+        generators = [(lambda angle: angle + 180, True, (1, 1))]
+        if self.mirror_x:
+            generators.append((lambda angle: -angle, True, (-1, 1)))
+        if self.mirror_y:
+            generators.append((lambda angle: -angle, False, (1, -1)))
+        if self.point:
+            generators.append((lambda angle: angle, True, (-1, -1)))
+        return self.get_orbit(start, [
+            (lambda state, apply=apply, swaps=swaps: (round(apply(state[0]) % 360, 2), state[1] != swaps), signs)
+            for apply, swaps, signs in generators])
+
+    def get_neutral_axis_images(self, thetas_count):
+        """Images of the neutral axis inclinations of a uniform grid of thetas_count values in [0°, 360°) (see
+        InteractionSurfaceSweep), for the same strain plane: the point symmetry maps θ onto θ + 180°, mirror_x onto
+        180° - θ and mirror_y onto -θ, mirroring the moments as in get_loading_plane_images.
+        :return: list with a dict (grid index -> (sx, sy)) per grid index, None if the grid does not contain the
+        images (thetas_count not even)."""
+        if thetas_count % 2 != 0:
+            return None
+        half = thetas_count // 2
+        generators = []
+        if self.mirror_x:
+            generators.append((lambda index: (half - index) % thetas_count, (-1, 1)))
+        if self.mirror_y:
+            generators.append((lambda index: -index % thetas_count, (1, -1)))
+        if self.point:
+            generators.append((lambda index: (index + half) % thetas_count, (-1, -1)))
+        return [self.get_orbit(index, generators) for index in range(thetas_count)]
+
+    @staticmethod
+    def get_orbit(start, generators):
+        """Images of start under the group spanned by generators, list of (apply, (sx, sy)). All the symmetries
+        commute and are their own inverse.
+        :return: dict image -> (sx, sy) moment signs from start to it."""
+        images = {start: (1, 1)}
+        pending = [start]
+        while pending:
+            state = pending.pop()
+            for apply, (sx, sy) in generators:
+                image = apply(state)
+                if image not in images:
+                    images[image] = (images[state][0] * sx, images[state][1] * sy)
+                    pending.append(image)
+        return images
@@ -0,0 +1,76 @@
+import math
+
+import numpy as np
+
+
+class BoundingBoxGridIndex:
+    """Uniform grid index over the bounding boxes (x_min, x_max, y_min, y_max) of a few items (e.g. void regions).
+    Each item is registered in the grid cells its box overlaps, so a large number of query boxes (e.g. mesh elements)
+    is matched only against the items sharing a cell with them, instead of against all of them."""
+
+    def __init__(self, bounds, cell_size=None):
+        """:param bounds: array with the bounding box of each item, with shape (items × 4).
+        :param cell_size: side of the grid cells. By default, the median size of the items."""
+        self.bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+        self.cells = {}  # (column, row) -> list of items.
+        if len(self.bounds) == 0:
+            self.cell_size, self.x_origin, self.y_origin = 1.0, 0.0, 0.0
+            return
+        sizes = np.maximum(self.bounds[:, 1] - self.bounds[:, 0], self.bounds[:, 3] - self.bounds[:, 2])
+        self.cell_size = cell_size or float(np.median(sizes)) or 1.0
+        self.x_origin, self.y_origin = self.bounds[:, 0].min(), self.bounds[:, 2].min()
+        for item, (x_min, x_max, y_min, y_max) in enumerate(self.bounds.tolist()):
+            for column in range(self._get_column(x_min), self._get_column(x_max) + 1):
+                for row in range(self._get_row(y_min), self._get_row(y_max) + 1):
+                    self.cells.setdefault((column, row), []).append(item)
+
+    def _get_column(self, x):
+        return math.floor((x - self.x_origin) / self.cell_size)
+
+    def _get_row(self, y):
+        return math.floor((y - self.y_origin) / self.cell_size)
+
+    def get_overlapping_queries(self, query_bounds):
+        """Matches the query boxes against the items.
+        :param query_bounds: array with the bounding box of each query, with shape (queries × 4).
+        :return: dict item -> array with the indices of the query boxes overlapping its bounding box. Items without
+        overlapping queries are omitted."""
+        query_bounds = np.asarray(query_bounds, dtype=float).reshape(-1, 4)
+        if len(query_bounds) == 0 or not self.cells:
+            return {}
+        first_column = np.floor((query_bounds[:, 0] - self.x_origin) / self.cell_size).astype(int)
+        last_column = np.floor((query_bounds[:, 1] - self.x_origin) / self.cell_size).astype(int)
+        first_row = np.floor((query_bounds[:, 2] - self.y_origin) / self.cell_size).astype(int)
+        last_row = np.floor((query_bounds[:, 3] - self.y_origin) / self.cell_size).astype(int)
+
+        # Expands every query into the (column, row) cells its box overlaps (mostly a single one).
+        columns_count = last_column - first_column + 1
+        cells_count = columns_count * (last_row - first_row + 1)
+        query = np.repeat(np.arange(len(query_bounds)), cells_count)
+        offset = np.arange(len(query)) - np.repeat(np.cumsum(cells_count) - cells_count, cells_count)
+        column = first_column[query] + offset % columns_count[query]
+        row = first_row[query] + offset // columns_count[query]
+
+        # Groups the (query, cell) pairs by cell, and hands each group to the items registered in that cell.
+        order = np.lexsort((row, column))
+        query, column, row = query[order], column[order], row[order]
+        is_group_start = np.ones(len(query), dtype=bool)
+        is_group_start[1:] = (column[1:] != column[:-1]) | (row[1:] != row[:-1])
+        group_starts = np.flatnonzero(is_group_start)
+        group_ends = np.append(group_starts[1:], len(query))
+        queries_per_item = {}
+        for start, end, cell in zip(group_starts.tolist(), group_ends.tolist(),
+                                    zip(column[group_starts].tolist(), row[group_starts].tolist())):
+            for item in self.cells.get(cell, ()):
+                queries_per_item.setdefault(item, []).append(query[start:end])
+
+        overlapping_queries = {}
+        for item, queries_list in queries_per_item.items():
+            queries = np.unique(np.concatenate(queries_list))
+            x_min, x_max, y_min, y_max = self.bounds[item]
+            candidate_bounds = query_bounds[queries]
+            overlaps = (candidate_bounds[:, 0] <= x_max) & (candidate_bounds[:, 1] >= x_min) & \
+                (candidate_bounds[:, 2] <= y_max) & (candidate_bounds[:, 3] >= y_min)
+            if overlaps.any():
+                overlapping_queries[item] = queries[overlaps]
+        return overlapping_queries
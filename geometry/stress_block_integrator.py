@@ -0,0 +1,136 @@
+import numpy as np
+
+from geometry.vectorized_geometry import get_clipped_polygon_area_moments, get_clipped_disk_area_moments, \
+    clip_polygon_with_convex_polygon, get_counterclockwise_vertices, get_signed_edge_distances
+
+
+class PolygonPiece:
+    """Convex polygon to integrate, given by its counterclockwise vertex arrays."""
+
+    def __init__(self, x, y):
+        self.x, self.y = x, y
+
+    def get_area_moments(self, a, b, c):
+        return get_clipped_polygon_area_moments(self.x, self.y, a, b, c)
+
+    def get_extreme_distances(self, sin_theta, cos_theta):
+        distances = -self.x * sin_theta + self.y * cos_theta
+        return distances.max(axis=1), distances.min(axis=1)
+
+
+class DiskPiece:
+    """Full disk to integrate, given by its center and radius."""
+
+    def __init__(self, xc, yc, radius):
+        self.xc, self.yc, self.radius = xc, yc, radius
+
+    def get_area_moments(self, a, b, c):
+        return get_clipped_disk_area_moments(self.xc, self.yc, self.radius, a, b, c)
+
+    def get_extreme_distances(self, sin_theta, cos_theta):
+        distance = (-self.xc * sin_theta + self.yc * cos_theta)[:, 0]
+        return distance + self.radius, distance - self.radius
+
+
+class AnalyticStressBlockIntegrator:
+    """Mesh-free integration of the rectangular stress block (see Concrete.simplified_stress_strain_eq) over the
+    regions of an ArbitraryCrossSection.
+
+    The stress is constant over the concrete whose strain is below (1 - B1) · e_max_comp, and zero elsewhere. The
+    concrete resultant is then the area and centroid of the section clipped by a half-plane, computed exactly: from
+    the boundary nodes for polygonal regions, and from the circular segment formulas for circular regions (an annulus
+    being its external disk minus its internal disk). The cost per evaluation is independent of the mesh size.
+
+    Each solid region counts positively, and each void region negatively within each solid region it overlaps. Voids
+    partially overlapping a circular region (or circular voids partially overlapping a solid region) are not
+    supported."""
+
+    def __init__(self, meshed_section):
+        self.pieces = []  # (sign, piece) of each convex polygon or disk to integrate.
+        for solid_region in meshed_section.solid_regions_list:
+            solid_pieces = self.get_region_pieces(solid_region)
+            self.pieces.extend((sign, piece) for sign, piece in solid_pieces)
+            for void_region in meshed_section.void_regions_list:
+                for sign, piece in self.get_void_pieces_within_region(void_region, solid_region, solid_pieces):
+                    self.pieces.append((-sign, piece))
+        self.outer_pieces = [piece for sign, piece in self.pieces if sign > 0]
+
+    @classmethod
+    def is_section_supported(cls, meshed_section):
+        try:
+            cls(meshed_section)
+        except ValueError:
+            return False
+        return True
+
+    @staticmethod
+    def get_region_pieces(region):
+        """(sign, piece) list whose sum is the region."""
+        if region.tipo == "Poligonal":
+            return [(1, PolygonPiece(*get_counterclockwise_vertices(region.boundary_nodes_list)))]
+        if region.tipo == "Circular" and region.end_angle - region.start_angle >= 360:
+            xc, yc = region.centroid_node.x, region.centroid_node.y
+            pieces = [(1, DiskPiece(xc, yc, region.external_radius))]
+            if region.internal_radius > 0:
+                pieces.append((-1, DiskPiece(xc, yc, region.internal_radius)))
+            return pieces
+        raise ValueError(f"La integración analítica del bloque de tensiones no admite regiones de tipo {region.tipo}.")
+
+    def get_void_pieces_within_region(self, void_region, solid_region, solid_pieces):
+        """(sign, piece) list whose sum is the intersection of void_region with solid_region."""
+        void_pieces = self.get_region_pieces(void_region)
+        _, outer_void = void_pieces[0]
+        if len(solid_pieces) == 1 and isinstance(solid_pieces[0][1], PolygonPiece):
+            solid = solid_pieces[0][1]
+            if isinstance(outer_void, PolygonPiece):
+                x, y = clip_polygon_with_convex_polygon(outer_void.x, outer_void.y, solid.x, solid.y)
+                return [(1, PolygonPiece(x, y))] if len(x) >= 3 else []
+            distances = get_signed_edge_distances(solid.x, solid.y, outer_void.xc, outer_void.yc)
+            if distances.min() >= outer_void.radius:
+                return void_pieces
+            if distances.min() <= -outer_void.radius:
+                return []
+        else:
+            _, outer_solid = solid_pieces[0]
+            inner_solid = solid_pieces[1][1] if len(solid_pieces) > 1 else None
+            if self.is_piece_outside_disk(outer_void, outer_solid):
+                return []
+            if self.is_piece_inside_disk(outer_void, outer_solid) and (
+                    inner_solid is None or self.is_piece_outside_disk(outer_void, inner_solid)):
+                return void_pieces
+        raise ValueError("La integración analítica del bloque de tensiones no admite huecos que se superpongan "
+                         "parcialmente con regiones circulares.")
+
+    @staticmethod
+    def is_piece_inside_disk(piece, disk):
+        if isinstance(piece, DiskPiece):
+            return np.hypot(piece.xc - disk.xc, piece.yc - disk.yc) + piece.radius <= disk.radius
+        return bool((np.hypot(piece.x - disk.xc, piece.y - disk.yc) <= disk.radius).all())
+
+    @staticmethod
+    def is_piece_outside_disk(piece, disk):
+        if isinstance(piece, DiskPiece):
+            return np.hypot(piece.xc - disk.xc, piece.yc - disk.yc) >= piece.radius + disk.radius
+        return get_signed_edge_distances(piece.x, piece.y, disk.xc, disk.yc).min() <= -disk.radius
+
+    def get_extreme_distances(self, sin_theta, cos_theta):
+        """Maximum and minimum distance of the section boundary to the neutral axis of each inclination (arrays with
+        one value per inclination)."""
+        extremes = [piece.get_extreme_distances(sin_theta, cos_theta) for piece in self.outer_pieces]
+        return np.max([maximum for maximum, _ in extremes], axis=0), np.min([minimum for _, minimum in extremes], axis=0)
+
+    def get_forces(self, concrete, sin_theta, cos_theta, slope, y_intercept, max_compression_strain):
+        """Concrete force and moments for each strain plane, whose strain at neutral axis distance d is
+        slope · d + y_intercept. All arguments but concrete are arrays with one value per strain plane.
+        :return: sumF, Mx, My arrays, with the sign conventions of the fiber integration."""
+        limit_strain = concrete.get_stress_block_limit_strain(max_compression_strain)
+        # slope · (-x·sinθ + y·cosθ) + y_intercept <= limit_strain, written as a·x + b·y <= c.
+        a, b, c = -slope * sin_theta, slope * cos_theta, limit_strain - y_intercept
+        area, first_moment_x, first_moment_y = 0.0, 0.0, 0.0
+        for sign, piece in self.pieces:
+            piece_area, piece_moment_x, piece_moment_y = piece.get_area_moments(a, b, c)
+            area = area + sign * piece_area
+            first_moment_x = first_moment_x + sign * piece_moment_x
+            first_moment_y = first_moment_y + sign * piece_moment_y
+        stress = concrete.get_stress_block_stress()
+        return stress * area, stress * first_moment_y, -stress * first_moment_x
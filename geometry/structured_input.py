@@ -0,0 +1,264 @@
+"""
+STRUCTURED INPUT
+================
+
+Input data of a section read from a JSON or TOML file instead of the Excel input workbook, so a section can be solved
+without any spreadsheet application (see STRUCTURED_INPUT.md for the schema and an example).
+
+get_input_data validates the contents of the file and returns them in the same form ACSAHEGeometricSolution reads
+from the input workbook (see ACSAHEGeometricSolution.get_excel_input_data), so both inputs build the same solution.
+"""
+
+import json
+import math
+import os
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ModuleNotFoundError:
+        tomllib = None
+
+STRUCTURED_INPUT_EXTENSIONS = (".json", ".toml")
+USER_PROVIDED_STEEL = "Provisto por usuario"
+# Options of the drop-down lists of the input workbook.
+REBAR_TYPES = ("ADN 420", "ADN 500", "AL 220", USER_PROVIDED_STEEL)
+PRESTRESSED_STEEL_TYPES = ("Barras 1050", "Cordones C1650", "Cordones C1900", USER_PROVIDED_STEEL)
+TRANSVERSE_REINFORCEMENT_TYPES = ("Estribos", "Zunchos en espiral")
+CONCRETE_REGION_TYPES = ("Poligonal", "Circular")
+CONCRETE_REGION_SIGNS = {"Positivo": +1, "Negativo": -1}
+MANUAL_DISCRETIZATION = "Avanzada (Ingreso Manual)"
+DISCRETIZATION_LEVELS = ("Muy Fina", "Fina", "Media", "Gruesa", "Muy Gruesa", MANUAL_DISCRETIZATION)
+DEFAULT_DISCRETIZATION_LEVEL = "Media"
+RESULT_TYPES = ("2D", "3D")
+# Ultimate strain of the rebar types provided by default, as in the 'Armaduras Pasivas' sheet of the input workbook.
+DEFAULT_REBAR_ULTIMATE_STRAIN = 0.12
+# Properties of a user provided steel, in the units of the 'Armaduras Pasivas' and 'Armaduras Activas' sheets.
+USER_PROVIDED_REBAR_PROPERTIES = ("fy", "E", "eu")
+USER_PROVIDED_PRESTRESSED_STEEL_PROPERTIES = ("Eps", "fpy", "fpu", "epu", "N", "K", "Q")
+
+
+def is_structured_input(file_path):
+    return os.path.splitext(str(file_path))[1].lower() in STRUCTURED_INPUT_EXTENSIONS
+
+
+def read_structured_input(file_path):
+    """Contents of a JSON or TOML input file, as a dict."""
+    extension = os.path.splitext(str(file_path))[1].lower()
+    try:
+        if extension == ".toml":
+            if tomllib is None:
+                raise ValueError("La lectura de archivos TOML requiere Python 3.11 o el paquete 'tomli'.")
+            with open(file_path, "rb") as input_file:
+                return tomllib.load(input_file)
+        with open(file_path, "r", encoding="utf-8") as input_file:
+            return json.load(input_file)
+    except (json.JSONDecodeError, getattr(tomllib, "TOMLDecodeError", json.JSONDecodeError)) as e:
+        raise ValueError(f"El archivo de entrada {os.path.basename(str(file_path))} no tiene un formato válido: {e}")
+
+
+def load_structured_input(file_path):
+    """Input data of the JSON or TOML file, validated (see get_input_data)."""
+    return get_input_data(read_structured_input(file_path))
+
+
+def get_input_data(contents):
+    """Validates the contents of a structured input file and completes the optional values.
+    :param contents: dict with the structure described in STRUCTURED_INPUT.md.
+    :return: dict with the input data, in the form of ACSAHEGeometricSolution.get_excel_input_data."""
+    _check_keys(contents, ("materiales", "contornos", "armaduras_pasivas", "armaduras_activas", "discretizacion",
+                           "resultados", "estados"), "")
+    armaduras_pasivas = [_get_bar(bar, "diametro", f"armaduras_pasivas[{i}]", i)
+                         for i, bar in enumerate(_get_list(contents, "armaduras_pasivas", "", default=[]))]
+    armaduras_activas = [_get_bar(bar, "area", f"armaduras_activas[{i}]", i)
+                         for i, bar in enumerate(_get_list(contents, "armaduras_activas", "", default=[]))]
+    resultados = _get_results(_get_table(contents, "resultados", ""))
+    return {
+        "materiales": _get_materials(_get_table(contents, "materiales", ""), has_prestress=bool(armaduras_activas)),
+        "contornos": _get_concrete_regions(_get_list(contents, "contornos", "")),
+        "armaduras_pasivas": armaduras_pasivas,
+        "armaduras_activas": armaduras_activas,
+        "discretizacion": _get_discretization(_get_table(contents, "discretizacion", "", default={})),
+        "resultados": resultados,
+        "estados": [_get_load_combination(combination, resultados["tipo"], f"estados[{i}]", i)
+                    for i, combination in enumerate(_get_list(contents, "estados", "", default=[]))],
+    }
+
+
+def _get_materials(materiales, has_prestress):
+    _check_keys(materiales, ("hormigon", "armadura_transversal", "acero_pasivo", "acero_activo"), "materiales")
+    return {
+        "hormigon": _get_number(materiales, "hormigon", "materiales", positive=True),
+        "armadura_transversal": _get_option(materiales, "armadura_transversal", "materiales",
+                                            TRANSVERSE_REINFORCEMENT_TYPES),
+        "acero_pasivo": _get_rebar_steel(_get_steel_table(materiales, "acero_pasivo")),
+        "acero_activo": _get_prestressed_steel(_get_steel_table(materiales, "acero_activo"), has_prestress),
+    }
+
+
+def _get_steel_table(materiales, key):
+    """The steel may be given by its type only (e.g. acero_pasivo = "ADN 420") or as a table with its properties."""
+    steel = materiales.get(key)
+    return {"tipo": steel} if isinstance(steel, str) else _get_table(materiales, key, "materiales")
+
+
+def _get_rebar_steel(acero_pasivo):
+    path = "materiales.acero_pasivo"
+    _check_keys(acero_pasivo, ("tipo",) + USER_PROVIDED_REBAR_PROPERTIES, path)
+    tipo = _get_option(acero_pasivo, "tipo", path, REBAR_TYPES)
+    if tipo == USER_PROVIDED_STEEL:
+        return {"tipo": tipo, **{key: _get_number(acero_pasivo, key, path, positive=True)
+                                 for key in USER_PROVIDED_REBAR_PROPERTIES}}
+    return {"tipo": tipo, "eu": _get_number(acero_pasivo, "eu", path, positive=True,
+                                            default=DEFAULT_REBAR_ULTIMATE_STRAIN)}
+
+
+def _get_prestressed_steel(acero_activo, has_prestress):
+    path = "materiales.acero_activo"
+    _check_keys(acero_activo, ("tipo", "deformacion_de_pretensado_inicial") +
+                USER_PROVIDED_PRESTRESSED_STEEL_PROPERTIES, path)
+    tipo = _get_option(acero_activo, "tipo", path, PRESTRESSED_STEEL_TYPES, case_sensitive=False)
+    # The initial prestress strain (in ‰) only matters when there are prestressed bars.
+    result = {"tipo": tipo, "deformacion_de_pretensado_inicial": _get_number(
+        acero_activo, "deformacion_de_pretensado_inicial", path, positive=has_prestress,
+        default=None if has_prestress else 0)}
+    if tipo == USER_PROVIDED_STEEL:
+        result.update({key: _get_number(acero_activo, key, path, positive=True)
+                       for key in USER_PROVIDED_PRESTRESSED_STEEL_PROPERTIES})
+    return result
+
+
+def _get_concrete_regions(contornos):
+    if not contornos:
+        raise ValueError("La sección debe tener al menos un contorno en 'contornos'.")
+    regions = [_get_concrete_region(region, f"contornos[{i}]", i) for i, region in enumerate(contornos)]
+    if not any(region["signo"] > 0 for region in regions):
+        raise ValueError("La sección debe tener al menos un contorno de signo 'Positivo'.")
+    return regions
+
+
+def _get_concrete_region(region, path, index):
+    _check_keys(region, ("tipo", "signo", "indice", "nodos", "centro", "radio_interno", "radio_externo"), path)
+    tipo = _get_option(region, "tipo", path, CONCRETE_REGION_TYPES)
+    result = {
+        "tipo": tipo,
+        "signo": CONCRETE_REGION_SIGNS[_get_option(region, "signo", path, tuple(CONCRETE_REGION_SIGNS),
+                                                   default="Positivo")],
+        "indice": str(region.get("indice", index + 1)),
+    }
+    if tipo == "Poligonal":
+        nodes = [_get_point(node, f"{path}.nodos[{i}]") for i, node in enumerate(_get_list(region, "nodos", path))]
+        if len(nodes) < 3:
+            raise ValueError(f"Valor incorrecto en '{path}.nodos': un contorno poligonal requiere al menos 3 nodos.")
+        result["nodos"] = nodes
+    else:
+        result["centro"] = _get_point(region.get("centro"), f"{path}.centro")
+        result["radio_interno"] = _get_number(region, "radio_interno", path, default=0)
+        result["radio_externo"] = _get_number(region, "radio_externo", path, positive=True)
+        if not 0 <= result["radio_interno"] < result["radio_externo"]:
+            raise ValueError(f"Valor incorrecto en '{path}': el radio interno debe ser no negativo y menor que el "
+                             f"radio externo.")
+    return result
+
+
+def _get_bar(bar, size_key, path, index):
+    """Rebar (size_key 'diametro', in mm) or prestressed bar (size_key 'area', in cm²), coordinates in cm."""
+    _check_keys(bar, ("x", "y", size_key, "indice"), path)
+    return {"x": _get_number(bar, "x", path), "y": _get_number(bar, "y", path),
+            size_key: _get_number(bar, size_key, path, positive=True), "indice": bar.get("indice", index + 1)}
+
+
+def _get_discretization(discretizacion):
+    path = "discretizacion"
+    _check_keys(discretizacion, ("nivel", "dx", "dy", "d_ang"), path)
+    nivel = _get_option(discretizacion, "nivel", path, DISCRETIZATION_LEVELS, default=DEFAULT_DISCRETIZATION_LEVEL)
+    is_manual = nivel == MANUAL_DISCRETIZATION
+    return {"nivel": nivel, **{key: _get_number(discretizacion, key, path, positive=True) if is_manual else None
+                               for key in ("dx", "dy", "d_ang")}}
+
+
+def _get_results(resultados):
+    path = "resultados"
+    _check_keys(resultados, ("tipo", "phi", "verificacion", "planos_de_carga"), path)
+    tipo = _get_option(resultados, "tipo", path, RESULT_TYPES)
+    phi = resultados.get("phi")
+    if not (isinstance(phi, str) and "CIRSOC 201" in phi.upper() or _is_number(phi) and 0 < phi <= 1):
+        raise ValueError(f"Valor incorrecto en '{path}.phi': se esperaba un valor constante entre 0 y 1, "
+                         f"'Según CIRSOC 201-2005' o 'Según CIRSOC 201-2024'.")
+    verificacion = resultados.get("verificacion", False)
+    if not isinstance(verificacion, bool):
+        raise ValueError(f"Valor incorrecto en '{path}.verificacion': se esperaba true o false.")
+    planos_de_carga = _get_list(resultados, "planos_de_carga", path)
+    for i, angle in enumerate(planos_de_carga):
+        if not _is_number(angle):
+            raise ValueError(f"Valor incorrecto en '{path}.planos_de_carga[{i}]': {angle!r}. Se esperaba un ángulo "
+                             f"en grados.")
+    if tipo == "2D" and len(planos_de_carga) != 1 or not planos_de_carga:
+        raise ValueError(f"Valor incorrecto en '{path}.planos_de_carga': un problema 2D requiere un único plano de "
+                         f"carga y un problema 3D al menos uno.")
+    return {"tipo": tipo, "phi": phi, "verificacion": verificacion, "resultados_en_wb": False,
+            "planos_de_carga": planos_de_carga}
+
+
+def _get_load_combination(combination, type_of_problem, path, index):
+    moment_keys = ("M",) if type_of_problem == "2D" else ("Mx", "My")
+    _check_keys(combination, ("nombre", "P", "plano_de_carga") + moment_keys, path)
+    load_combination = {"nombre": combination.get("nombre", index + 1), "P": _get_number(combination, "P", path)}
+    load_combination.update({key: _get_number(combination, key, path, default=0) for key in moment_keys})
+    if type_of_problem == "3D":
+        load_combination["plano_de_carga"] = _get_number(combination, "plano_de_carga", path, default=0)
+    return load_combination
+
+
+def _check_keys(table, allowed_keys, path):
+    unknown_keys = [key for key in table if key not in allowed_keys]
+    if unknown_keys:
+        raise ValueError(f"Clave(s) no reconocida(s) en '{path or 'archivo de entrada'}': {', '.join(unknown_keys)}. "
+                         f"Las claves válidas son: {', '.join(allowed_keys)}.")
+
+
+def _get_table(table, key, path, default=None):
+    value = table.get(key, default)
+    if not isinstance(value, dict):
+        raise ValueError(f"Falta la sección '{_join(path, key)}' o su valor no es una tabla.")
+    return value
+
+
+def _get_list(table, key, path, default=None):
+    value = table.get(key, default)
+    if not isinstance(value, list):
+        raise ValueError(f"Falta '{_join(path, key)}' o su valor no es una lista.")
+    return value
+
+
+def _get_option(table, key, path, options, default=None, case_sensitive=True):
+    value = table.get(key, default)
+    normalized_options = {option if case_sensitive else option.upper(): option for option in options}
+    if isinstance(value, str) and (value if case_sensitive else value.upper()) in normalized_options:
+        return normalized_options[value if case_sensitive else value.upper()]
+    raise ValueError(f"Valor incorrecto en '{_join(path, key)}': {value!r}. Los valores posibles son: "
+                     f"{', '.join(options)}.")
+
+
+def _get_number(table, key, path, positive=False, default=None):
+    value = table.get(key, default)
+    if not _is_number(value) or positive and value <= 0:
+        raise ValueError(f"Valor incorrecto en '{_join(path, key)}': {value!r}. Se esperaba un número"
+                         f"{' positivo' if positive else ''}.")
+    return value
+
+
+def _get_point(value, path):
+    if not isinstance(value, (list, tuple)) or len(value) != 2 or not all(_is_number(v) for v in value):
+        raise ValueError(f"Valor incorrecto en '{path}': {value!r}. Se esperaban las coordenadas [x, y] en cm.")
+    return tuple(value)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _join(path, key):
+    return f"{path}.{key}" if path else key
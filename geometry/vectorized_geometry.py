@@ -0,0 +1,178 @@
+"""Array-based polygon and disk operations, used where the same shape is evaluated many times (e.g. once per strain
+plane).
+
+Polygons are given as arrays of vertex coordinates, in counterclockwise order, and disks by their center and radius.
+Half-planes are given as the coefficients (a, b, c) of the inequality a·x + b·y <= c, either scalars or arrays with
+one value per half-plane."""
+import math
+
+import numpy as np
+
+
+def get_polygon_area_moments(x, y):
+    """Area and first moments (∫x dA, ∫y dA) of the polygon of vertices (x, y)."""
+    x_next, y_next = np.roll(x, -1), np.roll(y, -1)
+    cross = x * y_next - x_next * y
+    return cross.sum() / 2, ((x + x_next) * cross).sum() / 6, ((y + y_next) * cross).sum() / 6
+
+
+def get_polygon_area_centroid(x, y):
+    """Area and centroid (xg, yg) of the counterclockwise polygon of vertices (x, y)."""
+    area, first_moment_x, first_moment_y = get_polygon_area_moments(x, y)
+    return area, first_moment_x / area, first_moment_y / area
+
+
+def get_clipped_polygon_area_moments(x, y, a, b, c):
+    """Area and first moments (∫x dA, ∫y dA) of the part of a CONVEX polygon inside each half-plane
+    a·x + b·y <= c, computed exactly from its vertices.
+
+    Green's theorem is applied to the boundary of the clipped polygon: the inside portion of every edge plus the
+    closing segment along the half-plane limit, which joins the exit point to the entry point (a convex polygon has
+    at most one of each).
+    :param x, y: arrays with the n vertices of the polygon.
+    :param a, b, c: arrays with the coefficients of the P half-planes.
+    :return: three arrays of length P."""
+    a, b, c = (np.asarray(coefficient, dtype=float).reshape(-1, 1) for coefficient in (a, b, c))
+    x_next, y_next = np.roll(x, -1), np.roll(y, -1)
+
+    g = a * x + b * y - c  # (P × n); inside where g <= 0.
+    g_next = np.roll(g, -1, axis=1)
+    inside, inside_next = g <= 0, g_next <= 0
+    is_exit, is_entry = inside & ~inside_next, ~inside & inside_next
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(is_exit | is_entry, g / (g - g_next), 0.0)
+    x_cut, y_cut = x + t * (x_next - x), y + t * (y_next - y)
+
+    # Inside portion of each edge, from (x_start, y_start) to (x_end, y_end). Edges fully outside are degenerate.
+    x_start, y_start = np.where(inside, x, x_cut), np.where(inside, y, y_cut)
+    x_end, y_end = np.where(inside_next, x_next, x_cut), np.where(inside_next, y_next, y_cut)
+    has_segment = inside | inside_next
+    x_start, y_start = np.where(has_segment, x_start, 0.0), np.where(has_segment, y_start, 0.0)
+    x_end, y_end = np.where(has_segment, x_end, 0.0), np.where(has_segment, y_end, 0.0)
+
+    # Closing segment, from the exit point to the entry point.
+    x_exit, y_exit = np.where(is_exit, x_cut, 0.0).sum(axis=1), np.where(is_exit, y_cut, 0.0).sum(axis=1)
+    x_entry, y_entry = np.where(is_entry, x_cut, 0.0).sum(axis=1), np.where(is_entry, y_cut, 0.0).sum(axis=1)
+
+    cross = x_start * y_end - x_end * y_start
+    closing_cross = x_exit * y_entry - x_entry * y_exit
+    area = (cross.sum(axis=1) + closing_cross) / 2
+    first_moment_x = (((x_start + x_end) * cross).sum(axis=1) + (x_exit + x_entry) * closing_cross) / 6
+    first_moment_y = (((y_start + y_end) * cross).sum(axis=1) + (y_exit + y_entry) * closing_cross) / 6
+    return area, first_moment_x, first_moment_y
+
+
+def get_clipped_disk_area_moments(xc, yc, radius, a, b, c):
+    """Area and first moments (∫x dA, ∫y dA) of the part of the disk of center (xc, yc) inside each half-plane
+    a·x + b·y <= c, from the closed-form circular segment formulas.
+
+    With s the distance to the center along the unit normal n of the limit line, and d the distance of the line, the
+    segment s > d has area R²·acos(d/R) - d·√(R² - d²) and ∫s dA = 2/3·(R² - d²)^(3/2).
+    :param a, b, c: arrays with the coefficients of the P half-planes.
+    :return: three arrays of length P."""
+    a, b, c = (np.asarray(coefficient, dtype=float) for coefficient in (a, b, c))
+    norm = np.hypot(a, b)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d = np.where(norm > 0, (c - a * xc - b * yc) / norm, np.where(c >= 0, np.inf, -np.inf))
+        n_x, n_y = np.where(norm > 0, a / norm, 0.0), np.where(norm > 0, b / norm, 0.0)
+    d = np.clip(d, -radius, radius)
+    chord = np.sqrt(radius ** 2 - d ** 2)
+    area = math.pi * radius ** 2 - (radius ** 2 * np.arccos(d / radius) - d * chord)
+    normal_moment = -2 / 3 * chord ** 3  # ∫s dA of the inside part, as the whole disk has ∫s dA = 0.
+    return area, xc * area + n_x * normal_moment, yc * area + n_y * normal_moment
+
+
+def clip_polygon_with_half_plane(x, y, a, b, c, tolerance=0.0):
+    """Vertices of the part of the polygon (x, y) inside the half-plane a·x + b·y <= c (single half-plane).
+    One step of the Sutherland-Hodgman algorithm. Vertices within tolerance of the limit line are taken as lying on
+    it, so no duplicated vertices are created."""
+    g = a * x + b * y - c
+    g = np.where(np.abs(g) <= tolerance, 0.0, g)
+    clipped_x, clipped_y = [], []
+    for i in range(len(x)):
+        j = (i + 1) % len(x)
+        if g[i] <= 0:
+            clipped_x.append(x[i])
+            clipped_y.append(y[i])
+        if g[i] * g[j] < 0:  # The edge strictly crosses the limit line.
+            t = g[i] / (g[i] - g[j])
+            clipped_x.append(x[i] + t * (x[j] - x[i]))
+            clipped_y.append(y[i] + t * (y[j] - y[i]))
+    return np.array(clipped_x, dtype=float), np.array(clipped_y, dtype=float)
+
+
+def clip_polygon_with_convex_polygon(x, y, clip_x, clip_y, tolerance=0.0):
+    """Vertices of the intersection of the polygon (x, y) with the CONVEX counterclockwise polygon
+    (clip_x, clip_y), clipping successively with the half-plane of each of its edges (Sutherland-Hodgman).
+    :param tolerance: distance to an edge below which a vertex is taken as lying on it."""
+    for i in range(len(clip_x)):
+        j = (i + 1) % len(clip_x)
+        # Inside of a counterclockwise edge is on its left: (x_j - x_i)(y - y_i) - (y_j - y_i)(x - x_i) >= 0.
+        a, b = clip_y[j] - clip_y[i], -(clip_x[j] - clip_x[i])
+        norm = math.hypot(a, b)
+        a, b = a / norm, b / norm
+        x, y = clip_polygon_with_half_plane(x, y, a, b, a * clip_x[i] + b * clip_y[i], tolerance)
+        if len(x) < 3:
+            return np.zeros(0), np.zeros(0)
+    return x, y
+
+
+def get_grid_cells_in_convex_polygon(x, y, x_origin, y_origin, dx, dy, tolerance=0.0):
+    """Rectangular grid cells of size dx × dy, whose lines go through (x_origin, y_origin), covering the CONVEX
+    counterclockwise polygon (x, y).
+
+    The cells are classified all at once (see classify_boxes_against_convex_polygon): cells inside the polygon are
+    kept whole, cells outside it are discarded, and only the cells straddling the boundary are clipped
+    (Sutherland-Hodgman).
+    :return: arrays with the centers of the interior cells (x, y), and a list with the vertex arrays (x, y) of the
+    clipped boundary cells."""
+    columns = np.arange(math.floor((x.min() - x_origin) / dx), math.ceil((x.max() - x_origin) / dx))
+    rows = np.arange(math.floor((y.min() - y_origin) / dy), math.ceil((y.max() - y_origin) / dy))
+    center_x, center_y = np.meshgrid(x_origin + (columns + 0.5) * dx, y_origin + (rows + 0.5) * dy)
+    center_x, center_y = center_x.ravel(), center_y.ravel()
+
+    is_interior, is_exterior = classify_boxes_against_convex_polygon(
+        center_x - dx / 2, center_x + dx / 2, center_y - dy / 2, center_y + dy / 2, x, y, tolerance)
+    is_boundary = ~is_interior & ~is_exterior
+
+    boundary_cells = []
+    for cell in np.flatnonzero(is_boundary):
+        cell_x = center_x[cell] + np.array([1, -1, -1, 1]) * dx / 2
+        cell_y = center_y[cell] + np.array([1, 1, -1, -1]) * dy / 2
+        cell_x, cell_y = clip_polygon_with_convex_polygon(cell_x, cell_y, x, y, tolerance)
+        if len(cell_x) >= 3:
+            boundary_cells.append((cell_x, cell_y))
+    return center_x[is_interior], center_y[is_interior], boundary_cells
+
+
+def classify_boxes_against_convex_polygon(x_min, x_max, y_min, y_max, x, y, tolerance=0.0):
+    """Classifies axis-aligned boxes (arrays with their bounds) against the CONVEX counterclockwise polygon (x, y), from
+    the distances of their corners to the half-plane of each polygon edge, all computed at once.
+    :return: boolean arrays telling which boxes lie entirely inside the polygon, and which entirely outside it (beyond
+    a single edge). Boxes in neither of them cross its boundary."""
+    corner_x = np.stack([x_max, x_min, x_min, x_max], axis=1)
+    corner_y = np.stack([y_max, y_max, y_min, y_min], axis=1)
+    x_next, y_next = np.roll(x, -1), np.roll(y, -1)
+    edge_length = np.hypot(x_next - x, y_next - y)
+    a, b = (y_next - y) / edge_length, -(x_next - x) / edge_length
+    # Distances (boxes × corners × edges) of the corners to the polygon edges, positive outside.
+    distances = corner_x[:, :, None] * a + corner_y[:, :, None] * b - (a * x + b * y)
+    is_inside = (distances <= tolerance).all(axis=(1, 2))
+    is_outside = (distances >= -tolerance).all(axis=1).any(axis=1)
+    return is_inside, is_outside
+
+
+def get_counterclockwise_vertices(nodes):
+    """Vertex coordinate arrays of a list of Node objects, reversed if needed to be counterclockwise."""
+    x = np.array([node.x for node in nodes], dtype=float)
+    y = np.array([node.y for node in nodes], dtype=float)
+    if get_polygon_area_moments(x, y)[0] < 0:
+        return x[::-1], y[::-1]
+    return x, y
+
+
+def get_signed_edge_distances(x, y, px, py):
+    """Distance of the point (px, py) to the line of each edge of the CONVEX counterclockwise polygon (x, y),
+    positive on the inner side. The point is inside the polygon when all of them are positive."""
+    x_next, y_next = np.roll(x, -1), np.roll(y, -1)
+    return ((x_next - x) * (py - y) - (y_next - y) * (px - x)) / np.hypot(x_next - x, y_next - y)
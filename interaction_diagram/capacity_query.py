@@ -0,0 +1,257 @@
+import math
+
+from geometry.section_analysis import STRAIN_PLANES_COUNT
+from interaction_diagram.interaction_diagram_builder import UniaxialInteractionDiagram
+
+# Default tolerance of the capacity query: relative difference between the positions along the load combination ray
+# of the two diagram points bracketing the capacity.
+CAPACITY_QUERY_TOLERANCE = 10 ** -3
+# Maximum number of strain planes solved along a branch of the diagram after the initial bracket.
+CAPACITY_QUERY_MAX_ITERATIONS = 40
+# Strain plane parameter j of the first inner point of each branch, close to the balanced failure.
+CAPACITY_QUERY_INITIAL_PLANE = 150
+# Smallest bracket width of the strain plane parameter j.
+CAPACITY_QUERY_MIN_PLANE_STEP = 10 ** -4
+
+
+class UniaxialCapacityQuery(UniaxialInteractionDiagram):
+    """UniaxialInteractionDiagram that solves no strain plane upfront, but only the ones needed to find the capacity
+    along the ray of a given load (see get_ray_capacity).
+
+    The diagram of the loading plane is made of two branches, the strain planes and their inverted ones, each going
+    from the pure compression plane (j = 0) to the pure tension one (j = 349) on one side of the loading plane. Along
+    the branch on the side of the load, the angle between the load and the diagram point changes sign once, at the
+    capacity, so it is root-found over j by false position (Illinois variant), and the capacity is the intersection of
+    the load ray with the chord of the final bracket. The neutral axis inclination of each j is solved as for any
+    strain plane, seeded with the one of the nearest plane solved. Where the inclinations are not found, the bracket
+    is not refined further, and its chord bridges those planes as the full diagram does."""
+
+    def __init__(self, uniaxial_angle, geometric_solution, source_query=None, concrete_integration="auto"):
+        """:param source_query: UniaxialCapacityQuery of the same section whose fiber arrays and concrete integrator
+        are shared, instead of loading them again."""
+        self.source_query = source_query
+        self.solved_branch_points = {}  # (j, is_positive) -> (theta in degrees, diagram point), None if not solved.
+        super().__init__(uniaxial_angle, geometric_solution, concrete_integration=concrete_integration)
+        self.compression_force_limit = self._get_maximum_compression_value()
+
+    def _load_fiber_arrays(self):
+        source = self.source_query
+        if source is None:
+            return super()._load_fiber_arrays()
+        self.concrete_element_array = source.concrete_element_array
+        self.rebar_array = source.rebar_array
+        self.prestressed_reinforcement_array = source.prestressed_reinforcement_array
+        self.phi_strength_reduction_factor = source.phi_strength_reduction_factor
+        self.max_degree_diff = source.max_degree_diff
+        self.concrete_fiber_index = source.concrete_fiber_index
+        self.steel_fiber_index = source.steel_fiber_index
+
+    def get_concrete_integrator(self, concrete_integration):
+        if self.source_query is None:
+            return super().get_concrete_integrator(concrete_integration)
+        return self.source_query.concrete_integrator
+
+    def iterate_solution(self):
+        return []
+
+    def solve_branch_point(self, j, is_positive):
+        """Diagram point of the strain plane of parameter j (see ACSAHEGeometricSolution.get_strain_plane), or of its
+        inverted one if not is_positive. None if its neutral axis inclination is not found."""
+        key = (j, is_positive)
+        if key not in self.solved_branch_points:
+            plano_de_deformacion = self.geometric_solution.get_strain_plane(j)
+            if not is_positive:
+                plano_de_deformacion = self.get_inverted_strain_plane(plano_de_deformacion)
+            branch = [(abs(solved_j - j), solution[0]) for (solved_j, positive), solution in
+                      self.solved_branch_points.items() if positive == is_positive and solution is not None]
+            if plano_de_deformacion[0] == plano_de_deformacion[1]:  # Uniform strain, the same for any inclination.
+                theta, failure = math.radians(-self.uniaxial_angle), None
+            else:
+                # Seeded with the nearest plane solved, and with the default seed if it does not converge from there.
+                for theta_seed in dict.fromkeys([min(branch)[1] if branch else None, None]):
+                    theta, failure = self.find_neutral_axis_inclination(plano_de_deformacion, theta_seed)
+                    if theta is not None:
+                        break
+            if theta is None:
+                self.no_solution_points_list.append(failure)
+                self.solved_branch_points[key] = None
+            else:
+                sumF, Mx, My, phi = self.get_solution_for_theta_and_strain_plane(theta, *plano_de_deformacion)
+                self.solved_branch_points[key] = (math.degrees(theta), self.build_interaction_diagram_point(
+                    plano_de_deformacion, sumF, Mx, My, phi))
+        solution = self.solved_branch_points[key]
+        return None if solution is None else solution[1]
+
+    def get_meridian_coordinates(self, sumF, Mx, My):
+        """(moment, sumF) coordinates on the loading plane, the moment being projected on its direction."""
+        direction = math.radians(self.expected_moment_angle)
+        return Mx * math.cos(direction) + My * math.sin(direction), sumF
+
+    def get_ray_capacity(self, sumF, Mx, My, tolerance=CAPACITY_QUERY_TOLERANCE):
+        """Capacity of the section along the ray from the origin through the load (sumF, Mx, My), in the units and
+        signs of the diagram points (design values), the moment being on the loading plane. Points over the maximum
+        compression are capped, as in review_capped_points.
+        :param tolerance: see CAPACITY_QUERY_TOLERANCE.
+        :return: dict with the capacity point (sumF, Mx, My, phi, plano_de_deformacion, is_capped), its
+        demanda_capacidad ratio and the number of strain planes solved; None for a null load."""
+        demand = self.get_meridian_coordinates(sumF, Mx, My)
+        if demand == (0, 0):
+            return None
+        solved_count = len(self.solved_branch_points)
+        compression, tension = (self.solve_branch_point(j, True) for j in (0, STRAIN_PLANES_COUNT - 1))
+        if compression is None or tension is None:
+            raise ValueError(
+                "No se encontró solución para los planos de deformación de compresión o tracción pura.")
+
+        # Diagram coordinates normalized by its size, so that the tolerance does not depend on the units.
+        force_scale = max(abs(tension["sumF"] - compression["sumF"]), 1e-9)
+        inner_point = self.solve_branch_point(CAPACITY_QUERY_INITIAL_PLANE, True)
+        if inner_point is None:
+            raise ValueError(
+                f"No se encontró solución para el plano de deformación j={CAPACITY_QUERY_INITIAL_PLANE}.")
+        inner_moment = self.get_meridian_coordinates(inner_point["sumF"], inner_point["Mx"], inner_point["My"])[0]
+        moment_scale = max(abs(inner_moment), 1e-9)
+        demand_x, demand_y = demand[0] / moment_scale, demand[1] / force_scale
+
+        def get_ray_angle(point):
+            """Angle from the load to the point, in normalized coordinates."""
+            moment, force = self.get_meridian_coordinates(point["sumF"], point["Mx"], point["My"])
+            x, y = moment / moment_scale, force / force_scale
+            return math.atan2(demand_x * y - demand_y * x, demand_x * x + demand_y * y)
+
+        def get_ray_position(point):
+            """Projection of the point on the load ray, in units of the load."""
+            moment, force = self.get_meridian_coordinates(point["sumF"], point["Mx"], point["My"])
+            x, y = moment / moment_scale, force / force_scale
+            return (demand_x * x + demand_y * y) / (demand_x ** 2 + demand_y ** 2)
+
+        # The branch on the side of the load first; both are tried for loads along the axis of the diagram.
+        positive_side = inner_moment >= 0
+        for is_positive in sorted((True, False), key=lambda positive: (positive == positive_side) != (demand[0] >= 0)):
+            points = [(j, self.solve_branch_point(j, is_positive)) for j in (
+                0, CAPACITY_QUERY_INITIAL_PLANE, STRAIN_PLANES_COUNT - 1)]
+            if any(point is None for _, point in points):
+                continue
+            angles = [(j, get_ray_angle(point), point) for j, point in points]
+            # The bracket crosses the load, not its opposite ray, when the angles add up to less than 180°.
+            bracket = next(((a, b) for a, b in zip(angles[:-1], angles[1:])
+                            if a[1] * b[1] <= 0 and abs(a[1]) + abs(b[1]) < math.pi), None)
+            if bracket is not None:
+                break
+        else:
+            raise ValueError("El rayo del estado de carga no interseca el diagrama de interacción.")
+
+        (j_a, angle_a, point_a), (j_b, angle_b, point_b) = bracket
+        retained_side = 0
+        for _ in range(CAPACITY_QUERY_MAX_ITERATIONS):
+            if angle_a == 0 or angle_b == 0 or j_b - j_a <= CAPACITY_QUERY_MIN_PLANE_STEP:
+                break
+            # Converged when both ends of the bracket are at the same position along the ray. Their angle to the ray
+            # is not enough, as the diagram may run almost parallel to it.
+            position_a, position_b = get_ray_position(point_a), get_ray_position(point_b)
+            if abs(position_a - position_b) <= tolerance * max(abs(position_a), abs(position_b)):
+                break
+            j = (j_a * angle_b - j_b * angle_a) / (angle_b - angle_a)
+            point = self.solve_branch_point(j, is_positive)
+            if point is None:
+                j = (j_a + j_b) / 2
+                point = self.solve_branch_point(j, is_positive)
+            if point is None:  # Bridged by the chord of the bracket, as the full diagram skips these planes.
+                break
+            angle = get_ray_angle(point)
+            if angle * angle_a > 0:
+                j_a, angle_a, point_a = j, angle, point
+                angle_b = angle_b / 2 if retained_side == 1 else angle_b  # Illinois: the b end was kept twice.
+                retained_side = 1
+            else:
+                j_b, angle_b, point_b = j, angle, point
+                angle_a = angle_a / 2 if retained_side == -1 else angle_a
+                retained_side = -1
+
+        capacity = self._get_chord_capacity(demand, point_a, point_b)
+        if capacity is None:
+            raise ValueError("El rayo del estado de carga no interseca el diagrama de interacción.")
+        t, fraction = capacity
+        phi = point_a["phi"] + fraction * (point_b["phi"] - point_a["phi"])
+        j = j_a + fraction * (j_b - j_a)
+        plano_de_deformacion = self.geometric_solution.get_strain_plane(j)
+        if not is_positive:
+            plano_de_deformacion = self.get_inverted_strain_plane(plano_de_deformacion)
+        is_capped = -t * sumF / phi > self.compression_force_limit
+        if is_capped:
+            t = self.compression_force_limit * phi / -sumF
+        return {
+            "sumF": t * sumF,
+            "Mx": t * Mx,
+            "My": t * My,
+            "phi": phi,
+            "plano_de_deformacion": plano_de_deformacion,
+            "is_capped": is_capped,
+            "demanda_capacidad": 1 / t,
+            "planos_resueltos": len(self.solved_branch_points) - solved_count,
+        }
+
+    def _get_chord_capacity(self, demand, point_a, point_b):
+        """Intersection of the load ray with the chord between two diagram points: t, the capacity being t times the
+        load, and the fraction of the chord from point_a."""
+        a = self.get_meridian_coordinates(point_a["sumF"], point_a["Mx"], point_a["My"])
+        b = self.get_meridian_coordinates(point_b["sumF"], point_b["Mx"], point_b["My"])
+        edge = (b[0] - a[0], b[1] - a[1])
+        denominator = demand[0] * edge[1] - demand[1] * edge[0]
+        if denominator == 0:  # Both points on the ray.
+            return (math.hypot(*a) / math.hypot(*demand), 0.0) if a != (0, 0) else None
+        t = (a[0] * edge[1] - a[1] * edge[0]) / denominator
+        fraction = (a[0] * demand[1] - a[1] * demand[0]) / denominator
+        return (t, min(max(fraction, 0.0), 1.0)) if t > 0 else None
+
+
+class SectionCapacityQuery:
+    """Capacity of a section along the ray of single load combinations, without building their interaction diagrams.
+    A UniaxialCapacityQuery is kept per loading plane, all of them sharing the fiber arrays, so later combinations on
+    the same plane reuse the strain planes already solved."""
+
+    def __init__(self, geometric_solution, concrete_integration="auto"):
+        self.geometric_solution = geometric_solution
+        self.concrete_integration = concrete_integration
+        self.uniaxial_queries = {}
+
+    def get_uniaxial_query(self, uniaxial_angle):
+        # λ and λ + 180° are the same loading plane, with its branches swapped.
+        key = round(uniaxial_angle % 180, 2)
+        if key not in self.uniaxial_queries:
+            source_query = next(iter(self.uniaxial_queries.values()), None)
+            self.uniaxial_queries[key] = UniaxialCapacityQuery(
+                key, self.geometric_solution, source_query, concrete_integration=self.concrete_integration)
+        return self.uniaxial_queries[key]
+
+    @staticmethod
+    def get_uniaxial_angle(Mx, My):
+        """Loading plane angle λ (degrees, in [0°, 180°)) of the moment (Mx, My) of a diagram point, 0 for a null
+        moment."""
+        if Mx == 0 and My == 0:
+            return 0.0
+        return (180 - UniaxialInteractionDiagram.get_moment_angle(Mx, My)) % 180
+
+    def get_capacity(self, P, Mx, My, tolerance=CAPACITY_QUERY_TOLERANCE):
+        """Capacity along the ray of a load combination, given as in problema["puntos_a_verificar"] (kN and kNm,
+        compression positive).
+        :return: dict with the capacity (P, Mx, My), its loading plane angle, phi, strain plane and whether it is
+        capped, the demanda_capacidad ratio and the number of strain planes solved. The capacity is None for a null
+        load."""
+        sumF, diagram_Mx, diagram_My = -P, -Mx * 100, -My * 100  # Units and signs of the diagram points.
+        uniaxial_angle = self.get_uniaxial_angle(diagram_Mx, diagram_My)
+        capacity = self.get_uniaxial_query(uniaxial_angle).get_ray_capacity(sumF, diagram_Mx, diagram_My, tolerance)
+        if capacity is None:
+            return {"P": None, "Mx": None, "My": None, "plano_de_carga": uniaxial_angle, "demanda_capacidad": 0.0}
+        return {
+            "P": float(-capacity["sumF"]),
+            "Mx": float(-capacity["Mx"] / 100),
+            "My": float(-capacity["My"] / 100),
+            "plano_de_carga": uniaxial_angle,
+            "phi": float(capacity["phi"]),
+            "plano_de_deformacion": tuple(float(value) if isinstance(value, float) else value
+                                         for value in capacity["plano_de_deformacion"]),
+            "is_capped": bool(capacity["is_capped"]),
+            "demanda_capacidad": float(capacity["demanda_capacidad"]),
+            "planos_resueltos": capacity["planos_resueltos"],
+        }
@@ -1,51 +1,141 @@
 import colorsys
 import logging
 import traceback
-from tkinter import messagebox
 import os
 from concurrent.futures import ThreadPoolExecutor
 import math
 import numpy as np
-from scipy.optimize import fsolve
+from scipy.optimize import fsolve, brentq
 from functools import lru_cache
 import copy
 
-from geometry.section_analysis import ACSAHEGeometricSolution
+from geometry.section_analysis import ACSAHEGeometricSolution, STRAIN_PLANES_COUNT, STRAIN_PLANE_FAMILY_LIMITS
+from geometry.stress_block_integrator import AnalyticStressBlockIntegrator
+from materials.acero_pasivo import BarraAceroPasivo
+from materials.acero_pretensado import BarraAceroPretensado
+from interaction_diagram.solution_cache import BoundedCache
+from interaction_diagram.process_pool_backend import solve_strain_planes_in_processes
 
 # Base tolerance for neutral axis inclination precision (degrees)
 BASE_MAX_DEGREE_DIFF = 0.5
-
-
-def show_message(message, titulo="Mensaje"):
-    messagebox.showinfo(titulo, message)
+# Execution backends for the neutral axis solver (see solve_strain_planes).
+SOLVER_BACKENDS = ("threads", "processes")
+# Integration methods of the concrete stress block (see get_concrete_integrator).
+CONCRETE_INTEGRATION_METHODS = ("auto", "fibers", "analytic")
+# Neutral axis inclinations are snapped to multiples of this value (radians, 0.001°) before being cached.
+THETA_CACHE_QUANTUM = math.radians(0.001)
+# Maximum number of entries of the per-diagram caches of section forces and of rotated fiber arrays.
+SOLUTION_CACHE_SIZE = 4096
+ROTATION_CACHE_SIZE = 128
+# Number of consecutive strain planes solved by continuation from the same initial seed (see
+# solve_strain_plane_sequence). Tasks are made of whole runs, so the solution does not depend on the number of workers
+# nor on the chunk size.
+CONTINUATION_RUN_LENGTH = 16
+# Half-widths (degrees) of the successive intervals explored around the seed when bracketing the neutral axis angle.
+INCLINATION_BRACKET_STEPS = (0.5, 1, 2, 4, 8, 16, 32, 64, 90)
+# Newton's method on the neutral axis angle, tried before the bracketing (see _solve_inclination_with_newton):
+# maximum number of iterations and maximum step (degrees).
+INCLINATION_NEWTON_MAX_ITERATIONS = 8
+INCLINATION_NEWTON_MAX_STEP = 30
+# Adaptive strain plane refinement: initial spacing of the plane parameter j, smallest spacing allowed, maximum
+# turning angle (degrees) of the diagram between consecutive points and maximum number of subdivision passes.
+ADAPTIVE_INITIAL_PLANE_STEP = 10
+ADAPTIVE_MIN_PLANE_STEP = 0.5
+ADAPTIVE_MAX_TURNING_ANGLE = 10
+ADAPTIVE_MAX_ITERATIONS = 8
+ADAPTIVE_MIN_SEGMENT_FRACTION = 0.25
 
 
 class UniaxialInteractionDiagram:
 
-    def __init__(self, uniaxial_angle, geometric_solution: ACSAHEGeometricSolution):
+    def __init__(self, uniaxial_angle, geometric_solution: ACSAHEGeometricSolution, adaptive_tolerance=None,
+                 backend="threads", max_workers=None, chunk_size=None, process_pool=None, concrete_integration="auto"):
+        """:param adaptive_tolerance: when given, the strain planes are refined adaptively (see
+        iterate_adaptive_solution) instead of using the fixed set of geometric_solution.planos_de_deformacion.
+        :param backend: "threads" or "processes". The latter solves the strain planes in a process pool, sharing the
+        fiber arrays through shared memory (see process_pool_backend).
+        :param max_workers: number of workers. By default, the number of CPUs.
+        :param chunk_size: number of contiguous strain planes per task, rounded up to a multiple of
+        CONTINUATION_RUN_LENGTH. By default, the planes are split evenly among the workers. Neither max_workers nor
+        chunk_size change the solution.
+        :param process_pool: StrainPlaneProcessPool shared with other diagrams of the same section, used by the
+        "processes" backend instead of creating its own pool.
+        :param concrete_integration: "fibers" (sum over the mesh elements), "analytic" (exact integration of the
+        stress block over the regions, see AnalyticStressBlockIntegrator) or "auto" (analytic for sections with
+        circular regions, whose meshes are the densest, and fibers otherwise). On polygonal sections "analytic" is
+        slower than the fibers (about twice, since their prefix sums are cached per inclination), so it is only
+        worthwhile there to avoid the discretization error of the mesh."""
         self.geometric_solution = geometric_solution
-        self.concrete_element_array = self.get_concrete_element_array()
-        self.rebar_array = self.get_rebar_array()
-        self.prestressed_reinforcement_array = self.get_prestressed_reinforcement_array()
+        self._load_fiber_arrays()
+        self.concrete_integrator = self.get_concrete_integrator(concrete_integration)
+        self._init_caches()
         self.uniaxial_angle = uniaxial_angle
+        self.adaptive_tolerance = adaptive_tolerance
+        if backend not in SOLVER_BACKENDS:
+            raise ValueError(f"Backend '{backend}' no soportado. Opciones: {', '.join(SOLVER_BACKENDS)}.")
+        self.backend = backend
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.process_pool = process_pool
         self.expected_moment_angle = self.get_expected_moment_angle()
-        self.phi_strength_reduction_factor = geometric_solution.problema["phi_variable"]
-        self.max_degree_diff = self.get_degree_tolerance(geometric_solution)
         try:
             self.no_solution_points_list = []
             self.interaction_diagram_points_list = self.iterate_solution()
+            self.solved_points_list = list(self.interaction_diagram_points_list)  # Before capping.
             self.review_capped_points()
         except Exception as e:
+            # Not shown to the user here: diagrams may be built in worker threads (see solve_load_plane_angles), and
+            # the message is shown by the caller, from its own thread.
             traceback.print_exc()
-            show_message(e)
             raise e
         finally:
-            logging.log(1, "Se terminó la ejecución")
+            logging.log(1, f"Se terminó la ejecución. Cachés: {self.get_cache_statistics()}")
+
+    def _load_fiber_arrays(self):
+        """Loads the fiber arrays and the section-dependent settings needed to evaluate strain planes."""
+        self.concrete_element_array = self.get_concrete_element_array()
+        self.rebar_array = self.get_rebar_array()
+        self.prestressed_reinforcement_array = self.get_prestressed_reinforcement_array()
+        self.phi_strength_reduction_factor = self.geometric_solution.problema["phi_variable"]
+        self.max_degree_diff = self.get_degree_tolerance(self.geometric_solution)
+        self.concrete_fiber_index = self.geometric_solution.concrete_fiber_index
+        self.steel_fiber_index = self.geometric_solution.steel_fiber_index
+
+    def get_concrete_integrator(self, concrete_integration):
+        """None for the fiber integration of concrete, or the mesh-free integrator of the section otherwise. Both the
+        scalar (see _compute_analytic_solution_for_theta_and_strain_plane) and the batched evaluations use it."""
+        if concrete_integration not in CONCRETE_INTEGRATION_METHODS:
+            raise ValueError(f"Método de integración del hormigón '{concrete_integration}' no soportado. "
+                             f"Opciones: {', '.join(CONCRETE_INTEGRATION_METHODS)}.")
+        meshed_section = self.geometric_solution.meshed_section
+        if concrete_integration == "auto":
+            has_circular_regions = any(region.tipo == "Circular" for region in
+                                       meshed_section.solid_regions_list + meshed_section.void_regions_list)
+            is_analytic = has_circular_regions and AnalyticStressBlockIntegrator.is_section_supported(meshed_section)
+            concrete_integration = "analytic" if is_analytic else "fibers"
+        if concrete_integration == "fibers":
+            return None
+        return AnalyticStressBlockIntegrator(meshed_section)
+
+    def _init_caches(self):
+        """Caches owned by this diagram (see get_solution_for_theta_and_strain_plane), released together with it."""
+        self.solution_cache = BoundedCache(SOLUTION_CACHE_SIZE)
+        self.rotation_cache = BoundedCache(ROTATION_CACHE_SIZE)
+
+    def get_cache_statistics(self):
+        return {"solution": self.solution_cache.get_statistics(), "rotation": self.rotation_cache.get_statistics()}
+
+    def clear_caches(self):
+        self.solution_cache.clear()
+        self.rotation_cache.clear()
 
     def get_concrete_element_array(self):
-        return np.array([
-            (element.xg, element.yg, element.area, 0.0, 0.0) for element in self.geometric_solution.concrete_array],
-            dtype=[('xg', float), ('yg', float), ('area', float), ("neutral_axis_distance", float), ('strain', float)])
+        fibers = self.geometric_solution.concrete_fibers
+        concrete_element_array = np.zeros(len(fibers), dtype=[
+            ('xg', float), ('yg', float), ('area', float), ("neutral_axis_distance", float), ('strain', float)])
+        concrete_element_array['xg'], concrete_element_array['yg'] = fibers.xg, fibers.yg
+        concrete_element_array['area'] = fibers.area
+        return concrete_element_array
 
     def get_rebar_array(self):
         return np.array([
@@ -64,72 +154,341 @@ class UniaxialInteractionDiagram:
                    ('flexural_strain', float), ('concrete_shortening_strain', float), ('effective_strain', float), ('total_strain', float)])
 
     def iterate_solution(self):
-        """Método principal para la obtención de los diagramas de interacción."""
-        interaction_diagram_points = []
+        """Método principal para la obtención de los diagramas de interacción.
+
+        When a symmetry of the section maps the diagram onto itself, swapping each strain plane with its inverted one
+        (see get_inverted_planes_moment_signs), only the strain planes of positive family index are solved, and the
+        points of the inverted ones are mirrored from them."""
         try:
-            # Ensure we don't create more worker threads than strain planes available.
-            strain_planes = list(self.geometric_solution.planos_de_deformacion)
-            if not strain_planes:
-                return interaction_diagram_points
-
-            cpu_count = os.cpu_count() or 1
-            max_workers = min(len(strain_planes), cpu_count)
-
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all futures and keep them in a list to preserve order
-                futures = [executor.submit(self.solve_limit_planes, plano) for plano in strain_planes]
-                
-                # Retrieve results in submission order (not completion order)
-                # This guarantees strain plane ordering is preserved
-                for future in futures:
-                    result = future.result()
-                    if result is not None:
-                        interaction_diagram_points.append(result)
+            moment_signs = self.get_inverted_planes_moment_signs()
+            solves_inverted_planes = moment_signs is None
+            if self.adaptive_tolerance is not None:
+                points = self.iterate_adaptive_solution(solves_inverted_planes)
+            else:
+                points = self.solve_strain_planes([plano for plano in self.geometric_solution.planos_de_deformacion
+                                                   if solves_inverted_planes or plano[2] > 0])
+            if solves_inverted_planes:
+                return points
+            self.no_solution_points_list.extend([self.get_mirrored_failure(failure, True)
+                                                 for failure in self.no_solution_points_list])
+            return points + [self.get_mirrored_point(point, True, moment_signs) for point in points]
         except Exception as e:
             traceback.print_exc()
             raise(e)
+
+    def get_inverted_planes_moment_signs(self):
+        """Moment signs (sx, sy) of the symmetry of the section that maps the diagram onto itself swapping each strain
+        plane with its inverted one (see SectionSymmetry.get_loading_plane_images), or None if there is not any."""
+        images = self.geometric_solution.symmetry.get_loading_plane_images(self.uniaxial_angle)
+        return images.get((round(self.uniaxial_angle % 360, 2), True))
+
+    def get_mirrored_point(self, point, swaps_strain_planes, moment_signs):
+        """Point of this diagram that is the image of the point of a symmetric one (see
+        SectionSymmetry.get_loading_plane_images)."""
+        plano = point["plano_de_deformacion"]
+        sx, sy = moment_signs
+        return self.build_interaction_diagram_point(
+            self.get_inverted_strain_plane(plano) if swaps_strain_planes else plano, point["sumF"], sx * point["Mx"],
+            sy * point["My"], point["phi"])
+
+    def get_mirrored_failure(self, failure, swaps_strain_planes):
+        plano = failure["plano_de_deformacion"]
+        return {"plano_de_deformacion": self.get_inverted_strain_plane(plano) if swaps_strain_planes else plano,
+                "reason": failure["reason"]}
+
+    @staticmethod
+    def get_inverted_strain_plane(plano_de_deformacion):
+        """Strain plane with the strains of its extreme fibers swapped, as the inverted planes of
+        ACSAHEGeometricSolution.get_strain_planes."""
+        return (plano_de_deformacion[1], plano_de_deformacion[0], -plano_de_deformacion[2], -plano_de_deformacion[3])
+
+    def solve_strain_planes(self, strain_planes):
+        """Solves the neutral axis inclination of every strain plane and evaluates the resulting points, preserving
+        the order of strain_planes. Planes without solution are left out (see no_solution_points_list)."""
+        interaction_diagram_points = []
+        if not strain_planes:
+            return interaction_diagram_points
+
+        # Ensure we don't create more workers than strain planes available.
+        max_workers = min(len(strain_planes), self.max_workers or os.cpu_count() or 1)
+        # Each worker solves contiguous runs of strain planes, so that every plane can be warm-started from the
+        # solution of its neighbour. Chunks are rounded up to whole continuation runs, which always start at the same
+        # planes whatever the number of workers.
+        chunk_size = self.chunk_size or math.ceil(len(strain_planes) / max_workers)
+        chunk_size = math.ceil(chunk_size / CONTINUATION_RUN_LENGTH) * CONTINUATION_RUN_LENGTH
+
+        if self.backend == "processes":
+            thetas, failures = solve_strain_planes_in_processes(self, strain_planes, max_workers, chunk_size)
+        else:
+            thetas, failures = self._solve_strain_planes_in_threads(strain_planes, max_workers, chunk_size)
+        self.no_solution_points_list.extend(failures)
+        solved = [(plano, theta) for plano, theta in zip(strain_planes, thetas) if theta is not None]
+        solved_planes, solved_thetas = [plano for plano, _ in solved], [theta for _, theta in solved]
+
+        # All converged points are evaluated together as a single batch.
+        sumF, Mx, My, phi = self.get_solutions_for_thetas_and_strain_planes(solved_thetas, solved_planes)
+        for i, plano in enumerate(solved_planes):
+            interaction_diagram_points.append(self.build_interaction_diagram_point(
+                plano, float(sumF[i]), float(Mx[i]), float(My[i]), float(phi[i])))
         return interaction_diagram_points
 
-    def solve_limit_planes(self, plano_de_deformacion):
+    def _solve_strain_planes_in_threads(self, strain_planes, max_workers, chunk_size):
+        chunks = [strain_planes[i:i + chunk_size] for i in range(0, len(strain_planes), chunk_size)]
+        thetas, failures = [], []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Submit all futures and keep them in a list to preserve order
+            futures = [executor.submit(self.solve_strain_plane_sequence, chunk) for chunk in chunks]
+
+            # Retrieve results in submission order (not completion order)
+            # This guarantees strain plane ordering is preserved
+            for future in futures:
+                chunk_thetas, chunk_failures = future.result()
+                thetas.extend(chunk_thetas)
+                failures.extend(chunk_failures)
+        return thetas, failures
+
+    def iterate_adaptive_solution(self, solves_inverted_planes=True):
+        """Builds the diagram from a coarse set of strain planes, subdividing only the intervals of the plane
+        parameter j (see ACSAHEGeometricSolution.get_strain_plane) where the diagram turns more than
+        ADAPTIVE_MAX_TURNING_ANGLE or where consecutive points are farther apart than adaptive_tolerance (relative
+        to the size of the diagram). Both the strain planes and their inverted counterparts are refined, unless
+        solves_inverted_planes is False."""
+        plane_parameters = sorted(set(range(0, STRAIN_PLANES_COUNT, ADAPTIVE_INITIAL_PLANE_STEP)).union(
+            STRAIN_PLANE_FAMILY_LIMITS))
+        points = {}  # Solved points by strain plane (j, sign of the family index).
+        for _ in range(ADAPTIVE_MAX_ITERATIONS):
+            new_planes = [plano for plano in self.geometric_solution.get_strain_planes(plane_parameters)
+                          if (plano[3], plano[2] > 0) not in points and (solves_inverted_planes or plano[2] > 0)]
+            solved_planes = {plano: None for plano in new_planes}
+            for point in self.solve_strain_planes(new_planes):
+                solved_planes[point["plano_de_deformacion"]] = point
+            points.update({(plano[3], plano[2] > 0): point for plano, point in solved_planes.items()})
+
+            new_parameters = self._get_plane_parameters_to_refine(points)
+            if not new_parameters:
+                break
+            plane_parameters = new_parameters
+
+        return [points[key] for key in sorted(points, key=lambda key: (not key[1], abs(key[0])))
+                if points[key] is not None]
+
+    def _get_plane_parameters_to_refine(self, points):
+        solved = [point for point in points.values() if point is not None]
+        if len(solved) < 2:
+            return []
+        # Diagram coordinates are normalized so that the tolerance is relative to its size.
+        moment_scale = max(max(math.hypot(point["Mx"], point["My"]) for point in solved), 1e-9)
+        force_scale = max(max(point["sumF"] for point in solved) - min(point["sumF"] for point in solved), 1e-9)
+
+        new_parameters = set()
+        for is_positive in (True, False):
+            branch = sorted((abs(j), point) for (j, positive), point in points.items()
+                            if positive == is_positive and point is not None)
+            if len(branch) < 2:
+                continue
+            parameters = np.array([j for j, _ in branch], dtype=float)
+            coordinates = np.array([(point["Mx"] / moment_scale, point["My"] / moment_scale,
+                                     point["sumF"] / force_scale) for _, point in branch])
+            segments = np.diff(coordinates, axis=0)
+            lengths = np.linalg.norm(segments, axis=1)
+            to_refine = lengths > self.adaptive_tolerance
+
+            # Turning angle at each inner vertex; both adjacent intervals are refined when it is too sharp. Segments
+            # shorter than a fraction of the tolerance are not considered, as their direction is dominated by the
+            # angular tolerance of the neutral axis solver.
+            with np.errstate(invalid="ignore", divide="ignore"):
+                cos_turn = np.einsum("ij,ij->i", segments[:-1], segments[1:]) / (lengths[:-1] * lengths[1:])
+            is_sharp = (np.nan_to_num(cos_turn, nan=1.0) < math.cos(math.radians(ADAPTIVE_MAX_TURNING_ANGLE))) & (
+                np.minimum(lengths[:-1], lengths[1:]) > self.adaptive_tolerance * ADAPTIVE_MIN_SEGMENT_FRACTION)
+            to_refine[:-1] |= is_sharp
+            to_refine[1:] |= is_sharp
+
+            is_divisible = np.diff(parameters) > 2 * ADAPTIVE_MIN_PLANE_STEP
+            new_parameters.update(((parameters[:-1] + parameters[1:]) / 2)[to_refine & is_divisible].tolist())
+        return sorted(new_parameters)
+
+    def build_interaction_diagram_point(self, plano_de_deformacion, sumF, Mx, My, phi):
+        return {
+            "sumF": sumF,
+            "M": self.get_resulting_uniaxial_moment(Mx, My),
+            "plano_de_deformacion": plano_de_deformacion,
+            # color is only a property used for occasional plots when debugging or writing papers.
+            "color": self.transform_number_in_rainbow_color(abs(plano_de_deformacion[3])),
+            "phi": phi,
+            "Mx": Mx,
+            "My": My,
+            "is_capped": False  # Some compression points will later be capped according to ACI 318-25 22.4.2.
+        }
+
+    def solve_limit_planes(self, plano_de_deformacion, theta_seed=None):
+        theta, failure = self.find_neutral_axis_inclination(plano_de_deformacion, theta_seed)
+        if theta is None:
+            self.no_solution_points_list.append(failure)
+            return None
+        sumF, Mx, My, phi = self.get_solution_for_theta_and_strain_plane(theta, *plano_de_deformacion)
+        return self.build_interaction_diagram_point(plano_de_deformacion, sumF, Mx, My, phi)
+
+    def solve_strain_plane_sequence(self, planos_de_deformacion):
+        """Solves consecutive strain planes by continuation: each plane is seeded with the converged inclination of
+        the previous one, since neighbouring planes have nearly identical solutions. The seed is reset every
+        CONTINUATION_RUN_LENGTH planes, so planos_de_deformacion must start at the beginning of a run (see
+        solve_strain_planes).
+        :return: list with the inclination (radians) per plane, None for planes without solution; and the list of
+        diagnostics of those failed planes."""
+        thetas, failures = [], []
+        theta_seed = None
+        for i, plano_de_deformacion in enumerate(planos_de_deformacion):
+            if i % CONTINUATION_RUN_LENGTH == 0:
+                theta_seed = None
+            theta, failure = self.find_neutral_axis_inclination(plano_de_deformacion, theta_seed)
+            thetas.append(theta)
+            if theta is None:
+                failures.append(failure)
+            else:
+                theta_seed = math.degrees(theta)
+        return thetas, failures
+
+    def find_neutral_axis_inclination(self, plano_de_deformacion, theta_seed=None):
+        """Finds the neutral axis inclination for which the resulting moment lies on the loading plane.
+
+        Newton's method is first applied from theta_seed (degrees), with the analytic derivative of the residual
+        (see evaluate_neutral_axis_inclination_derivative). If it does not converge, the root of
+        evaluate_neutral_axis_inclination_diff is bracketed around the seed and refined with Brent's method, and fsolve
+        is used as a last resort. Only inclinations within 90° of -uniaxial_angle are accepted: beyond them the
+        compressed side of the section is swapped, and the point would belong to the inverted strain plane.
+        :return: (theta in radians, None) when converged, or (None, diagnostics dict) otherwise."""
         try:
-            # Better initial guess: use strain plane info to estimate initial theta
             # For most strain planes near pure compression/tension, the neutral axis is close to the uniaxial angle
-            x0 = -self.uniaxial_angle
-
-            # Try solving with primary initial guess
-            sol = fsolve(
-                self.evaluate_neutral_axis_inclination_diff,
-                x0=x0,
-                xtol=0.005,  # Balanced convergence tolerance
-                args=plano_de_deformacion,
-                full_output=1,
-                maxfev=50  # Keep at 50 for performance
-            )
-            theta, precision, is_success = sol[0][0], sol[1]['fvec'], sol[2] == 1
-            theta = np.radians(theta[0] if isinstance(theta, np.ndarray) else theta)
-            
-            if is_success and abs(precision) < self.max_degree_diff:
-                sumF, Mx, My, phi = self.get_solution_for_theta_and_strain_plane(theta, *plano_de_deformacion)
-                return {
-                    "sumF": sumF,
-                    "M": self.get_resulting_uniaxial_moment(Mx, My),
-                    "plano_de_deformacion": plano_de_deformacion,
-                    # color is only a property used for occasional plots when debugging or writing papers.
-                    "color": self.transform_number_in_rainbow_color(abs(plano_de_deformacion[3])),
-                    "phi": phi,
-                    "Mx": Mx,
-                    "My": My,
-                    "is_capped": False  # Some compression points will later be capped according to ACI 318-25 22.4.2.
-                }
-            else:  # Used only for debugging solution-less points. Safe to disregard.
-                pass
+            default_seed = -self.uniaxial_angle
+            x0 = default_seed if theta_seed is None else self._get_inclination_in_window(theta_seed)
+            evaluations = [0]
+
+            def residual(theta_deg):
+                evaluations[0] += 1
+                return self._get_wrapped_inclination_diff(theta_deg, plano_de_deformacion)
+
+            def derivative(theta_deg):
+                return self.evaluate_neutral_axis_inclination_derivative(theta_deg, *plano_de_deformacion)
+
+            theta = self._solve_inclination_with_newton(residual, derivative, x0)
+            if theta is None:
+                theta, best_theta, best_residual = self._solve_bracketed_inclination(residual, x0)
+            if theta is None:
+                for seed in dict.fromkeys([x0, default_seed]):
+                    theta = self._solve_inclination_with_fsolve(residual, seed)
+                    if theta is not None:
+                        break
+            if theta is not None:
+                return np.radians(theta), None
+            return None, {
+                "plano_de_deformacion": plano_de_deformacion,
+                "theta_seed": x0,
+                "best_theta": best_theta,
+                "best_residual": best_residual,
+                "evaluations": evaluations[0],
+                "reason": "No se encontró un intervalo con cambio de signo ni convergencia con fsolve."
+            }
         except Exception as e:
             traceback.print_exc()
             raise(e)
 
+    def _get_inclination_in_window(self, theta):
+        """Maps theta (degrees) to the equivalent angle in [-uniaxial_angle - 180°, -uniaxial_angle + 180°)."""
+        return (theta + self.uniaxial_angle + 180) % 360 - 180 - self.uniaxial_angle
+
+    def _is_inclination_in_window(self, theta):
+        return abs(self._get_inclination_in_window(theta) + self.uniaxial_angle) < 90
+
+    def _solve_bracketed_inclination(self, residual, x0):
+        """Expands symmetric steps around x0 (degrees) until the residual changes sign, then applies brentq.
+        Sign changes caused by the ±90° wrap of the residual (moment perpendicular to the loading plane) are
+        discarded by checking the residual at the root.
+        :return: root (or None), and the best (theta, residual) pair evaluated."""
+        f0 = residual(x0)
+        best_theta, best_residual = x0, f0
+        if f0 == 0:
+            return x0, x0, f0
+        lower_limit, upper_limit = -self.uniaxial_angle - 90, -self.uniaxial_angle + 90
+        previous = {1: (x0, f0), -1: (x0, f0)}
+        for step in INCLINATION_BRACKET_STEPS:
+            for direction in (1, -1):
+                x_prev, f_prev = previous[direction]
+                x_new = min(max(x0 + direction * step, lower_limit), upper_limit)
+                if x_new == x_prev:  # Window limit already reached in this direction.
+                    continue
+                f_new = residual(x_new)
+                if abs(f_new) < abs(best_residual):
+                    best_theta, best_residual = x_new, f_new
+                if f_new == 0:
+                    return x_new, best_theta, best_residual
+                if f_prev * f_new < 0:
+                    root = brentq(residual, min(x_prev, x_new), max(x_prev, x_new), xtol=0.005, maxiter=50)
+                    f_root = residual(root)
+                    if abs(f_root) < self.max_degree_diff:
+                        return root, root, f_root
+                previous[direction] = (x_new, f_new)
+        return None, best_theta, best_residual
+
+    def _solve_inclination_with_newton(self, residual, derivative, x0):
+        """Newton's method from x0 (degrees), with steps limited to INCLINATION_NEWTON_MAX_STEP and kept within the
+        ±90° window. The residual is zero within max_degree_diff of the root (see
+        evaluate_neutral_axis_inclination_diff), which ends the iteration before its derivative is needed.
+        :return: root, or None if it did not converge within INCLINATION_NEWTON_MAX_ITERATIONS or the residual stopped
+        decreasing."""
+        lower_limit, upper_limit = -self.uniaxial_angle - 90, -self.uniaxial_angle + 90
+        theta, previous_f = x0, math.inf
+        for _ in range(INCLINATION_NEWTON_MAX_ITERATIONS):
+            f = residual(theta)
+            if f == 0:
+                return theta
+            if abs(f) >= abs(previous_f):  # Diverging: left to the bracketing.
+                return None
+            previous_f = f
+            f_derivative = derivative(theta)
+            if f_derivative == 0 or not math.isfinite(f_derivative):
+                return None
+            step = min(max(-f / f_derivative, -INCLINATION_NEWTON_MAX_STEP), INCLINATION_NEWTON_MAX_STEP)
+            new_theta = min(max(theta + step, lower_limit), upper_limit)
+            if new_theta == theta:  # Pushed against the window limit.
+                return None
+            theta = new_theta
+        return None
+
+    def _solve_inclination_with_fsolve(self, residual, x0):
+        sol = fsolve(lambda theta: residual(theta[0]), x0=x0, xtol=0.005, full_output=1, maxfev=50)
+        theta, precision, is_success = sol[0][0], np.ravel(sol[1]['fvec'])[0], sol[2] == 1
+        if is_success and abs(precision) < self.max_degree_diff and self._is_inclination_in_window(theta):
+            return self._get_inclination_in_window(theta)
+        return None
+
+    def _get_wrapped_inclination_diff(self, theta, plano_de_deformacion):
+        """evaluate_neutral_axis_inclination_diff mapped to [-90°, 90°). Moment directions are defined modulo 180°,
+        so the wrapped residual is continuous around the root and only jumps when the moment is perpendicular to the
+        loading plane."""
+        diff = self.evaluate_neutral_axis_inclination_diff(theta, *plano_de_deformacion)
+        return self._wrap_inclination_diff(diff)
+
+    @staticmethod
+    def _wrap_inclination_diff(diff):
+        if diff == 0:
+            return 0
+        return (diff + 90) % 180 - 90
+
     def evaluate_neutral_axis_inclination_diff(self, theta, *plano_de_deformacion):
         theta = np.radians(theta[0] if isinstance(theta, np.ndarray) else theta)
         sumF, Mx, My, phi = self.get_solution_for_theta_and_strain_plane(theta, *plano_de_deformacion)
+        return self._get_inclination_diff(sumF, Mx, My)
+
+    def evaluate_neutral_axis_inclination_derivative(self, theta, *plano_de_deformacion):
+        """Derivative of evaluate_neutral_axis_inclination_diff (the moment angle) with respect to theta, both in
+        degrees, from the derivatives of Mx and My (see get_section_force_derivatives). The wrapping of the residual
+        (see _get_wrapped_inclination_diff) does not change it."""
+        sumF, Mx, My, phi, dMx, dMy = self.get_solution_and_derivatives_for_theta_and_strain_plane(
+            np.radians(theta), *plano_de_deformacion)
+        moment_squared = Mx ** 2 + My ** 2
+        return (Mx * dMy - My * dMx) / moment_squared if moment_squared > 0 else 0.0
+
+    def _get_inclination_diff(self, sumF, Mx, My):
         ex = round(My / sumF, 5)
         ey = round(Mx / sumF, 5)
         if ex == 0 and ey == 0:  # Carga centrada, siempre "pertenece" al plano de carga.
@@ -162,18 +521,158 @@ class UniaxialInteractionDiagram:
     def sincos_cached(theta_rad):
         return np.sin(theta_rad), np.cos(theta_rad)
 
-    @lru_cache(maxsize=1024)
     def get_solution_for_theta_and_strain_plane(self, theta, *plano_de_deformacion):
-        rot_concrete_array, rot_rebar_array, rot_prestressed_array = self.get_element_neutral_axis_distance(theta)
-        rot_concrete_array.sort(order="neutral_axis_distance")
-        rot_rebar_array.sort(order="neutral_axis_distance")
-        rot_prestressed_array.sort(order="neutral_axis_distance")
-        ecuacion_plano_deformacion = self._get_strain_plane_equation(
-            rot_concrete_array, rot_rebar_array, rot_prestressed_array, plano_de_deformacion)
+        """Section forces for the neutral axis inclination theta (radians) and the given strain plane.
+
+        theta is snapped to a multiple of THETA_CACHE_QUANTUM, so cached results are exact for their key. Results are
+        cached per (theta, strain plane), and the sorted rotated fiber arrays per theta alone, since the rotation does
+        not depend on the strain plane."""
+        theta_key = round(theta / THETA_CACHE_QUANTUM)
+        return self.solution_cache.get_or_compute(
+            (theta_key, plano_de_deformacion),
+            lambda: self._compute_solution_for_theta_and_strain_plane(theta_key, plano_de_deformacion))
+
+    def get_solution_and_derivatives_for_theta_and_strain_plane(self, theta, *plano_de_deformacion):
+        """get_solution_for_theta_and_strain_plane, together with the derivatives of Mx and My with respect to theta
+        (per radian, at constant phi), computed from the same sorted fiber arrays (see get_section_force_derivatives).
+        :return: sumF, Mx, My, phi, dMx, dMy"""
+        sumF, Mx, My, phi = self.get_solution_for_theta_and_strain_plane(theta, *plano_de_deformacion)
+        dMx, dMy = self.get_section_force_derivatives(round(theta / THETA_CACHE_QUANTUM), plano_de_deformacion)
+        return sumF, Mx, My, phi, phi * dMx, phi * dMy
+
+    def get_section_force_derivatives(self, theta_key, plano_de_deformacion):
+        """Derivatives of the unfactored Mx and My with respect to the neutral axis inclination (per radian).
+
+        Rotating the neutral axis changes the distance of every fiber (by -(x·cosθ + y·sinθ) per radian) and of the
+        extreme fibers that define the strain plane, and so the strain of every fiber. The steel forces follow it
+        through their tangent modulus. The concrete stress block only changes along its limit line (see
+        _get_stress_block_moment_derivatives)."""
+        rot_concrete_array, rot_rebar_array, rot_prestressed_array, concrete_prefix_sums, extreme_fiber_distances = \
+            self.get_sorted_rotated_arrays(theta_key)
+        sin_theta, cos_theta = self.sincos_cached(theta_key * THETA_CACHE_QUANTUM)
+        slope, y_intercept = self._get_strain_plane_coefficients(extreme_fiber_distances, plano_de_deformacion)
+        slope_derivative, y_intercept_derivative = self._get_strain_plane_coefficients(
+            extreme_fiber_distances, plano_de_deformacion,
+            self.get_extreme_fiber_distance_derivatives(sin_theta, cos_theta))
+
+        def get_strain_derivative(x, y, neutral_axis_distance):
+            return slope_derivative * neutral_axis_distance - slope * (x * cos_theta + y * sin_theta) + \
+                y_intercept_derivative
+
+        dMx, dMy = self._get_stress_block_moment_derivatives(
+            rot_concrete_array, concrete_prefix_sums, slope, y_intercept, get_strain_derivative, sin_theta, cos_theta)
+        for rot_steel_array, bar_class in ((rot_rebar_array, BarraAceroPasivo),
+                                           (rot_prestressed_array, BarraAceroPretensado)):
+            if len(rot_steel_array) == 0:
+                continue
+            strain = rot_steel_array["neutral_axis_distance"] * slope + y_intercept
+            if bar_class is BarraAceroPretensado:
+                strain = strain + rot_steel_array['concrete_shortening_strain'] + rot_steel_array['effective_strain']
+            force_derivatives = bar_class.tangent_modulus_array(strain) * rot_steel_array['area'] * \
+                get_strain_derivative(rot_steel_array['xg'], rot_steel_array['yg'],
+                                      rot_steel_array["neutral_axis_distance"])
+            dMx += np.sum(force_derivatives * rot_steel_array['yg'])
+            dMy -= np.sum(force_derivatives * rot_steel_array['xg'])
+        return float(dMx), float(dMy)
+
+    def _get_stress_block_moment_derivatives(self, rot_concrete_array, concrete_prefix_sums, slope, y_intercept,
+                                             get_strain_derivative, sin_theta, cos_theta):
+        """Derivatives of the stress block moments with respect to theta. The block is the region where
+        g = strain - limit strain <= 0, so the derivative of its moments ∫h dA is -∫h·g'/|∇g| ds along the limit line
+        g = 0, with |∇g| = |slope|. The line integral is estimated from the fibers within a band of one mean fiber
+        size around the line, as Σ h·g'·A / (2·band)."""
+        distances = rot_concrete_array["neutral_axis_distance"]
+        if len(distances) == 0 or slope == 0:
+            return 0.0, 0.0
+        concrete = self.geometric_solution.concrete
+        # The limit strain follows the most compressed concrete fiber, at one end of the sorted fibers.
+        extreme_fiber = rot_concrete_array[0] if slope * distances[0] <= slope * distances[-1] else \
+            rot_concrete_array[-1]
+        extreme_strain = extreme_fiber["neutral_axis_distance"] * slope + y_intercept
+        extreme_strain_derivative = get_strain_derivative(
+            extreme_fiber['xg'], extreme_fiber['yg'], extreme_fiber["neutral_axis_distance"])
+        limit_strain = concrete.get_stress_block_limit_strain(extreme_strain)
+        # The limit strain is proportional to the extreme strain, and so are their derivatives.
+        limit_strain_derivative = concrete.get_stress_block_limit_strain(extreme_strain_derivative)
+        limit_distance = (limit_strain - y_intercept) / slope
+
+        band = math.sqrt(concrete_prefix_sums[0, -1] / len(distances))
+        start, end = np.searchsorted(distances, [limit_distance - band, limit_distance + band])
+        if start == end:
+            return 0.0, 0.0
+        band_fibers = rot_concrete_array[start:end]
+        x, y = band_fibers['xg'], band_fibers['yg']
+        # g' at each fiber, evaluated on the limit line (neutral axis distance limit_distance).
+        limit_rate = get_strain_derivative(x, y, limit_distance) - limit_strain_derivative
+        weights = -limit_rate * band_fibers['area'] / (2 * band * abs(slope))
+        stress = concrete.get_stress_block_stress()
+        return stress * np.sum(weights * y), -stress * np.sum(weights * x)
+
+    def _compute_solution_for_theta_and_strain_plane(self, theta_key, plano_de_deformacion):
+        if self.concrete_integrator is not None:
+            return self._compute_analytic_solution_for_theta_and_strain_plane(theta_key, plano_de_deformacion)
+        rot_concrete_array, rot_rebar_array, rot_prestressed_array, concrete_prefix_sums, extreme_fiber_distances = \
+            self.get_sorted_rotated_arrays(theta_key)
+        # Only the (small) steel arrays are copied, as the force computation writes their strain fields.
+        rot_rebar_array, rot_prestressed_array = rot_rebar_array.copy(), rot_prestressed_array.copy()
+        ecuacion_plano_deformacion = self._get_strain_plane_equation(extreme_fiber_distances, plano_de_deformacion)
         sumF, Mx, My, phi = self.get_section_forces_for_rotated_neutral_axis(
-            rot_concrete_array, rot_rebar_array, rot_prestressed_array, ecuacion_plano_deformacion)
+            rot_concrete_array, rot_rebar_array, rot_prestressed_array, ecuacion_plano_deformacion,
+            concrete_prefix_sums)
         return sumF, Mx, My, phi
 
+    def _compute_analytic_solution_for_theta_and_strain_plane(self, theta_key, plano_de_deformacion):
+        """Section forces with the mesh-free integration of concrete (see get_concrete_integrator), for a single
+        inclination: only the steel fibers are rotated, the extreme concrete fibers are taken at the section boundary
+        and the concrete resultant is integrated over the regions."""
+        sin_theta, cos_theta = self.sincos_cached(theta_key * THETA_CACHE_QUANTUM)
+        concrete_max, concrete_min = self.concrete_integrator.get_extreme_distances(
+            np.array([[sin_theta]]), np.array([[cos_theta]]))
+        concrete_extremes = (float(concrete_max[0]), float(concrete_min[0]))
+        steel_extremes = concrete_extremes if self.steel_fiber_index is None else (
+            self.steel_fiber_index.get_extreme_distances(sin_theta, cos_theta))
+        slope, y_intercept = self._get_strain_plane_coefficients((concrete_extremes, steel_extremes),
+                                                                 plano_de_deformacion)
+        max_compression_strain = min(concrete_extremes[0] * slope + y_intercept,
+                                     concrete_extremes[1] * slope + y_intercept)
+        concrete_forces = self.concrete_integrator.get_forces(
+            self.geometric_solution.concrete, np.array([sin_theta]), np.array([cos_theta]), np.array([slope]),
+            np.array([y_intercept]), np.array([max_compression_strain]))
+
+        rot_rebar_array, rot_prestressed_array = self.rebar_array.copy(), self.prestressed_reinforcement_array.copy()
+        for rot_steel_array in (rot_rebar_array, rot_prestressed_array):
+            rot_steel_array["neutral_axis_distance"] = -rot_steel_array['xg'] * sin_theta + rot_steel_array[
+                'yg'] * cos_theta
+        return self.get_section_forces_for_rotated_neutral_axis(
+            None, rot_rebar_array, rot_prestressed_array, lambda rotated_y: rotated_y * slope + y_intercept,
+            concrete_forces=tuple(float(force[0]) for force in concrete_forces))
+
+    def get_sorted_rotated_arrays(self, theta_key):
+        """Fiber arrays rotated to the inclination theta_key * THETA_CACHE_QUANTUM and sorted by neutral axis distance,
+        together with the prefix sums of the concrete fibers (see get_concrete_prefix_sums) and the extreme fiber
+        distances (see get_extreme_fiber_distances). They are shared by all the strain planes evaluated at this
+        inclination, so they must not be modified."""
+        def rotate_and_sort():
+            theta_rad = theta_key * THETA_CACHE_QUANTUM
+            rotated_arrays = self.get_element_neutral_axis_distance(theta_rad)
+            for rotated_array in rotated_arrays:
+                rotated_array.sort(order="neutral_axis_distance")
+            return (*rotated_arrays, self.get_concrete_prefix_sums(rotated_arrays[0]),
+                    self.get_extreme_fiber_distances(*self.sincos_cached(theta_rad)))
+
+        return self.rotation_cache.get_or_compute(theta_key, rotate_and_sort)
+
+    @staticmethod
+    def get_concrete_prefix_sums(rot_concrete_array):
+        """Cumulative area, ∫x dA and ∫y dA of the sorted concrete fibers, with a leading zero: the sums over the fibers
+        i to j - 1 are prefix_sums[:, j] - prefix_sums[:, i]."""
+        prefix_sums = np.zeros((3, len(rot_concrete_array) + 1))
+        area = rot_concrete_array['area']
+        np.cumsum(area, out=prefix_sums[0, 1:])
+        np.cumsum(area * rot_concrete_array['xg'], out=prefix_sums[1, 1:])
+        np.cumsum(area * rot_concrete_array['yg'], out=prefix_sums[2, 1:])
+        return prefix_sums
+
     def get_resulting_uniaxial_moment(self, Mx, My):
         """Project the 3D moment onto the target uniaxial direction to determine sign."""
         magnitude = math.hypot(Mx, My)
@@ -197,61 +696,92 @@ class UniaxialInteractionDiagram:
             return 0
         return x_angle if x_angle >= 0 else x_angle + 180  # x_angle belongs to range [0, 180]
 
-    def _get_strain_plane_equation(self, rot_concrete_array, rot_rebar_array, rot_prestressed_array,
-                                   plano_de_deformacion):
+    def _get_strain_plane_equation(self, extreme_fiber_distances, plano_de_deformacion):
+        slope, y_intercept = self._get_strain_plane_coefficients(extreme_fiber_distances, plano_de_deformacion)
+        return lambda rotated_y: rotated_y * slope + y_intercept  # linear equation on rotated axis.
+
+    def _get_strain_plane_coefficients(self, extreme_fiber_distances, plano_de_deformacion,
+                                       extreme_fiber_distance_derivatives=None):
+        """(slope, y_intercept) of the strain along the rotated axis, through the extreme strains of the plane at the
+        extreme fiber distances. When extreme_fiber_distance_derivatives are given (see
+        get_extreme_fiber_distance_derivatives), their derivatives with respect to theta are returned instead."""
         extreme_strain_y_positive, exteme_strain_y_negative = plano_de_deformacion[0], plano_de_deformacion[1]
-        y_extreme_positive = self._get_extreme_positive_y(
-            extreme_strain_y_positive, rot_rebar_array, rot_prestressed_array, rot_concrete_array)
-        y_extreme_negative = self.get_extreme_negative_y(
-            exteme_strain_y_negative, rot_rebar_array, rot_prestressed_array, rot_concrete_array)
+        concrete_extremes, steel_extremes = extreme_fiber_distances
+        y_extreme_positive = self._get_extreme_positive_y(extreme_strain_y_positive, concrete_extremes, steel_extremes)
+        y_extreme_negative = self.get_extreme_negative_y(exteme_strain_y_negative, concrete_extremes, steel_extremes)
 
         if y_extreme_positive == y_extreme_negative and extreme_strain_y_positive == exteme_strain_y_negative:
-            return lambda y: extreme_strain_y_positive
+            return (0, extreme_strain_y_positive) if extreme_fiber_distance_derivatives is None else (0, 0)
 
         slope = (extreme_strain_y_positive - exteme_strain_y_negative) / (y_extreme_positive - y_extreme_negative)
         y_intercept = exteme_strain_y_negative - slope * y_extreme_negative
-        return lambda rotated_y: rotated_y * slope + y_intercept  # linear equation on rotated axis.
-
-    def _get_extreme_positive_y(self, extreme_strain, rebar_array, prestressed_array, concrete_array):
+        if extreme_fiber_distance_derivatives is None:
+            return slope, y_intercept
+        dy_extreme_positive = self._get_extreme_positive_y(extreme_strain_y_positive,
+                                                           *extreme_fiber_distance_derivatives)
+        dy_extreme_negative = self.get_extreme_negative_y(exteme_strain_y_negative, *extreme_fiber_distance_derivatives)
+        slope_derivative = -slope * (dy_extreme_positive - dy_extreme_negative) / (
+                y_extreme_positive - y_extreme_negative)
+        return slope_derivative, -slope_derivative * y_extreme_negative - slope * dy_extreme_negative
+
+    def get_extreme_fiber_distances(self, sin_theta, cos_theta):
+        """(max, min) neutral axis distances of the concrete fibers and of the steel fibers, answered by the convex hull
+        indexes of the section (see ExtremeFiberIndex). Without steel, the concrete extremes are returned for both.
+        sin_theta and cos_theta are scalars or arrays with one value per inclination."""
+        concrete_extremes = self.concrete_fiber_index.get_extreme_distances(sin_theta, cos_theta)
+        if self.steel_fiber_index is None:
+            return concrete_extremes, concrete_extremes
+        return concrete_extremes, self.steel_fiber_index.get_extreme_distances(sin_theta, cos_theta)
+
+    def get_extreme_fiber_distance_derivatives(self, sin_theta, cos_theta):
+        """Derivatives with respect to theta of get_extreme_fiber_distances, in the same structure."""
+        concrete_derivatives = self.concrete_fiber_index.get_extreme_distance_derivatives(sin_theta, cos_theta)
+        if self.steel_fiber_index is None:
+            return concrete_derivatives, concrete_derivatives
+        return concrete_derivatives, self.steel_fiber_index.get_extreme_distance_derivatives(sin_theta, cos_theta)
+
+    def _get_extreme_positive_y(self, extreme_strain, concrete_extremes, steel_extremes):
         if extreme_strain <= 0 or extreme_strain < self.geometric_solution.deformacion_maxima_de_acero:
-            return concrete_array["neutral_axis_distance"][-1]  # Most compressed concrete fiber
-
-        neutral_axis_distances = np.concatenate([rebar_array["neutral_axis_distance"], prestressed_array["neutral_axis_distance"]])
-        return np.max(neutral_axis_distances)  # Most distant (traction) steel fiber
+            return concrete_extremes[0]  # Most compressed concrete fiber
+        return steel_extremes[0]  # Most distant (traction) steel fiber
 
-    def get_extreme_negative_y(self, extreme_strain, rebar_array, prestressed_array, concrete_array):
+    def get_extreme_negative_y(self, extreme_strain, concrete_extremes, steel_extremes):
         if extreme_strain <= 0 or extreme_strain < self.geometric_solution.deformacion_maxima_de_acero:
-            return concrete_array["neutral_axis_distance"][0]  # Distance to compressed concrete fiber.
-
-        neutral_axis_distances = np.concatenate([rebar_array["neutral_axis_distance"], prestressed_array["neutral_axis_distance"]])
-        return np.min(neutral_axis_distances)  # Most distant (traction) steel fiber
+            return concrete_extremes[1]  # Distance to compressed concrete fiber.
+        return steel_extremes[1]  # Most distant (traction) steel fiber
 
     def get_section_forces_for_rotated_neutral_axis(
-            self, rot_concrete_array, rot_rebar_array, rot_prestressed_array, strain_plane_eq):
+            self, rot_concrete_array, rot_rebar_array, rot_prestressed_array, strain_plane_eq,
+            concrete_prefix_sums=None, concrete_forces=None):
+        """Section forces for the strain plane strain_plane_eq, being the arrays sorted by neutral axis distance. The
+        concrete fibers within the stress block are a contiguous run of them, so when concrete_prefix_sums are given
+        (see get_concrete_prefix_sums) the concrete resultant is found by binary search, without evaluating every
+        fiber.
+        :param concrete_forces: (sumF, Mx, My) of the concrete, when already integrated (rot_concrete_array is then
+        not used)."""
 
         # -------------------- 1. Compute flexural strain fields --------------------
-        rot_concrete_array['strain'] = strain_plane_eq(rot_concrete_array["neutral_axis_distance"])
         rot_rebar_array['strain'] = strain_plane_eq(rot_rebar_array["neutral_axis_distance"])
         rot_prestressed_array['flexural_strain'] = strain_plane_eq(
             rot_prestressed_array["neutral_axis_distance"])
 
         # -------------------- 2. Concrete --------------------
-        max_compression_strain = min(rot_concrete_array['strain'][0], rot_concrete_array['strain'][-1])
-        concrete_forces = np.array([
-            self.geometric_solution.concrete.simplified_stress_strain_eq(e, e_max_comp=max_compression_strain) * a
-            for e, a in zip(rot_concrete_array['strain'], rot_concrete_array['area'])
-        ])
-        sumFH = np.sum(concrete_forces)
-        MxH = np.sum(concrete_forces * rot_concrete_array['yg'])
-        MyH = np.sum(-concrete_forces * rot_concrete_array['xg'])
+        if concrete_forces is not None:
+            sumFH, MxH, MyH = concrete_forces
+        else:
+            if concrete_prefix_sums is None:
+                concrete_prefix_sums = self.get_concrete_prefix_sums(rot_concrete_array)
+            start, end = self.get_stress_block_fiber_range(rot_concrete_array["neutral_axis_distance"],
+                                                           strain_plane_eq)
+            area, first_moment_x, first_moment_y = concrete_prefix_sums[:, end] - concrete_prefix_sums[:, start]
+            stress = self.geometric_solution.concrete.get_stress_block_stress()
+            sumFH = stress * area
+            MxH = stress * first_moment_y
+            MyH = -stress * first_moment_x
 
         # -------------------- 3. Passive Rebar --------------------
-        rebar_forces = np.array([
-            self.geometric_solution.rebar_array[0].stress_strain_eq(e) * a for e, a in zip(
-                rot_rebar_array['strain'],
-                rot_rebar_array['area']
-            )
-        ])
+        rebar_forces = BarraAceroPasivo.stress_strain_array(rot_rebar_array['strain']) * rot_rebar_array['area'] \
+            if len(rot_rebar_array) > 0 else np.zeros(0)
         sumFA = np.sum(rebar_forces)
         MxA = np.sum(rebar_forces * rot_rebar_array['yg'])
         MyA = np.sum(-rebar_forces * rot_rebar_array['xg'])
@@ -264,12 +794,9 @@ class UniaxialInteractionDiagram:
                 rot_prestressed_array['effective_strain']
         )
 
-        prestressed_forces = np.array([
-            self.geometric_solution.prestressed_rebar_array[0].stress_strain_eq(e) * a for e, a in zip(
-                rot_prestressed_array['total_strain'],
-                rot_prestressed_array['area']
-            )
-        ])
+        prestressed_forces = BarraAceroPretensado.stress_strain_array(
+            rot_prestressed_array['total_strain']) * rot_prestressed_array['area'] \
+            if len(rot_prestressed_array) > 0 else np.zeros(0)
         sumFP = np.sum(prestressed_forces)
         MxAP = np.sum(prestressed_forces * rot_prestressed_array['yg'])
         MyAP = np.sum(-prestressed_forces * rot_prestressed_array['xg'])
@@ -289,6 +816,160 @@ class UniaxialInteractionDiagram:
 
         return sumF, Mx, My, phi
 
+    def get_stress_block_fiber_range(self, neutral_axis_distances, strain_plane_eq):
+        """(start, end) indices of the concrete fibers within the stress block, being neutral_axis_distances sorted.
+        The strain is monotonic along the sorted fibers, so the block is either a prefix or a suffix of them."""
+        fibers_count = len(neutral_axis_distances)
+        if fibers_count == 0:
+            return 0, 0
+        first_strain = strain_plane_eq(neutral_axis_distances[0])
+        last_strain = strain_plane_eq(neutral_axis_distances[-1])
+        limit_strain = self.geometric_solution.concrete.get_stress_block_limit_strain(min(first_strain, last_strain))
+        is_prefix = first_strain <= last_strain
+        # Binary search of the first fiber outside the block (prefix) or inside it (suffix).
+        low, high = 0, fibers_count
+        while low < high:
+            middle = (low + high) // 2
+            if (strain_plane_eq(neutral_axis_distances[middle]) <= limit_strain) == is_prefix:
+                low = middle + 1
+            else:
+                high = middle
+        return (0, low) if is_prefix else (low, fibers_count)
+
+    def get_solutions_for_thetas_and_strain_planes(self, thetas, planos_de_deformacion, max_chunk_elements=2_000_000):
+        """Batched version of get_solution_for_theta_and_strain_plane.
+
+        Evaluates every (theta, strain plane) pair as one (planes × fibers) matrix operation, with no rotation copies
+        nor sorting of the fiber arrays.
+        :param thetas: neutral axis inclinations in radians. Either one per strain plane or a single value for all.
+        :param planos_de_deformacion: sequence of strain planes, as returned by get_strain_planes.
+        :param max_chunk_elements: upper bound for planes × fibers per matrix, to keep memory usage bounded.
+        :return: sumF, Mx, My, phi arrays, one value per strain plane."""
+        planes = np.asarray([plane[:2] for plane in planos_de_deformacion], dtype=float).reshape(-1, 2)
+        thetas = np.broadcast_to(np.asarray(thetas, dtype=float), (len(planes),))
+        results = np.zeros((4, len(planes)))
+        fiber_count = len(self.concrete_element_array) + len(self.rebar_array) + len(
+            self.prestressed_reinforcement_array)
+        chunk_size = max(1, max_chunk_elements // max(fiber_count, 1))
+        for start in range(0, len(planes), chunk_size):
+            end = start + chunk_size
+            results[:, start:end] = self._get_section_forces_for_plane_batch(thetas[start:end], planes[start:end])
+        sumF, Mx, My, phi = results
+        return sumF, Mx, My, phi
+
+    def _get_section_forces_for_plane_batch(self, thetas, planes):
+        sin_theta, cos_theta = np.sin(thetas)[:, None], np.cos(thetas)[:, None]
+        concrete, rebar, prestressed = self.concrete_element_array, self.rebar_array, self.prestressed_reinforcement_array
+
+        # -------------------- 1. Rotated distances (planes × fibers) --------------------
+        rebar_distance = -rebar['xg'] * sin_theta + rebar['yg'] * cos_theta
+        prestressed_distance = -prestressed['xg'] * sin_theta + prestressed['yg'] * cos_theta
+        if self.concrete_integrator is None:
+            concrete_distance = -concrete['xg'] * sin_theta + concrete['yg'] * cos_theta
+
+        # -------------------- 2. Strain plane equations --------------------
+        top_strain, bottom_strain = planes[:, 0], planes[:, 1]
+        (concrete_max, concrete_min), (steel_max, steel_min) = self.get_extreme_fiber_distances(
+            sin_theta[:, 0], cos_theta[:, 0])
+        if self.concrete_integrator is not None:  # Extreme concrete fibers are taken at the section boundary.
+            concrete_max, concrete_min = self.concrete_integrator.get_extreme_distances(sin_theta, cos_theta)
+            if self.steel_fiber_index is None:
+                steel_max, steel_min = concrete_max, concrete_min
+        max_steel_strain = self.geometric_solution.deformacion_maxima_de_acero
+        y_extreme_positive = np.where(
+            (top_strain <= 0) | (top_strain < max_steel_strain), concrete_max, steel_max)
+        y_extreme_negative = np.where(
+            (bottom_strain <= 0) | (bottom_strain < max_steel_strain), concrete_min, steel_min)
+
+        distance_diff = y_extreme_positive - y_extreme_negative
+        is_uniform = (distance_diff == 0) & (top_strain == bottom_strain)
+        slope = np.where(is_uniform, 0.0, (top_strain - bottom_strain) / np.where(is_uniform, 1.0, distance_diff))
+        y_intercept = np.where(is_uniform, top_strain, bottom_strain - slope * y_extreme_negative)
+        slope, y_intercept = slope[:, None], y_intercept[:, None]
+
+        # -------------------- 3. Concrete --------------------
+        max_compression_strain = np.minimum(
+            concrete_max * slope[:, 0] + y_intercept[:, 0], concrete_min * slope[:, 0] + y_intercept[:, 0])
+        if self.concrete_integrator is None:
+            concrete_strain = concrete_distance * slope + y_intercept
+            concrete_forces = self.geometric_solution.concrete.simplified_stress_strain_array(
+                concrete_strain, e_max_comp=max_compression_strain[:, None]) * concrete['area']
+            sumFH = concrete_forces.sum(axis=1)
+            MxH = concrete_forces @ concrete['yg']
+            MyH = -(concrete_forces @ concrete['xg'])
+        else:
+            sumFH, MxH, MyH = self.concrete_integrator.get_forces(
+                self.geometric_solution.concrete, sin_theta[:, 0], cos_theta[:, 0], slope[:, 0], y_intercept[:, 0],
+                max_compression_strain)
+
+        # -------------------- 4. Passive Rebar --------------------
+        rebar_strain = rebar_distance * slope + y_intercept
+        rebar_forces = BarraAceroPasivo.stress_strain_array(rebar_strain) * rebar['area'] \
+            if len(rebar) > 0 else np.zeros_like(rebar_strain)
+        sumFA = rebar_forces.sum(axis=1)
+        MxA = rebar_forces @ rebar['yg']
+        MyA = -(rebar_forces @ rebar['xg'])
+
+        # -------------------- 5. Prestressed Rebar --------------------
+        prestressed_flexural_strain = prestressed_distance * slope + y_intercept
+        prestressed_total_strain = (prestressed_flexural_strain + prestressed['concrete_shortening_strain'] +
+                                    prestressed['effective_strain'])
+        prestressed_forces = BarraAceroPretensado.stress_strain_array(prestressed_total_strain) * prestressed['area'] \
+            if len(prestressed) > 0 else np.zeros_like(prestressed_total_strain)
+        sumFP = prestressed_forces.sum(axis=1)
+        MxAP = prestressed_forces @ prestressed['yg']
+        MyAP = -(prestressed_forces @ prestressed['xg'])
+
+        # -------------------- 6. Strength Reduction Factor --------------------
+        phi = self.get_strength_reduction_factor_array(rebar_strain, prestressed_flexural_strain)
+
+        # -------------------- 7. Totals --------------------
+        sumF = phi * (sumFA + sumFP + sumFH)
+        Mx = np.round(phi * (MxA + MxAP + MxH), 8)
+        My = np.round(phi * (MyA + MyAP + MyH), 8)
+        return sumF, Mx, My, phi
+
+    def get_strength_reduction_factor_array(self, rebar_strain, prestressed_flexural_strain):
+        """Vectorized get_strength_reduction_factor. Strain arrays have shape (planes × bars); returns one Φ value per
+        plane."""
+        planes_count = rebar_strain.shape[0]
+        if isinstance(self.phi_strength_reduction_factor, float):
+            return np.full(planes_count, self.phi_strength_reduction_factor)
+        transverse_reinf_type = self.geometric_solution.tipo_estribo
+        if "CIRSOC 201-2005" in self.phi_strength_reduction_factor:
+            phi_min = 0.65 if "ZUNCHOS" not in transverse_reinf_type.upper() else 0.70
+            if rebar_strain.shape[1] == 0 and prestressed_flexural_strain.shape[1] == 0:
+                return np.full(planes_count, 0.55)  # Plain concrete
+            max_strain = np.concatenate([rebar_strain, prestressed_flexural_strain], axis=1).max(axis=1)
+            ety = 0.002
+            phi_max = 0.9
+        elif "CIRSOC 201-2024" in self.phi_strength_reduction_factor:
+            phi_min = 0.65 if "ZUNCHOS" not in transverse_reinf_type.upper() else 0.75
+            if rebar_strain.shape[1] == 0 and prestressed_flexural_strain.shape[1] == 0:
+                return np.full(planes_count, 0.60)  # Plain concrete
+            prestressed_ety = 2/1000
+            if rebar_strain.shape[1] > 0:
+                extreme_rebar_index = rebar_strain.argmax(axis=1)
+                max_rebar_strain = rebar_strain[np.arange(planes_count), extreme_rebar_index]
+                rebar_ety = self.rebar_array["ey"][extreme_rebar_index]
+            if prestressed_flexural_strain.shape[1] == 0:
+                max_strain, ety = max_rebar_strain, rebar_ety
+            elif rebar_strain.shape[1] == 0:
+                max_strain = prestressed_flexural_strain.max(axis=1)
+                ety = np.full(planes_count, prestressed_ety)
+            else:
+                max_prestressed_strain = prestressed_flexural_strain.max(axis=1)
+                rebar_governs = max_rebar_strain >= max_prestressed_strain
+                max_strain = np.where(rebar_governs, max_rebar_strain, max_prestressed_strain)
+                ety = np.where(rebar_governs, rebar_ety, prestressed_ety)
+            phi_max = 0.90
+        else:
+            return np.ones(planes_count)
+
+        # Interpolation logic (same for both criteria, being ety = 0.002 for CIRSOC 201-2005)
+        interpolated = phi_min + (phi_max - phi_min) / (3/1000) * (max_strain - ety)
+        return np.where(max_strain >= ety + 0.003, phi_max, np.where(max_strain <= ety, phi_min, interpolated))
+
     def get_strength_reduction_factor(self, **kwargs):
         if isinstance(self.phi_strength_reduction_factor, float):
             return self.phi_strength_reduction_factor
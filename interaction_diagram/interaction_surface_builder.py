@@ -0,0 +1,166 @@
+import traceback
+import math
+import numpy as np
+
+from geometry.section_analysis import ACSAHEGeometricSolution
+from interaction_diagram.interaction_diagram_builder import UniaxialInteractionDiagram
+from build.utils.user_messages import show_message
+
+# Default spacing (degrees) of the neutral axis inclinations swept to build the interaction surface.
+DEFAULT_SWEEP_THETA_STEP = 1.0
+
+
+class InteractionSurfaceSweep(UniaxialInteractionDiagram):
+    """Builds the 3D interaction surface in a single forward pass, evaluating every strain plane for a uniform grid of
+    neutral axis inclinations in [0°, 360°). No inverse problem is solved per loading plane: the meridian of any
+    loading plane angle λ is then interpolated from the surface (see get_uniaxial_diagram).
+
+    Only the strain planes of positive family index are swept. Each inverted plane is equivalent to its original
+    plane with the neutral axis rotated 180°, so it is already contained in the surface."""
+
+    def __init__(self, geometric_solution: ACSAHEGeometricSolution, theta_step=DEFAULT_SWEEP_THETA_STEP,
+                 concrete_integration="auto"):
+        self.geometric_solution = geometric_solution
+        self._load_fiber_arrays()
+        self.concrete_integrator = self.get_concrete_integrator(concrete_integration)
+        self._init_caches()
+        self.thetas = np.arange(0, 360, theta_step)
+        self.strain_planes = [plano for plano in geometric_solution.planos_de_deformacion if plano[2] > 0]
+        self.strain_plane_rows = {plano[:2]: row for row, plano in enumerate(self.strain_planes)}
+        try:
+            self.sumF, self.Mx, self.My, self.phi = self.sweep_surface()
+        except Exception as e:
+            traceback.print_exc()
+            show_message(e)
+            raise e
+
+    def sweep_surface(self):
+        """Evaluates every (strain plane, theta) pair of the grid. For symmetric sections, only one theta of each
+        group of symmetric ones is evaluated (see get_theta_sources), and the rest are mirrored from it.
+        :return: sumF, Mx, My, phi arrays with shape (strain planes × thetas)."""
+        planes_count, thetas_count = len(self.strain_planes), len(self.thetas)
+        sources = self.get_theta_sources()
+        evaluated_columns = sorted(set(column for column, _ in sources))
+        planes = [plano for plano in self.strain_planes for _ in evaluated_columns]
+        thetas = np.tile(np.radians(self.thetas[evaluated_columns]), planes_count)
+        results = self.get_solutions_for_thetas_and_strain_planes(thetas, planes)
+        sumF, Mx, My, phi = (result.reshape(planes_count, len(evaluated_columns)) for result in results)
+
+        evaluated_position = {column: position for position, column in enumerate(evaluated_columns)}
+        positions = [evaluated_position[column] for column, _ in sources]
+        sx, sy = (np.array([signs[i] for _, signs in sources]) for i in (0, 1))
+        return sumF[:, positions], sx * Mx[:, positions], sy * My[:, positions], phi[:, positions]
+
+    def get_theta_sources(self):
+        """(column, (sx, sy)) per theta of the grid: the evaluated theta whose results are mirrored onto it, and the
+        signs of its moments (see SectionSymmetry.get_neutral_axis_images). Every theta is its own source when the
+        section is not symmetric or the grid does not contain the symmetric inclinations."""
+        thetas_count = len(self.thetas)
+        images = self.geometric_solution.symmetry.get_neutral_axis_images(thetas_count)
+        if images is None or not math.isclose(self.thetas[-1] + self.thetas[1] - self.thetas[0], 360):
+            return [(column, (1, 1)) for column in range(thetas_count)]
+        sources = []
+        for column in range(thetas_count):
+            source = min(images[column])
+            sources.append((source, images[column][source]))
+        return sources
+
+    def get_uniaxial_diagram(self, uniaxial_angle):
+        """Interaction diagram for the loading plane angle uniaxial_angle (degrees), interpolated from the surface."""
+        return SweptUniaxialInteractionDiagram(uniaxial_angle, self)
+
+    def get_inclination_diff_array(self, sumF, Mx, My, expected_moment_angle):
+        """Vectorized _get_wrapped_inclination_diff: angle (degrees, in [-90°, 90°)) between the resulting moment and
+        the loading plane. Centred loads always belong to the loading plane, so their difference is 0."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            is_centred = (np.round(My / sumF, 5) == 0) & (np.round(Mx / sumF, 5) == 0)
+        moment_angle = np.degrees(np.arctan2(My, Mx)) % 180
+        diff = (moment_angle - expected_moment_angle + 90) % 180 - 90
+        return np.where(is_centred, 0.0, diff)
+
+    def interpolate_meridian(self, uniaxial_angle, expected_moment_angle, planos_de_deformacion):
+        """Estimates, for each strain plane, the neutral axis inclination whose moment lies on the loading plane, by
+        linear interpolation of the sign change of the surface residual. As in the iterative solver, only
+        inclinations within 90° of -uniaxial_angle are considered, taking the closest root to it.
+        :return: list with the inclination (radians) per strain plane, None where the grid shows no sign change."""
+        diff = self.get_inclination_diff_array(self.sumF, self.Mx, self.My, expected_moment_angle)
+        thetas = []
+        for plano in planos_de_deformacion:
+            if plano[:2] in self.strain_plane_rows:
+                row, shift = self.strain_plane_rows[plano[:2]], 0
+            elif plano[1::-1] in self.strain_plane_rows:
+                row, shift = self.strain_plane_rows[plano[1::-1]], 180  # Inverted plane.
+            else:
+                thetas.append(None)
+                continue
+            window_center = -uniaxial_angle + shift
+            offset = (self.thetas - window_center + 180) % 360 - 180
+            in_window = np.abs(offset) <= 90
+            order = np.argsort(offset[in_window])
+            offset, row_diff = offset[in_window][order], diff[row][in_window][order]
+
+            roots = list(offset[row_diff == 0])
+            # Sign changes larger than 90° are jumps of the wrapped residual, not roots.
+            is_crossing = (row_diff[:-1] * row_diff[1:] < 0) & (np.abs(row_diff[1:] - row_diff[:-1]) < 90)
+            for i in np.flatnonzero(is_crossing):
+                roots.append(offset[i] - row_diff[i] * (offset[i + 1] - offset[i]) / (row_diff[i + 1] - row_diff[i]))
+            if not roots:
+                thetas.append(None)
+                continue
+            thetas.append(math.radians(min(roots, key=abs) - uniaxial_angle))
+        return thetas
+
+
+class SweptUniaxialInteractionDiagram(UniaxialInteractionDiagram):
+    """UniaxialInteractionDiagram whose points are interpolated from an InteractionSurfaceSweep instead of solving the
+    neutral axis inclination of every strain plane. The interpolated inclinations are evaluated exactly in a single
+    batch; the few which miss the angular tolerance are refined with the iterative solver."""
+
+    def __init__(self, uniaxial_angle, interaction_surface: InteractionSurfaceSweep):
+        self.interaction_surface = interaction_surface
+        super().__init__(uniaxial_angle, interaction_surface.geometric_solution)
+
+    def _load_fiber_arrays(self):
+        surface = self.interaction_surface
+        self.concrete_element_array = surface.concrete_element_array
+        self.rebar_array = surface.rebar_array
+        self.prestressed_reinforcement_array = surface.prestressed_reinforcement_array
+        self.phi_strength_reduction_factor = surface.phi_strength_reduction_factor
+        self.max_degree_diff = surface.max_degree_diff
+        self.concrete_fiber_index = surface.concrete_fiber_index
+        self.steel_fiber_index = surface.steel_fiber_index
+
+    def get_concrete_integrator(self, concrete_integration):
+        return self.interaction_surface.concrete_integrator
+
+    def iterate_solution(self):
+        interaction_diagram_points = []
+        try:
+            strain_planes = list(self.geometric_solution.planos_de_deformacion)
+            thetas = self.interaction_surface.interpolate_meridian(
+                self.uniaxial_angle, self.expected_moment_angle, strain_planes)
+            interpolated = [(plano, theta) for plano, theta in zip(strain_planes, thetas) if theta is not None]
+            sumF, Mx, My, phi = self.get_solutions_for_thetas_and_strain_planes(
+                [theta for _, theta in interpolated], [plano for plano, _ in interpolated])
+            diff = self.interaction_surface.get_inclination_diff_array(sumF, Mx, My, self.expected_moment_angle)
+
+            solutions = {}
+            for i, (plano, theta) in enumerate(interpolated):
+                if abs(diff[i]) < self.max_degree_diff:
+                    solutions[plano] = (float(sumF[i]), float(Mx[i]), float(My[i]), float(phi[i]))
+                else:  # Grid too coarse around the root: refined from the interpolated inclination.
+                    point = self.solve_limit_planes(plano, theta_seed=math.degrees(theta))
+                    if point is not None:
+                        solutions[plano] = (point["sumF"], point["Mx"], point["My"], point["phi"])
+            for plano, theta in zip(strain_planes, thetas):
+                if theta is None:
+                    self.no_solution_points_list.append({
+                        "plano_de_deformacion": plano,
+                        "reason": "La superficie de interacción no presenta cambio de signo para este plano de carga."
+                    })
+                elif plano in solutions:
+                    interaction_diagram_points.append(self.build_interaction_diagram_point(plano, *solutions[plano]))
+        except Exception as e:
+            traceback.print_exc()
+            raise(e)
+        return interaction_diagram_points
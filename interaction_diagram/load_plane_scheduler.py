@@ -0,0 +1,40 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def get_load_plane_workers(backend="threads", max_workers=None):
+    """Number of loading plane angles solved at the same time. By default, one with the "threads" backend, since each
+    diagram already solves its strain planes in a pool of one thread per CPU, and nesting both pools would only add
+    threads competing for the GIL. With the "processes" backend, the threads of the scheduler only wait for the shared
+    process pool, so by default there is one per CPU."""
+    if max_workers:
+        return max_workers
+    return (os.cpu_count() or 1) if backend == "processes" else 1
+
+
+def solve_load_plane_angles(angles, build_diagram, max_workers=None, on_angle_solved=None, backend="threads"):
+    """Builds the interaction diagram of every loading plane angle concurrently, since they are independent.
+
+    With the "processes" backend and a shared StrainPlaneProcessPool, the threads of this scheduler only submit tasks
+    and wait for them, so all the angles keep the process pool busy and wall time scales with the number of cores.
+    Errors raised while building a diagram are raised again in the calling thread.
+    :param angles: loading plane angles, in the order in which results are returned.
+    :param build_diagram: callable that receives an angle and returns its UniaxialInteractionDiagram.
+    :param max_workers: number of angles solved at the same time. By default, see get_load_plane_workers.
+    :param on_angle_solved: optional callable (angle, solved_count, total_count), invoked from the calling thread
+    each time an angle is solved (e.g. to update the progress bar).
+    :param backend: solver backend of the diagrams (see SOLVER_BACKENDS), which sets the default max_workers.
+    :return: list of (angle, diagram) pairs, in the order of angles, regardless of completion order."""
+    angles = list(angles)
+    if not angles:
+        return []
+    diagrams = {}
+    max_workers = min(len(angles), get_load_plane_workers(backend, max_workers))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(build_diagram, angle): angle for angle in angles}
+        for solved_count, future in enumerate(as_completed(futures), start=1):
+            angle = futures[future]
+            diagrams[angle] = future.result()
+            if on_angle_solved is not None:
+                on_angle_solved(angle, solved_count, len(angles))
+    return [(angle, diagrams[angle]) for angle in angles]
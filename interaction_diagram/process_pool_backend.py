@@ -0,0 +1,167 @@
+"""Process-pool backend for the neutral axis solver of UniaxialInteractionDiagram.
+
+The fiber arrays are published once through multiprocessing.shared_memory, and the strain planes are sent once to
+every worker on start-up. Each task only carries the loading plane angle and the (start, end) indices of a contiguous
+run of strain planes, and returns the inclinations found and the diagnostics of the failed planes. A single pool can
+serve the diagrams of every loading plane angle of a problem (see StrainPlaneProcessPool)."""
+import types
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from materials.acero_pasivo import BarraAceroPasivo
+from materials.acero_pretensado import BarraAceroPretensado
+
+FIBER_ARRAY_NAMES = ("concrete_element_array", "rebar_array", "prestressed_reinforcement_array")
+
+# State of each worker process, set by _init_worker.
+_worker_diagram = None
+_worker_strain_planes = None
+_worker_shared_blocks = []
+
+
+class SharedFiberArrays:
+    """Context manager that copies the fiber arrays of a diagram into shared memory blocks. The descriptors are
+    picklable and allow the worker processes to map the arrays without copying them."""
+
+    def __init__(self, diagram):
+        self.diagram = diagram
+        self.blocks = []
+        self.descriptors = {}
+
+    def __enter__(self):
+        for name in FIBER_ARRAY_NAMES:
+            array = getattr(self.diagram, name)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self.blocks.append(block)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self.descriptors[name] = (block.name, array.shape, array.dtype.descr)
+        return self.descriptors
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+class StrainPlaneProcessPool:
+    """Process pool whose workers hold the fiber arrays of a section (in shared memory) and its default strain
+    planes. It can be shared by the diagrams of several loading plane angles, which then submit their tasks
+    concurrently. Use as a context manager, so the pool and the shared memory are released when done."""
+
+    def __init__(self, diagram, max_workers=None):
+        """:param diagram: any object with the fiber arrays and settings of UniaxialInteractionDiagram (see
+        _load_fiber_arrays). Its loading plane angle is irrelevant, since each task sets its own."""
+        self.diagram = diagram
+        self.max_workers = max_workers
+        self.strain_planes = list(diagram.geometric_solution.planos_de_deformacion)
+        self.shared_fiber_arrays = SharedFiberArrays(diagram)
+        self.executor = None
+
+    @classmethod
+    def from_geometric_solution(cls, geometric_solution, diagram_class, max_workers=None,
+                                concrete_integration="auto"):
+        diagram = diagram_class.__new__(diagram_class)
+        diagram.geometric_solution = geometric_solution
+        diagram._load_fiber_arrays()
+        diagram.concrete_integrator = diagram.get_concrete_integrator(concrete_integration)
+        return cls(diagram, max_workers)
+
+    def __enter__(self):
+        descriptors = self.shared_fiber_arrays.__enter__()
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.max_workers, initializer=_init_worker,
+            initargs=(type(self.diagram), descriptors, get_worker_settings(self.diagram), self.strain_planes))
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.executor.shutdown(wait=True)
+        self.executor = None
+        self.shared_fiber_arrays.__exit__(exc_type, exc_value, exc_traceback)
+
+    def solve(self, uniaxial_angle, strain_planes, chunk_size):
+        """Solves the neutral axis inclination of strain_planes for the loading plane angle uniaxial_angle, each task
+        being a contiguous run of chunk_size planes (so warm-starting still applies within it). chunk_size is a
+        multiple of CONTINUATION_RUN_LENGTH, so the solution is the one of the threads backend. Only indices are sent
+        when strain_planes are the default ones, or the first of them (e.g. only the planes of positive family index,
+        see UniaxialInteractionDiagram.iterate_solution).
+        :return: list with the inclination (radians) per plane, None for planes without solution; and the
+        diagnostics of the failed planes."""
+        planes_to_send = None if strain_planes == self.strain_planes[:len(strain_planes)] else strain_planes
+        futures = [
+            self.executor.submit(_solve_plane_range, uniaxial_angle, start, start + chunk_size,
+                                 None if planes_to_send is None else planes_to_send[start:start + chunk_size])
+            for start in range(0, len(strain_planes), chunk_size)]
+        thetas, failures = [], []
+        for future in futures:  # Submission order, so strain plane ordering is preserved.
+            chunk_thetas, chunk_failures = future.result()
+            thetas.extend(chunk_thetas)
+            failures.extend(chunk_failures)
+        return thetas, failures
+
+
+def get_material_class_settings():
+    """Class attributes of the steel models, which are set while reading the input file and would otherwise be
+    missing in processes started with the "spawn" method (default on Windows)."""
+    return {cls: {name: value for name, value in vars(cls).items()
+                  if not name.startswith("_") and not callable(value) and not isinstance(value, classmethod)}
+            for cls in (BarraAceroPasivo, BarraAceroPretensado)}
+
+
+def get_worker_settings(diagram):
+    geometric_solution = diagram.geometric_solution
+    return {
+        "material_class_settings": get_material_class_settings(),
+        "concrete": geometric_solution.concrete,
+        "deformacion_maxima_de_acero": geometric_solution.deformacion_maxima_de_acero,
+        "tipo_estribo": geometric_solution.tipo_estribo,
+        "problema": {"phi_variable": geometric_solution.problema["phi_variable"]},
+        "max_degree_diff": diagram.max_degree_diff,
+        "concrete_integrator": diagram.concrete_integrator,
+        "concrete_fiber_index": diagram.concrete_fiber_index,
+        "steel_fiber_index": diagram.steel_fiber_index,
+    }
+
+
+def _init_worker(diagram_class, descriptors, settings, strain_planes):
+    global _worker_diagram, _worker_strain_planes, _worker_shared_blocks
+    for cls, class_settings in settings["material_class_settings"].items():
+        for name, value in class_settings.items():
+            setattr(cls, name, value)
+
+    diagram = diagram_class.__new__(diagram_class)
+    diagram.geometric_solution = types.SimpleNamespace(
+        concrete=settings["concrete"],
+        deformacion_maxima_de_acero=settings["deformacion_maxima_de_acero"],
+        tipo_estribo=settings["tipo_estribo"],
+        problema=settings["problema"])
+    for name, (block_name, shape, dtype_descr) in descriptors.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _worker_shared_blocks.append(block)  # Keeping a reference, so the mapped memory stays valid.
+        setattr(diagram, name, np.ndarray(shape, dtype=np.dtype(dtype_descr), buffer=block.buf))
+    diagram.phi_strength_reduction_factor = settings["problema"]["phi_variable"]
+    diagram.max_degree_diff = settings["max_degree_diff"]
+    diagram.concrete_integrator = settings["concrete_integrator"]
+    diagram.concrete_fiber_index = settings["concrete_fiber_index"]
+    diagram.steel_fiber_index = settings["steel_fiber_index"]
+    diagram._init_caches()  # Section forces do not depend on the loading plane, so caches are kept between tasks.
+    _worker_diagram, _worker_strain_planes = diagram, strain_planes
+
+
+def _solve_plane_range(uniaxial_angle, start, end, strain_planes=None):
+    _worker_diagram.uniaxial_angle = uniaxial_angle
+    _worker_diagram.expected_moment_angle = _worker_diagram.get_expected_moment_angle()
+    if strain_planes is None:
+        strain_planes = _worker_strain_planes[start:end]
+    thetas, failures = _worker_diagram.solve_strain_plane_sequence(strain_planes)
+    return [None if theta is None else float(theta) for theta in thetas], failures
+
+
+def solve_strain_planes_in_processes(diagram, strain_planes, max_workers, chunk_size):
+    """Solves strain_planes in the process pool of the diagram, or in a pool created for this call if it has none."""
+    if diagram.process_pool is not None:
+        return diagram.process_pool.solve(diagram.uniaxial_angle, strain_planes, chunk_size)
+    with StrainPlaneProcessPool(diagram, max_workers) as process_pool:
+        return process_pool.solve(diagram.uniaxial_angle, strain_planes, chunk_size)
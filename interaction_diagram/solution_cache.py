@@ -0,0 +1,45 @@
+import threading
+from collections import OrderedDict
+
+
+class BoundedCache:
+    """Thread-safe least-recently-used cache with a fixed maximum size, owned by a single interaction diagram so that
+    it is released together with it. Keeps hit, miss and eviction counts."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        """Returns the value stored for key, computing it with compute() and storing it if absent. The computation
+        runs outside the lock, so two threads may eventually compute the same key; the result is the same."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_statistics(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._data),
+                    "maxsize": self.maxsize}
+
+    def __len__(self):
+        return len(self._data)
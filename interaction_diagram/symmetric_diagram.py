@@ -0,0 +1,64 @@
+import traceback
+
+from interaction_diagram.interaction_diagram_builder import UniaxialInteractionDiagram
+
+
+def group_symmetric_load_plane_angles(uniaxial_angles, symmetry):
+    """Splits the loading plane angles into the ones to solve and the ones whose diagram is the mirror image of an
+    angle to solve (see SectionSymmetry.get_loading_plane_images).
+    :param uniaxial_angles: dict loading plane angle -> uniaxial angle of its diagram (degrees).
+    :param symmetry: SectionSymmetry of the section.
+    :return: list of angles to solve, in the given order; and dict mirrored angle -> (source angle,
+    swaps_strain_planes, (sx, sy))."""
+    angles_to_solve, mirrored_angles = [], {}
+    for angle, uniaxial_angle in uniaxial_angles.items():
+        images = symmetry.get_loading_plane_images(uniaxial_angle)
+        for source_angle in angles_to_solve:
+            # All the symmetries are their own inverse, so the source is mirrored onto the angle as well.
+            image = next(((key, signs) for key, signs in images.items()
+                          if key[0] == round(uniaxial_angles[source_angle] % 360, 2)), None)
+            if image is not None:
+                (_, swaps_strain_planes), moment_signs = image
+                mirrored_angles[angle] = (source_angle, swaps_strain_planes, moment_signs)
+                break
+        else:
+            angles_to_solve.append(angle)
+    return angles_to_solve, mirrored_angles
+
+
+class MirroredUniaxialInteractionDiagram(UniaxialInteractionDiagram):
+    """UniaxialInteractionDiagram obtained by mirroring the diagram of another loading plane angle, its image by a
+    symmetry of the section (see SectionSymmetry.get_loading_plane_images), without solving any strain plane."""
+
+    def __init__(self, uniaxial_angle, source_diagram: UniaxialInteractionDiagram, swaps_strain_planes,
+                 moment_signs):
+        """:param swaps_strain_planes: whether each strain plane of the source is mapped onto its inverted one.
+        :param moment_signs: signs (sx, sy) applied to the moments Mx and My of the source."""
+        self.source_diagram = source_diagram
+        self.swaps_strain_planes = swaps_strain_planes
+        self.moment_signs = moment_signs
+        super().__init__(uniaxial_angle, source_diagram.geometric_solution)
+
+    def _load_fiber_arrays(self):
+        source = self.source_diagram
+        self.concrete_element_array = source.concrete_element_array
+        self.rebar_array = source.rebar_array
+        self.prestressed_reinforcement_array = source.prestressed_reinforcement_array
+        self.phi_strength_reduction_factor = source.phi_strength_reduction_factor
+        self.max_degree_diff = source.max_degree_diff
+        self.concrete_fiber_index = source.concrete_fiber_index
+        self.steel_fiber_index = source.steel_fiber_index
+
+    def get_concrete_integrator(self, concrete_integration):
+        return self.source_diagram.concrete_integrator
+
+    def iterate_solution(self):
+        try:
+            self.no_solution_points_list.extend([
+                self.get_mirrored_failure(failure, self.swaps_strain_planes)
+                for failure in self.source_diagram.no_solution_points_list])
+            return [self.get_mirrored_point(point, self.swaps_strain_planes, self.moment_signs)
+                    for point in self.source_diagram.solved_points_list]
+        except Exception as e:
+            traceback.print_exc()
+            raise(e)
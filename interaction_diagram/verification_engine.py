@@ -0,0 +1,184 @@
+import math
+
+import numpy as np
+
+# Upper bound for combinations × facets × dimensions per array, to keep memory usage bounded.
+MAX_CHUNK_ELEMENTS = 2_000_000
+# Tolerance relative to the size of the envelope: below it, the spread of the points along a direction is considered
+# null (flat envelope), and a facet whose plane is this close to the origin is not crossed by any ray.
+ENVELOPE_TOLERANCE = 10 ** -9
+
+
+class InteractionEnvelope:
+    """Interaction diagram as plotted, in the units and sign conventions the load combinations are given in (kNm and
+    kN, compression positive): the closed polygon through the points of the diagram for a 2D problem (M, P), or the
+    surface triangulated between the meridians of adjacent loading planes for a 3D one (Mx, My, P). No convex hull is
+    taken, since the design diagrams are not convex (e.g. where phi changes), and a hull would overstate the capacity.
+
+    The envelope is made of facets, the edges of the polygon or the triangles of the surface. The ray t·q from the
+    origin crosses a facet of vertices vi where q = Σ λi·vi with every λi >= 0, at the point q / Σλi, so that the
+    demand/capacity ratio is Σλi. λ is a single matrix product per facet for any number of combinations. The ray may
+    cross a non convex envelope more than once, and the first crossing (largest ratio) is kept. Between the loading
+    planes of a 3D problem, the surface is made of chords of the meridians, on the safe side of the actual one, but the
+    load combinations are checked on meridians, since each one adds its loading plane to the problem.
+
+    Flat envelopes (a 3D problem with a single loading plane) are indexed in the plane they span, and demands out of
+    it have an infinite ratio."""
+
+    def __init__(self, points, facets):
+        """:param points: (points × dimensions) array with the envelope points, the origin being inside of it.
+        :param facets: (facets × vertices) array with the indices of the points of each facet: two for the edges of a
+        polygon, three for the triangles of a surface."""
+        points = np.asarray(points, dtype=float)
+        facets = np.asarray(facets, dtype=int)
+        self.center = points.mean(axis=0)
+        _, singular_values, directions = np.linalg.svd(points - self.center, full_matrices=False)
+        self.size = max(np.abs(points).max(), 1.0)
+        rank = int(np.sum(singular_values > ENVELOPE_TOLERANCE * singular_values[0])) if len(singular_values) else 0
+        if rank < facets.shape[1]:
+            raise ValueError("No es posible construir la envolvente del diagrama de interacción: los puntos resueltos "
+                             "no encierran ninguna superficie.")
+        self.basis = directions[:facets.shape[1]]  # Orthonormal rows spanning the envelope.
+        reduced_points = points @ self.basis.T
+        # Largest distance of the points to the plane of a flat envelope, relative to their distance to the origin.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.flatness = np.nan_to_num(np.linalg.norm(points - reduced_points @ self.basis, axis=1) / np.linalg.norm(
+                points, axis=1)).max(initial=0.0)
+        vertices = reduced_points[facets]
+        is_crossable = np.abs(np.linalg.det(vertices)) > ENVELOPE_TOLERANCE * self.size ** facets.shape[1]
+        self.inverse_vertices = np.linalg.inv(vertices[is_crossable])  # λ = q · inverse_vertices, per facet.
+
+    @classmethod
+    def from_uniaxial_diagram(cls, diagram):
+        """2D envelope (M, P) of a UniaxialInteractionDiagram, M signed as in the 2D plots: the polygon along the
+        first branch of the diagram and back along the second one (see get_meridian_branches)."""
+        coordinates = np.concatenate([coordinates if i == 0 else coordinates[::-1] for i, (_, coordinates) in
+                                      enumerate(cls.get_meridian_branches(diagram))])
+        x, y, z = coordinates.T
+        sign = np.where(x != 0, np.sign(x), np.where(y >= 0, 1, -1))
+        return cls(np.column_stack([sign * np.hypot(x, y), z]), cls.get_polygon_facets(len(coordinates)))
+
+    @classmethod
+    def from_uniaxial_diagrams(cls, diagrams_list):
+        """3D envelope (Mx, My, P) of the UniaxialInteractionDiagram of every loading plane: the surface between the
+        half meridians of the diagrams, sorted around the P axis (see get_surface_facets). With a single loading plane,
+        the flat polygon of its diagram."""
+        half_meridians = {}  # By direction of the moment, in degrees. λ and λ + 180° give the same ones.
+        for diagram in diagrams_list:
+            for parameters, coordinates in cls.get_meridian_branches(diagram):
+                Mx, My = coordinates[:, :2].sum(axis=0)
+                half_meridians.setdefault(round(math.degrees(math.atan2(My, Mx)) % 360, 2), (parameters, coordinates))
+        half_meridians = [half_meridians[direction] for direction in sorted(half_meridians)]
+        if len(half_meridians) <= 2:  # A single loading plane.
+            coordinates = np.concatenate([coordinates if i == 0 else coordinates[::-1] for i, (_, coordinates) in
+                                          enumerate(half_meridians)])
+            return cls(coordinates, cls.get_polygon_facets(len(coordinates)))
+        return cls(np.concatenate([coordinates for _, coordinates in half_meridians]),
+                   cls.get_surface_facets([parameters for parameters, _ in half_meridians]))
+
+    @staticmethod
+    def get_meridian_branches(diagram):
+        """Branches of the diagram, the points of the strain planes and the ones of their inverted planes, each along
+        one side of the loading plane from the pure compression to the pure tension. The points over the compression
+        limit are replaced by their capped copies, as plotted (see ACSAHEGeometricSolution.get_3d_coordinates).
+        :return: list of (parameters, coordinates) of each branch with points: the strain plane parameters j (see
+        ACSAHEGeometricSolution.get_strain_plane), ascending, and the (points × 3) array of coordinates (Mx, My, P)."""
+        branches = {True: [], False: []}
+        for point in diagram.interaction_diagram_points_list:
+            if not point["is_capped"]:
+                plano_de_deformacion = point["plano_de_deformacion"]
+                branches[plano_de_deformacion[2] > 0].append(
+                    (abs(plano_de_deformacion[3]), -point["Mx"] / 100, -point["My"] / 100, -point["sumF"]))
+        return [(branch[:, 0], branch[:, 1:]) for branch in (np.array(sorted(branch), dtype=float) for branch in
+                                                              branches.values() if branch)]
+
+    @staticmethod
+    def get_polygon_facets(points_count):
+        """Edges of the closed polygon through points_count points, in order."""
+        indices = np.arange(points_count)
+        return np.column_stack([indices, np.roll(indices, -1)])
+
+    @staticmethod
+    def get_surface_facets(half_meridians_parameters):
+        """Triangles of the surface through consecutive half meridians, closed around the P axis. Between each pair of
+        adjacent half meridians, the triangles advance along the one whose next point has the lowest strain plane
+        parameter, so that points of similar strain plane are joined even where some were not solved. The ends of the
+        half meridians (compression and tension) are closed by fans of triangles.
+        :param half_meridians_parameters: list with the ascending strain plane parameters of the points of each half
+        meridian, whose points are consecutive in the envelope points.
+        :return: (triangles × 3) array of point indices."""
+        offsets = np.cumsum([0] + [len(parameters) for parameters in half_meridians_parameters])
+        triangles = []
+        for a, b in zip(range(len(half_meridians_parameters)), np.roll(range(len(half_meridians_parameters)), -1)):
+            parameters_a, parameters_b = half_meridians_parameters[a], half_meridians_parameters[b]
+            i = k = 0
+            while i < len(parameters_a) - 1 or k < len(parameters_b) - 1:
+                if k == len(parameters_b) - 1 or (i < len(parameters_a) - 1 and parameters_a[i + 1] <= parameters_b[
+                        k + 1]):
+                    triangles.append((offsets[a] + i, offsets[a] + i + 1, offsets[b] + k))
+                    i += 1
+                else:
+                    triangles.append((offsets[a] + i, offsets[b] + k + 1, offsets[b] + k))
+                    k += 1
+        for ends in (offsets[:-1], offsets[1:] - 1):
+            triangles.extend((ends[0], ends[m], ends[m + 1]) for m in range(1, len(ends) - 1))
+        return np.array(triangles, dtype=int)
+
+    def get_demand_capacity_ratios(self, demands):
+        """Demand/capacity ratio of each demand, along the ray from the origin: 1 on the envelope, less than 1 inside
+        of it. A null demand returns 0; demands whose ray crosses no facet (e.g. no tensile capacity, the origin being
+        on the envelope) or out of a flat envelope return infinity.
+        :param demands: (demands × dimensions) array, in the coordinates of the envelope points.
+        :return: array with a ratio per demand."""
+        demands = np.asarray(demands, dtype=float).reshape(-1, self.basis.shape[1])
+        reduced_demands = demands @ self.basis.T
+        norms = np.linalg.norm(demands, axis=1)
+        is_out_of_envelope = np.linalg.norm(demands - reduced_demands @ self.basis, axis=1) > (
+                self.flatness * norms + ENVELOPE_TOLERANCE * self.size)
+        ratios = np.zeros(len(demands))
+        chunk_size = max(1, MAX_CHUNK_ELEMENTS // max(self.inverse_vertices.size, 1))
+        for start in range(0, len(demands), chunk_size):
+            cone_coordinates = np.einsum("md,fdv->mfv", reduced_demands[start:start + chunk_size],
+                                         self.inverse_vertices)
+            sums = cone_coordinates.sum(axis=2)
+            is_crossed = (sums > 0) & np.all(cone_coordinates >= -ENVELOPE_TOLERANCE * np.abs(cone_coordinates).sum(
+                axis=2, keepdims=True), axis=2)
+            ratios[start:start + chunk_size] = np.where(is_crossed, sums, -np.inf).max(axis=1, initial=-np.inf)
+        ratios[~np.isfinite(ratios) | is_out_of_envelope] = np.inf
+        ratios[norms == 0] = 0.0
+        return ratios
+
+    def get_capacity_points(self, demands):
+        """Points of the envelope along the ray of each demand (demand / ratio), NaN where there is none."""
+        demands = np.asarray(demands, dtype=float).reshape(-1, self.basis.shape[1])
+        ratios = self.get_demand_capacity_ratios(demands)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            capacities = demands / ratios[:, None]
+        capacities[~np.isfinite(ratios) | (ratios == 0)] = np.nan
+        return capacities
+
+
+def get_load_combination_demands(problema):
+    """(combinations × dimensions) array with the load combinations of problema["puntos_a_verificar"]: (M, P) for a 2D
+    problem, (Mx, My, P) for a 3D one."""
+    keys = ("M", "P") if problema["tipo"] == "2D" else ("Mx", "My", "P")
+    combinations = problema["puntos_a_verificar"]
+    return np.array([[float(combination[key] or 0) for key in keys] for combination in combinations],
+                    dtype=float).reshape(len(combinations), len(keys))
+
+
+def verify_load_combinations(problema, diagrams_list):
+    """Demand/capacity ratio of every load combination of problema["puntos_a_verificar"], against the envelope of the
+    diagram (2D problem) or of all the loading plane diagrams (3D problem).
+    :param diagrams_list: list of UniaxialInteractionDiagram.
+    :return: list with a dict per combination: nombre, demanda_capacidad (ratio) and verifica (ratio <= 1)."""
+    combinations = problema["puntos_a_verificar"]
+    if len(combinations) == 0:
+        return []
+    if problema["tipo"] == "2D":
+        envelope = InteractionEnvelope.from_uniaxial_diagram(diagrams_list[0])
+    else:
+        envelope = InteractionEnvelope.from_uniaxial_diagrams(diagrams_list)
+    ratios = envelope.get_demand_capacity_ratios(get_load_combination_demands(problema))
+    return [{"nombre": combination["nombre"], "demanda_capacidad": float(ratio), "verifica": bool(ratio <= 1)}
+            for combination, ratio in zip(combinations, ratios)]
@@ -1,5 +1,6 @@
 import sys
 import traceback
+import multiprocessing
 from tkinter import messagebox
 from PyQt5.QtWidgets import QApplication
 
@@ -7,6 +8,7 @@ from gui.gui_launcher import ACSAHEUserInterface
 
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()  # Required by the process-pool solver backend in frozen executables.
     try:
         app = QApplication(sys.argv)
         window = ACSAHEUserInterface()
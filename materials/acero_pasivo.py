@@ -1,4 +1,5 @@
 import math
+import numpy as np
 import plotly.graph_objects as go
 
 
@@ -36,6 +37,19 @@ class BarraAceroPasivo():
         else:
             return self.E * e  # kN/cm²
 
+    @classmethod
+    def stress_strain_array(cls, e):
+        """Vectorized bilinear relation. Returns an array with the stress (kN/cm²) of each strain in e."""
+        e = np.asarray(e, dtype=float)
+        ey = cls.fy/cls.E
+        return np.where(np.abs(e) > ey, np.where(e >= 0, cls.fy, -cls.fy), cls.E * e)  # kN/cm²
+
+    @classmethod
+    def tangent_modulus_array(cls, e):
+        """Derivative of stress_strain_array with respect to the strain (zero at the yield plateau)."""
+        e = np.asarray(e, dtype=float)
+        return np.where(np.abs(e) > cls.fy/cls.E, 0.0, cls.E)  # kN/cm²
+
     def show_stress_strain_curve(self):
         particion_e = range(-1000, 1000)
         x = [e / 100000 for e in particion_e]
@@ -1,3 +1,4 @@
+import numpy as np
 import plotly.graph_objects as go
 
 class BarraAceroPretensado():
@@ -59,6 +60,21 @@ class BarraAceroPretensado():
         """
         return self.Eps * e * (self.Q + (1-self.Q)/((1+(self.Eps*abs(e)/(self.K*self.fpy))**(self.N))**(1/self.N)))  #  kN/cm²
 
+    @classmethod
+    def stress_strain_array(cls, e):
+        """Vectorized version of stress_strain_eq (Menegotto and Pinto). If stress_strain_eq is overridden with a
+        different constitutive model, this method must be overridden accordingly."""
+        e = np.asarray(e, dtype=float)
+        return cls.Eps * e * (cls.Q + (1-cls.Q)/((1+(cls.Eps*np.abs(e)/(cls.K*cls.fpy))**cls.N)**(1/cls.N)))  # kN/cm²
+
+    @classmethod
+    def tangent_modulus_array(cls, e):
+        """Derivative of stress_strain_array with respect to the strain, which for Menegotto and Pinto reduces to
+        Eps·(Q + (1-Q)/(1 + z^N)^((N+1)/N)), being z = Eps·|e|/(K·fpy). Must be overridden together with
+        stress_strain_array."""
+        z = cls.Eps*np.abs(np.asarray(e, dtype=float))/(cls.K*cls.fpy)
+        return cls.Eps * (cls.Q + (1-cls.Q)/(1+z**cls.N)**((cls.N+1)/cls.N))  # kN/cm²
+
     def mostrar_stress_strain_eq(self):
         particion_e = range(1100)
         x = []
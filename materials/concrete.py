@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class Concrete:
     B1 = None
 
@@ -15,11 +18,32 @@ class Concrete:
         :param e: strain of the fiber being analyzed.
         :param e_max_comp: strain of the most compressed fiber in the section.
         """
-        e_lim = (1 - self.B1) * e_max_comp  # Deformación a partir de la cual estamos fuera del bloque de tensiones.
+        e_lim = self.get_stress_block_limit_strain(e_max_comp)  # Deformación a partir de la cual estamos fuera del bloque de tensiones.
         if e > e_lim:  # = e menos comprimido que e_lim (recordar sign).
             return 0
         else:
-            return -0.85*self.fc/10  # kN/cm²
+            return self.get_stress_block_stress()  # kN/cm²
+
+    def simplified_stress_strain_array(self, e, e_max_comp):
+        """
+        Vectorized version of simplified_stress_strain_eq: returns an array with the stress (in kN/cm²) of each
+        fiber of the strain array e.
+
+        Parameters:
+        :param e: array with the strains of the fibers being analyzed.
+        :param e_max_comp: strain of the most compressed fiber in the section.
+        """
+        e_lim = self.get_stress_block_limit_strain(e_max_comp)
+        return np.where(e > e_lim, 0.0, self.get_stress_block_stress())  # kN/cm²
+
+    def get_stress_block_limit_strain(self, e_max_comp):
+        """Strain of the least compressed fiber within the rectangular stress block, being e_max_comp the strain of
+        the most compressed fiber in the section."""
+        return (1 - self.B1) * e_max_comp
+
+    def get_stress_block_stress(self):
+        """Constant stress (in kN/cm²) of the rectangular stress block."""
+        return -0.85*self.fc/10  # kN/cm²
 
     def elastic_stress_strain_eq(self, e):
         """
@@ -28,6 +52,14 @@ class Concrete:
         """
         return self.E*e if e < 0 else 0  # kN/cm²
 
+    def elastic_stress_strain_array(self, e):
+        """Vectorized version of elastic_stress_strain_eq."""
+        return np.where(e < 0, self.E*e, 0.0)  # kN/cm²
+
+    def elastic_tangent_modulus_array(self, e):
+        """Derivative of elastic_stress_strain_array with respect to the strain."""
+        return np.where(np.asarray(e) < 0, self.E, 0.0)  # kN/cm²
+
     def obtener_beta_1(self):
         """
         Returns the value of ß1, which defines the relationship between the depth of the neutral axis
@@ -0,0 +1,44 @@
+"""Sections used by the tests, built from structured inputs (see STRUCTURED_INPUT.md)."""
+
+from build.utils.user_messages import set_message_handler
+from geometry.section_analysis import ACSAHEGeometricSolution
+
+# Messages are not shown in dialogs while testing.
+set_message_handler(lambda message, titulo: None)
+
+MATERIALES = {"hormigon": 30, "armadura_transversal": "Estribos", "acero_pasivo": "ADN 420",
+              "acero_activo": "Cordones C1900"}
+
+
+def get_box_section(planos_de_carga=(45,), phi="Según CIRSOC 201-2005"):
+    """60 × 80 cm hollow rectangular section, 15 cm thick walls, biaxial bending."""
+    return ACSAHEGeometricSolution("seccion_cajon", input_data={
+        "materiales": MATERIALES,
+        "contornos": [
+            {"tipo": "Poligonal", "nodos": [[0, 0], [60, 0], [60, 80], [0, 80]]},
+            {"tipo": "Poligonal", "signo": "Negativo", "nodos": [[15, 15], [45, 15], [45, 65], [15, 65]]}],
+        "armaduras_pasivas": [{"x": x, "y": y, "diametro": 20} for x in (5, 30, 55) for y in (5, 75)] + [
+            {"x": x, "y": 40, "diametro": 16} for x in (5, 55)],
+        "resultados": {"tipo": "3D", "phi": phi, "planos_de_carga": list(planos_de_carga)}})
+
+
+def get_beam_input_data(phi="Según CIRSOC 201-2005"):
+    """Structured input of a 30 × 60 cm reinforced concrete beam, uniaxial bending (the example of
+    STRUCTURED_INPUT.md)."""
+    return {
+        "materiales": MATERIALES,
+        "contornos": [{"tipo": "Poligonal", "nodos": [[0, 0], [30, 0], [30, 60], [0, 60]]}],
+        "armaduras_pasivas": [{"x": 4, "y": 4, "diametro": 20}, {"x": 26, "y": 4, "diametro": 20},
+                              {"x": 4, "y": 56, "diametro": 12}, {"x": 26, "y": 56, "diametro": 12}],
+        "resultados": {"tipo": "2D", "phi": phi, "planos_de_carga": [0]}}
+
+
+def get_beam_section(phi="Según CIRSOC 201-2005"):
+    """30 × 60 cm reinforced concrete beam (see get_beam_input_data)."""
+    return ACSAHEGeometricSolution("viga", input_data=get_beam_input_data(phi))
+
+
+def get_diagram_points(diagram):
+    """Comparable contents of the points of a diagram."""
+    return [(point["plano_de_deformacion"], point["sumF"], point["Mx"], point["My"], point["phi"])
+            for point in diagram.interaction_diagram_points_list]
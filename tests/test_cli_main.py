@@ -0,0 +1,25 @@
+import json
+import os
+import tempfile
+import unittest
+
+from cli_main import run_input_file
+from tests.sections import get_beam_input_data
+
+
+class TestRunInputFile(unittest.TestCase):
+
+    def test_results_file_has_the_timings_of_every_step(self):
+        with tempfile.TemporaryDirectory() as directory:
+            input_file = os.path.join(directory, "viga.json")
+            with open(input_file, "w", encoding="utf-8") as file:
+                json.dump(get_beam_input_data(), file)
+            output_path, stage_timings = run_input_file(input_file, directory, {})
+            with open(output_path, encoding="utf-8") as file:
+                results = json.load(file)
+        self.assertEqual(results["tiempos"], stage_timings)
+        self.assertEqual(list(stage_timings), ["geometria", "diagramas", "verificacion", "recopilacion"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import unittest
+
+from build.utils.excel_manager import ExcelManager
+
+INPUT_WORKBOOK = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ACSAHE.xlsm")
+# Sheets read by ACSAHEGeometricSolution through lookups.
+INPUT_SHEETS = ("Ingreso de Datos", "Armaduras Pasivas", "Armaduras Activas")
+
+
+class TestSnapshotLookups(unittest.TestCase):
+    """The lookups answered from the snapshot of a sheet (see ExcelSheetManager) find the same cells as the ones read
+    from the workbook, for every value of the input workbook, its text and a missing one."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.excel_manager = ExcelManager(INPUT_WORKBOOK, read_only=True, backend="openpyxl")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.excel_manager.close()
+
+    def get_sheets(self, sheet_name):
+        """(snapshot, direct) managers of the sheet, and the values to look up."""
+        snapshot_sheet = self.excel_manager.get_sheet(sheet_name, snapshot=True)
+        sheet = self.excel_manager.get_sheet(sheet_name, snapshot=False)
+        values = snapshot_sheet.get_values_in_range("A", "G", 1, snapshot_sheet.default_rows_range_value[-1])
+        cell_values = {value.strip() if isinstance(value, str) else value for row in values for value in row
+                       if value is not None}
+        wanted_values = sorted(cell_values | {str(value) for value in cell_values} | {"Valor inexistente"}, key=repr)
+        return snapshot_sheet, sheet, wanted_values
+
+    def assertSameLookups(self, lookup):
+        """:param lookup: function (sheet, wanted_value) of the lookup to compare."""
+        for sheet_name in INPUT_SHEETS:
+            snapshot_sheet, sheet, wanted_values = self.get_sheets(sheet_name)
+            for wanted_value in wanted_values:
+                with self.subTest(sheet=sheet_name, wanted_value=wanted_value):
+                    self.assertEqual(lookup(snapshot_sheet, wanted_value), lookup(sheet, wanted_value))
+
+    def test_find_cell_by_value(self):
+        self.assertSameLookups(lambda sheet, wanted_value: sheet.find_cell_by_value(wanted_value))
+        self.assertSameLookups(lambda sheet, wanted_value: sheet.find_cell_by_value(wanted_value, columns_range=["A"]))
+
+    def test_get_n_rows_after_value(self):
+        self.assertSameLookups(lambda sheet, wanted_value: sheet.get_n_rows_after_value(wanted_value, 20))
+        self.assertSameLookups(lambda sheet, wanted_value: sheet.get_n_rows_after_value(
+            wanted_value, 3, columns_range=["A", "B"], rows_range=(10, 40)))
+
+    def test_get_rows_range_between_values(self):
+        def lookup(sheet, wanted_value):
+            return [sheet.get_rows_range_between_values((wanted_value, end_value), columns_range=["A"]) for end_value in
+                    ("GEOMETRÍA DE LA SECCIÓN DE HORMIGÓN", "ARMADURAS ACTIVAS (H°- Pretensado)", "RESULTADOS")]
+        self.assertSameLookups(lookup)
+
+    def test_get_value_on_the_right(self):
+        self.assertSameLookups(lambda sheet, wanted_value: sheet.get_value_on_the_right(wanted_value, n_column=2))
+        self.assertSameLookups(lambda sheet, wanted_value: sheet.get_value_on_the_right(
+            wanted_value, rows_range=(1, 30), n_column=1, row_offset=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+import numpy as np
+
+from interaction_diagram.interaction_diagram_builder import UniaxialInteractionDiagram, THETA_CACHE_QUANTUM
+from tests.sections import get_box_section, get_diagram_points
+
+
+class TestStrainPlaneSolver(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.geometric_solution = get_box_section()
+
+    def test_solution_does_not_depend_on_the_workers(self):
+        diagram = UniaxialInteractionDiagram(45, self.geometric_solution, max_workers=1)
+        for max_workers, chunk_size in ((4, None), (8, None), (3, 50)):
+            other_diagram = UniaxialInteractionDiagram(
+                45, self.geometric_solution, max_workers=max_workers, chunk_size=chunk_size)
+            self.assertEqual(get_diagram_points(diagram), get_diagram_points(other_diagram))
+            self.assertEqual(len(diagram.no_solution_points_list), len(other_diagram.no_solution_points_list))
+
+    def test_analytic_scalar_evaluation_matches_batched_evaluation(self):
+        diagram = UniaxialInteractionDiagram(45, self.geometric_solution, max_workers=1,
+                                             concrete_integration="analytic")
+        for theta_key in (0, 123, -4567, 9000):
+            for plano_de_deformacion in self.geometric_solution.planos_de_deformacion[::37]:
+                scalar_solution = diagram._compute_solution_for_theta_and_strain_plane(theta_key, plano_de_deformacion)
+                batched_solution = diagram.get_solutions_for_thetas_and_strain_planes(
+                    [theta_key * THETA_CACHE_QUANTUM], [plano_de_deformacion])
+                np.testing.assert_allclose(scalar_solution, [float(value[0]) for value in batched_solution],
+                                           rtol=1e-9, atol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
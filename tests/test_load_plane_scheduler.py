@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import acsahe
+from build.utils.user_messages import set_message_handler
+from interaction_diagram.interaction_diagram_builder import UniaxialInteractionDiagram
+from interaction_diagram.load_plane_scheduler import get_load_plane_workers, solve_load_plane_angles
+from tests.sections import MATERIALES
+
+
+class FailingInteractionDiagram(UniaxialInteractionDiagram):
+
+    def iterate_solution(self):
+        raise ValueError("Error del diagrama")
+
+
+class TestLoadPlaneScheduler(unittest.TestCase):
+
+    def test_default_workers(self):
+        with mock.patch("os.cpu_count", return_value=8):
+            self.assertEqual(get_load_plane_workers("threads"), 1)
+            self.assertEqual(get_load_plane_workers("processes"), 8)
+            self.assertEqual(get_load_plane_workers("threads", 3), 3)
+
+    def test_thread_pools_are_not_nested(self):
+        running, max_running, lock = [0], [0], threading.Lock()
+
+        def build_diagram(angle):
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return angle
+
+        self.assertEqual(solve_load_plane_angles([0, 30, 60, 90], build_diagram), [(a, a) for a in (0, 30, 60, 90)])
+        self.assertEqual(max_running[0], 1)
+
+    def test_errors_are_shown_from_the_calling_thread(self):
+        messages = []
+        set_message_handler(lambda message, titulo: messages.append((str(message), threading.current_thread())))
+        input_data = {"materiales": MATERIALES,
+                      "contornos": [{"tipo": "Poligonal", "nodos": [[0, 0], [30, 0], [30, 60], [0, 60]]}],
+                      "armaduras_pasivas": [{"x": 4, "y": 4, "diametro": 20}, {"x": 26, "y": 56, "diametro": 20}],
+                      "resultados": {"tipo": "3D", "phi": 0.9, "planos_de_carga": [0, 30, 60]}}
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "seccion.json")
+            with open(input_path, "w", encoding="utf-8") as input_file:
+                json.dump(input_data, input_file)
+            with mock.patch.object(acsahe, "UniaxialInteractionDiagram", FailingInteractionDiagram), \
+                    self.assertRaises(ValueError):
+                acsahe.ACSAHE(app_gui=None, input_file_name="seccion.json", path_to_input_file=input_path,
+                              solver_options={"load_plane_workers": 3}, builds_results=False)
+        set_message_handler(lambda message, titulo: None)
+        self.assertEqual(messages, [("Error del diagrama", threading.current_thread())])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from interaction_diagram.interaction_diagram_builder import UniaxialInteractionDiagram
+from interaction_diagram.process_pool_backend import StrainPlaneProcessPool
+from tests.sections import get_box_section, get_diagram_points
+
+
+class TestProcessPoolBackend(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.geometric_solution = get_box_section(planos_de_carga=(0, 45))
+
+    def test_processes_match_threads(self):
+        for uniaxial_angle in (0, 45):
+            diagram = UniaxialInteractionDiagram(uniaxial_angle, self.geometric_solution)
+            process_diagram = UniaxialInteractionDiagram(uniaxial_angle, self.geometric_solution, backend="processes")
+            self.assertEqual(get_diagram_points(diagram), get_diagram_points(process_diagram))
+
+    def test_shared_process_pool_matches_threads(self):
+        with StrainPlaneProcessPool.from_geometric_solution(
+                self.geometric_solution, UniaxialInteractionDiagram, max_workers=2) as process_pool:
+            for uniaxial_angle in (0, 45):
+                diagram = UniaxialInteractionDiagram(uniaxial_angle, self.geometric_solution, max_workers=3)
+                process_diagram = UniaxialInteractionDiagram(
+                    uniaxial_angle, self.geometric_solution, backend="processes", process_pool=process_pool)
+                self.assertEqual(get_diagram_points(diagram), get_diagram_points(process_diagram))
+
+
+if __name__ == '__main__':
+    unittest.main()
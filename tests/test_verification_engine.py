@@ -0,0 +1,48 @@
+import math
+import unittest
+
+import numpy as np
+
+from interaction_diagram.capacity_query import SectionCapacityQuery
+from interaction_diagram.interaction_diagram_builder import UniaxialInteractionDiagram
+from interaction_diagram.verification_engine import InteractionEnvelope
+from tests.sections import get_beam_section, get_box_section
+
+# Largest relative difference between the ratios of the envelope and of the capacity query, which differ in the strain
+# planes the diagram is made of.
+RATIO_TOLERANCE = 0.01
+
+
+class TestInteractionEnvelope(unittest.TestCase):
+
+    def assertRatiosAgree(self, envelope, capacity_query, loads):
+        """:param loads: list of (P, Mx, My), as the load combinations of a 3D problem."""
+        demands = [(Mx, My, P) for P, Mx, My in loads] if envelope.basis.shape[1] == 3 else [(Mx, P) for P, Mx, _ in
+                                                                                             loads]
+        for load, ratio in zip(loads, envelope.get_demand_capacity_ratios(demands)):
+            capacity = capacity_query.get_capacity(*load)
+            self.assertAlmostEqual(ratio / capacity["demanda_capacidad"], 1, delta=RATIO_TOLERANCE, msg=load)
+
+    def test_2d_ratios_match_capacity_query(self):
+        geometric_solution = get_beam_section()
+        envelope = InteractionEnvelope.from_uniaxial_diagram(UniaxialInteractionDiagram(0, geometric_solution))
+        loads = [(1434, -270, 0)] + [(1500 * math.sin(angle), 300 * math.cos(angle), 0) for angle in
+                                     np.linspace(0, 2 * math.pi, 24, endpoint=False)]
+        self.assertRatiosAgree(envelope, SectionCapacityQuery(geometric_solution), loads)
+
+    def test_3d_ratios_match_capacity_query_on_loading_planes(self):
+        planos_de_carga = (0, 45, 90)
+        geometric_solution = get_box_section(planos_de_carga)
+        envelope = InteractionEnvelope.from_uniaxial_diagrams(
+            [UniaxialInteractionDiagram(uniaxial_angle, geometric_solution) for uniaxial_angle in planos_de_carga])
+        loads = []
+        for uniaxial_angle in planos_de_carga:
+            moment_angle = math.radians(180 - uniaxial_angle)
+            for angle in np.linspace(0, 2 * math.pi, 12, endpoint=False):
+                moment = 400 * math.cos(angle)
+                loads.append((3000 * math.sin(angle), moment * math.cos(moment_angle), moment * math.sin(moment_angle)))
+        self.assertRatiosAgree(envelope, SectionCapacityQuery(geometric_solution), loads)
+
+
+if __name__ == '__main__':
+    unittest.main()